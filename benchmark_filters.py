@@ -0,0 +1,172 @@
+"""
+Lag and jitter of each cursor filter on recorded index tip traces
+
+Feeds the index tip track of landmark recordings (see replay.py) through
+every filter in smoothing.FILTERS, in screen pixels with the recorded
+capture timestamps, and compares the output against a zero-phase
+(centered) smoothing of the raw track:
+
+    lag_ms     time shift that best aligns the output with the reference
+               (negative when a predictive filter runs ahead of the hand)
+    jitter_px  RMS of the output's frame-to-frame noise around its own local mean
+    error_px   RMS distance from the reference at the same instant
+
+Usage:
+    python benchmark_filters.py session.hlm other.hlm --output filters.json
+    python benchmark_filters.py --synthetic --latency 0.05
+
+Recorded timestamps aren't on the live clock, so the Kalman filter is
+given a fixed latency to compensate (--latency, default 0 = no prediction).
+"""
+
+import argparse
+import json
+
+import numpy as np
+from gestures import INDEX_TIP
+from recording import LandmarkRecording
+from smoothing import FILTERS, create_filter
+
+
+SCREEN_SIZE = (1920, 1080)
+REFERENCE_WINDOW = 5    # Frames in the centered moving average used as ground truth
+MAX_LAG_FRAMES = 15     # Largest lag searched for, in either direction
+
+
+def centered_average(points, window):
+    """Zero-phase moving average of an (N, 2) track (edges use a shorter window)"""
+    kernel = np.ones(window) / window
+    padded = np.pad(points, ((window // 2, window // 2), (0, 0)), mode="edge")
+    return np.stack([np.convolve(padded[:, i], kernel, mode="valid") for i in range(2)], axis=1)
+
+
+def load_traces(path, min_length=REFERENCE_WINDOW):
+    """
+    Split a recording into continuous hand tracks
+
+    Returns:
+        list: (timestamps, points) per segment, points as (N, 2) screen pixels
+    """
+    recording = LandmarkRecording(path)
+    records = recording.records
+    has_hand = records["num_hands"] > 0
+    tips = records["landmarks"][:, INDEX_TIP, :2].astype(np.float64)
+    # Same mirroring as CursorController.normalized_to_screen
+    points = np.column_stack(((1 - tips[:, 0]) * SCREEN_SIZE[0], tips[:, 1] * SCREEN_SIZE[1]))
+
+    traces = []
+    # Boundaries where hand presence changes
+    edges = np.flatnonzero(np.diff(has_hand.astype(np.int8))) + 1
+    for segment in np.split(np.arange(len(records)), edges):
+        if len(segment) >= min_length and has_hand[segment[0]]:
+            traces.append((records["capture_time"][segment].astype(np.float64), points[segment]))
+    return traces
+
+
+def synthetic_traces(seconds=20.0, fps=30.0, noise_px=3.0, seed=0):
+    """Slow drift plus faster sweeps with Gaussian landmark noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, seconds, 1 / fps)
+    x = 960 + 600 * np.sin(2 * np.pi * 0.1 * t) + 200 * np.sin(2 * np.pi * 0.7 * t)
+    y = 540 + 300 * np.sin(2 * np.pi * 0.17 * t)
+    points = np.column_stack((x, y)) + rng.normal(0, noise_px, (len(t), 2))
+    return [(t, points)]
+
+
+def run_filter(name, traces, **overrides):
+    """
+    Filter every trace with a fresh filter per trace
+
+    Args:
+        overrides: Constructor arguments passed on to create_filter
+
+    Returns:
+        list: (N, 2) filtered points per trace
+    """
+    outputs = []
+    for timestamps, points in traces:
+        position_filter = create_filter(name, **overrides)
+        outputs.append(np.array([position_filter.update(x, y, t)
+                                 for t, (x, y) in zip(timestamps.tolist(), points.tolist())]))
+    return outputs
+
+
+def measure(traces, outputs):
+    """
+    Returns:
+        dict: lag_ms, jitter_px and error_px over all traces
+    """
+    references = [centered_average(points, REFERENCE_WINDOW) for _, points in traces]
+    frame_time = np.median(np.concatenate([np.diff(timestamps) for timestamps, _ in traces]))
+
+    # Squared error between output[t] and reference[t - lag], summed over traces
+    lags = np.arange(-MAX_LAG_FRAMES, MAX_LAG_FRAMES + 1)
+    lag_errors = np.zeros(len(lags))
+    lag_counts = np.zeros(len(lags))
+    for reference, output in zip(references, outputs):
+        # Keep at least half of a track overlapping so short tracks don't decide the lag
+        for i, lag in enumerate(lags):
+            if abs(lag) > len(output) // 2:
+                continue
+            if lag >= 0:
+                diff = output[lag:] - reference[:len(reference) - lag]
+            else:
+                diff = output[:lag] - reference[-lag:]
+            lag_errors[i] += np.sum(diff ** 2)
+            lag_counts[i] += len(diff)
+    mean_errors = np.where(lag_counts > 0, lag_errors / np.maximum(lag_counts, 1), np.inf)
+    best_lag = int(lags[np.argmin(mean_errors)])
+
+    squared_jitter = sum(np.sum((output - centered_average(output, REFERENCE_WINDOW)) ** 2)
+                         for output in outputs)
+    squared_error = sum(np.sum((output - reference) ** 2)
+                        for output, reference in zip(outputs, references))
+    samples = sum(len(output) for output in outputs)
+
+    return {
+        "lag_ms": round(best_lag * frame_time * 1000, 1),
+        "jitter_px": round(float(np.sqrt(squared_jitter / samples)), 3),
+        "error_px": round(float(np.sqrt(squared_error / samples)), 3),
+    }
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Lag and jitter per cursor filter on recorded traces")
+    parser.add_argument("paths", nargs="*", help="Landmark recordings written with RECORD_LANDMARKS_PATH")
+    parser.add_argument("--synthetic", action="store_true", help="Use a generated noisy trace instead")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Latency (s) the Kalman filter predicts ahead by")
+    parser.add_argument("--output", default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        traces = synthetic_traces()
+    else:
+        traces = [trace for path in args.paths for trace in load_traces(path)]
+    if not traces:
+        print("❌ No hand tracks found (pass recordings, or --synthetic)")
+        return 1
+
+    frames = sum(len(points) for _, points in traces)
+    print(f"⏱️  Filtering {frames} frames in {len(traces)} track(s)...")
+    overrides = {"kalman": {"latency": args.latency}}
+    report = {name: measure(traces, run_filter(name, traces, **overrides.get(name, {})))
+              for name in FILTERS}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"frames": frames, "tracks": len(traces), "filters": report}, f, indent=2)
+
+    print("\n" + "="*50)
+    print(f"{'Filter':<12}{'lag ms':>10}{'jitter px':>12}{'error px':>12}")
+    for name, stats in report.items():
+        print(f"{name:<12}{stats['lag_ms']:>10.1f}{stats['jitter_px']:>12.3f}{stats['error_px']:>12.3f}")
+    if args.output:
+        print(f"\n📝 Report written to {args.output}")
+    print("="*50)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""
+Microbenchmark: running-sum moving average against the previous deque + sum() version
+
+Times one update of the cursor filter (2 channels) and of a full hand
+(21 landmarks x 3 coordinates) at several window sizes.
+
+Usage:
+    python benchmark_moving_average.py
+    python benchmark_moving_average.py --windows 5 10 30 --updates 200000
+"""
+
+import argparse
+import timeit
+from collections import deque
+
+import numpy as np
+from smoothing import ArrayMovingAverageFilter, MovingAverageFilter
+
+
+class DequeMovingAverageFilter:
+    """The previous MovingAverageFilter: sum() over two deques on every update"""
+
+    def __init__(self, window_size=5):
+        self.window_size = window_size
+        self.x_history = deque(maxlen=window_size)
+        self.y_history = deque(maxlen=window_size)
+
+    def update(self, x, y):
+        self.x_history.append(x)
+        self.y_history.append(y)
+        return sum(self.x_history) / len(self.x_history), sum(self.y_history) / len(self.y_history)
+
+
+def time_per_update(function, updates):
+    """Best of three runs, in microseconds per call"""
+    return min(timeit.repeat(function, number=updates, repeat=3)) / updates * 1e6
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Moving average filter microbenchmark")
+    parser.add_argument("--windows", type=int, nargs="+", default=[5, 10, 30, 100])
+    parser.add_argument("--updates", type=int, default=100000, help="Updates timed per case")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x, y = (rng.random(2) * 1000).tolist()
+    hand = rng.random((21, 3))
+    hand_points = hand.reshape(-1, 3).tolist()
+    hand_updates = max(1, args.updates // 10)
+
+    print("\n" + "="*60)
+    print(f"{'Case':<24}{'window':>8}{'before µs':>12}{'after µs':>10}{'speedup':>9}")
+    for window in args.windows:
+        # Cursor position: one (x, y) per frame
+        before_filter = DequeMovingAverageFilter(window)
+        after_filter = MovingAverageFilter(window)
+        before = time_per_update(lambda: before_filter.update(x, y), args.updates)
+        after = time_per_update(lambda: after_filter.update(x, y), args.updates)
+        print(f"{'cursor (2 channels)':<24}{window:>8}{before:>12.3f}{after:>10.3f}{before / after:>8.1f}x")
+
+        # Whole hand: previously, per landmark, one 2-channel filter for (x, y) plus one more for z
+        before_filters = [(DequeMovingAverageFilter(window), DequeMovingAverageFilter(window)) for _ in hand_points]
+        after_filter = ArrayMovingAverageFilter((21, 3), window)
+        out = np.empty((21, 3))
+
+        def update_before():
+            for (xy_filter, z_filter), (point_x, point_y, point_z) in zip(before_filters, hand_points):
+                xy_filter.update(point_x, point_y)
+                z_filter.update(point_z, 0.0)
+
+        before = time_per_update(update_before, hand_updates)
+        after = time_per_update(lambda: after_filter.update(hand, out), hand_updates)
+        print(f"{'hand (21 x 3 channels)':<24}{window:>8}{before:>12.3f}{after:>10.3f}{before / after:>8.1f}x")
+    print("="*60)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
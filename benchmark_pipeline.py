@@ -0,0 +1,230 @@
+"""
+Offline per-stage benchmark of the hand mouse pipeline over recorded video files
+
+Runs every frame through decode → flip → color conversion → MediaPipe →
+gesture detection → smoothing filter → screen mapping, with no camera,
+no sleeps and no real mouse output, and writes throughput plus
+p50/p95/p99 latency per stage as JSON for comparison across commits
+and machines.
+
+Usage:
+    python benchmark_pipeline.py videos/ --output bench.json
+    python benchmark_pipeline.py clip1.mp4 clip2.mp4 --max-frames 500
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+import config
+from cursor_control import CursorController, RecordingMouse
+
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+STAGES = ("decode", "flip", "color", "inference", "gestures", "filter", "mapping")
+
+
+def find_videos(paths):
+    """Expand files and directories into a sorted list of video files"""
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(path, name))
+        else:
+            videos.append(path)
+    return videos
+
+
+def summarize(samples_ns):
+    """
+    Summarize stage latencies
+
+    Args:
+        samples_ns: List of durations in nanoseconds
+
+    Returns:
+        dict: count, mean and p50/p95/p99/max in milliseconds
+    """
+    if not samples_ns:
+        return {"count": 0}
+    ms = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(ms.max()), 4),
+    }
+
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """Machine and library details stored alongside the results"""
+    return {
+        "commit": git_commit(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "mediapipe": mp.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def benchmark_video(path, hands, cursor, timings, max_frames=None):
+    """
+    Run one video through every pipeline stage, appending durations to `timings`
+
+    Returns:
+        tuple: (frames, frames_with_hand)
+    """
+    detector = cursor.gesture_detector
+    clock = time.perf_counter_ns
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        print(f"   ⚠️  Could not open {path}, skipping")
+        return 0, 0
+
+    frames = 0
+    frames_with_hand = 0
+    try:
+        while max_frames is None or frames < max_frames:
+            t0 = clock()
+            success, frame = cap.read()
+            t1 = clock()
+            if not success:
+                break
+            timings["decode"].append(t1 - t0)
+
+            frame = cv2.flip(frame, 1)
+            t2 = clock()
+            timings["flip"].append(t2 - t1)
+
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            t3 = clock()
+            timings["color"].append(t3 - t2)
+
+            results = hands.process(rgb_frame)
+            t4 = clock()
+            timings["inference"].append(t4 - t3)
+            frames += 1
+
+            if not results.multi_hand_landmarks:
+                continue
+            frames_with_hand += 1
+            hand_landmarks = results.multi_hand_landmarks[0]
+
+            t4 = clock()
+            features = detector.compute_features(hand_landmarks)
+            x, y, z = features.index_tip
+            t5 = clock()
+            timings["gestures"].append(t5 - t4)
+
+            screen_x, screen_y = cursor.normalized_to_screen(x, y)
+            t6 = clock()
+            screen_x, screen_y = cursor.position_filter.update(screen_x, screen_y)
+            t7 = clock()
+            cursor.clamp_to_screen(screen_x, screen_y)
+            t8 = clock()
+            timings["filter"].append(t7 - t6)
+            timings["mapping"].append((t6 - t5) + (t8 - t7))
+    finally:
+        cap.release()
+
+    return frames, frames_with_hand
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Per-stage pipeline benchmark over video files")
+    parser.add_argument("inputs", nargs="+", help="Video files or directories of videos")
+    parser.add_argument("--output", default="bench_output.json", help="JSON report path")
+    parser.add_argument("--max-frames", type=int, default=None, help="Frame limit per video")
+    args = parser.parse_args()
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        print("❌ No video files found")
+        return 1
+
+    hands = mp.solutions.hands.Hands(
+        min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
+        min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE,
+        max_num_hands=config.MAX_NUM_HANDS
+    )
+    timings = {stage: [] for stage in STAGES}
+    per_video = []
+
+    print(f"⏱️  Benchmarking {len(videos)} video(s)...")
+    wall_start = time.perf_counter()
+    try:
+        for path in videos:
+            # Fresh filter/gesture state per video, shared MediaPipe graph
+            cursor = CursorController(1920, 1080, RecordingMouse(), print_gestures=False)
+            video_start = time.perf_counter()
+            frames, frames_with_hand = benchmark_video(path, hands, cursor, timings, args.max_frames)
+            video_elapsed = time.perf_counter() - video_start
+            per_video.append({
+                "path": path,
+                "frames": frames,
+                "frames_with_hand": frames_with_hand,
+                "fps": round(frames / video_elapsed, 2) if video_elapsed > 0 else None,
+            })
+            print(f"   {path}: {frames} frames, {frames_with_hand} with hand")
+    finally:
+        hands.close()
+    wall_elapsed = time.perf_counter() - wall_start
+
+    total_frames = sum(video["frames"] for video in per_video)
+    report = {
+        "environment": environment(),
+        "config": {
+            "max_num_hands": config.MAX_NUM_HANDS,
+            "min_detection_confidence": config.MIN_DETECTION_CONFIDENCE,
+            "min_tracking_confidence": config.MIN_TRACKING_CONFIDENCE,
+        },
+        "videos": per_video,
+        "frames": total_frames,
+        "elapsed_s": round(wall_elapsed, 3),
+        "throughput_fps": round(total_frames / wall_elapsed, 2) if wall_elapsed > 0 else None,
+        "stages": {stage: summarize(timings[stage]) for stage in STAGES},
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "="*60)
+    print(f"{'Stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage in STAGES:
+        stats = report["stages"][stage]
+        if stats["count"]:
+            print(f"{stage:<12}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+    print(f"\nThroughput: {report['throughput_fps']} FPS over {total_frames} frames")
+    print(f"📝 Report written to {args.output}")
+    print("="*60)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,99 @@
+"""
+tracemalloc report: per-frame allocations of frame preprocessing, before and after
+
+"before" is the old path (cv2.flip + cv2.cvtColor into new arrays);
+"after" is FramePreprocessor in landmark mirror mode (no flip, RGB
+conversion into a reused buffer, landmarks left as detected). numpy
+reports its array allocations to tracemalloc, so full-size frame
+buffers show up in the numbers.
+
+Usage:
+    python benchmark_preprocess.py
+    python benchmark_preprocess.py --frames 500 --width 1280 --height 720
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from hand_results import HandResults
+from preprocess import FramePreprocessor
+
+
+def preprocess_before(frame, results):
+    frame = cv2.flip(frame, 1)
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return frame, rgb_frame
+
+
+def make_after():
+    preprocessor = FramePreprocessor(mirror="landmarks")
+
+    def preprocess_after(frame, results):
+        display_frame, rgb_frame = preprocessor.prepare(frame)
+        return display_frame, rgb_frame
+
+    return preprocess_after
+
+
+def measure(function, frames, results):
+    """
+    Returns:
+        dict: Peak bytes allocated inside one call (mean and max over frames) and µs per frame
+    """
+    function(frames[0], results)  # Warm-up: first call allocates reusable buffers
+    peaks = []
+    elapsed = 0.0
+    tracemalloc.start()
+    try:
+        for frame in frames:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            outputs = function(frame, results)
+            elapsed += time.perf_counter() - start
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            del outputs
+    finally:
+        tracemalloc.stop()
+    return {
+        "mean_bytes": int(np.mean(peaks)),
+        "max_bytes": int(np.max(peaks)),
+        "us_per_frame": 1e6 * elapsed / len(frames),
+    }
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Per-frame allocations of frame preprocessing")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # A few distinct frames, cycled, so the camera's own allocations aren't measured
+    pool = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+    frames = [pool[i % len(pool)] for i in range(args.frames)]
+    results = HandResults([rng.random((21, 3))], scores=[0.98])
+
+    report = {
+        "before": measure(preprocess_before, frames, results),
+        "after": measure(make_after(), frames, results),
+    }
+
+    frame_bytes = args.width * args.height * 3
+    print("\n" + "="*60)
+    print(f"Frames: {args.frames} at {args.width}x{args.height} ({frame_bytes / 1024:.0f} KiB each)")
+    print(f"{'Path':<10}{'mean KiB/frame':>16}{'max KiB/frame':>16}{'µs/frame':>12}")
+    for name, stats in report.items():
+        print(f"{name:<10}{stats['mean_bytes'] / 1024:>16.1f}{stats['max_bytes'] / 1024:>16.1f}"
+              f"{stats['us_per_frame']:>12.1f}")
+    print("="*60)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,178 @@
+"""
+Time-to-first-cursor benchmark for the startup modes
+
+Each run is a fresh interpreter (cold imports, new MediaPipe graph) that
+builds the engine with the "null" mouse backend and no preview, reads
+frames until the first cursor move and reports its startup breakdown.
+Medians per mode are printed and appended to a JSON-lines history file,
+tagged with the commit, so startup time can be followed across changes.
+
+Usage:
+    python benchmark_startup.py --source clip.mp4
+    python benchmark_startup.py --source 0 --runs 10 --modes concurrent
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+RESULT_PREFIX = "STARTUP_RESULT "
+MODES = ("serial", "concurrent")
+
+
+def parse_source(source):
+    """Camera index as int, anything else (video file, URL) as-is"""
+    return int(source) if source.isdigit() else source
+
+
+def run_child(source, mode, warmup, max_frames):
+    """Child process: start the engine and stop at the first cursor move"""
+    import startup
+    import config
+
+    config.STARTUP_MODE = mode
+    config.STARTUP_WARMUP = warmup
+    config.CAMERA_INDEX = parse_source(source)
+    config.OUTPUT_BACKEND = "null"
+    config.RECORD_LANDMARKS_PATH = None
+    if isinstance(config.CAMERA_INDEX, str):
+        # Read a file at its own pace instead of racing a capture thread through it
+        config.CAPTURE_MODE = "direct"
+
+    from engine import HandMouseController
+
+    controller = HandMouseController(sink=None)
+    frames = 0
+    try:
+        while frames < max_frames and "first_cursor" not in controller.startup.events:
+            success, frame, capture_time = controller.cap.read()
+            if not success:
+                break
+            frame, rgb_frame = controller.preprocess(frame)
+            controller.process_frame(frame, controller.detect(rgb_frame), capture_time)
+            frames += 1
+    finally:
+        controller.cleanup()
+
+    result = controller.startup.as_dict()
+    result["frames"] = frames
+    # Wall-clock moment startup.py was imported, to measure interpreter launch from the parent
+    result["process_start_wall"] = time.time() - (time.perf_counter() - startup.PROCESS_START)
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def run_once(source, mode, warmup, max_frames):
+    """
+    Launch one child and collect its breakdown
+
+    Returns:
+        dict: Child result plus "launch_s" (spawn → startup.py import), or None if it failed
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--source", str(source),
+               "--modes", mode, "--max-frames", str(max_frames)]
+    if not warmup:
+        command.append("--no-warmup")
+    spawned = time.time()
+    completed = subprocess.run(command, capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+            result["launch_s"] = round(result.pop("process_start_wall") - spawned, 4)
+            return result
+    print(f"⚠️ {mode} run failed (exit code {completed.returncode}):\n{completed.stderr[-2000:]}")
+    return None
+
+
+def summarize(results):
+    """
+    Medians over runs of one mode
+
+    Returns:
+        dict: runs, launch_s, median event times and median stage durations (seconds)
+    """
+    summary = {"runs": len(results), "launch_s": statistics.median(r["launch_s"] for r in results)}
+    for key in ("events", "stages"):
+        names = {name for r in results for name in r[key]}
+        summary[key] = {}
+        for name in sorted(names):
+            values = [r[key][name] if key == "events" else r[key][name]["duration_s"]
+                      for r in results if name in r[key]]
+            summary[key][name] = round(statistics.median(values), 4)
+    return summary
+
+
+def last_record(history_path):
+    """Most recent history entry, or None"""
+    if not os.path.exists(history_path):
+        return None
+    record = None
+    with open(history_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+    return record
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Time-to-first-cursor benchmark")
+    parser.add_argument("--source", default="0", help="Camera index or video file with a visible hand")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per mode")
+    parser.add_argument("--no-warmup", action="store_true", help="Disable the blank-frame warm-up inference")
+    parser.add_argument("--max-frames", type=int, default=300, help="Give up on a cursor after this many frames")
+    parser.add_argument("--history", default="startup_history.jsonl", help="JSON-lines file results are appended to")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.source, args.modes[0], not args.no_warmup, args.max_frames)
+        return 0
+
+    from benchmark_pipeline import environment
+
+    previous = last_record(args.history)
+    results = {mode: [] for mode in args.modes}
+    # Interleave modes so slow drift (thermal, disk cache) affects them equally
+    for run in range(args.runs):
+        for mode in args.modes:
+            result = run_once(args.source, mode, not args.no_warmup, args.max_frames)
+            if result is not None:
+                results[mode].append(result)
+                first_cursor = result["events"].get("first_cursor")
+                shown = f"{first_cursor * 1000:.0f} ms" if first_cursor is not None else "no cursor"
+                print(f"   run {run + 1}/{args.runs} {mode:<11} first cursor: {shown}")
+
+    record = {
+        "environment": environment(),
+        "source": args.source,
+        "warmup": not args.no_warmup,
+        "modes": {mode: summarize(runs) for mode, runs in results.items() if runs},
+    }
+
+    print("\n" + "="*60)
+    print(f"{'Mode':<12}{'launch':>9}{'ready':>9}{'1st frame':>11}{'1st cursor':>12}{'previous':>10}")
+    for mode, summary in record["modes"].items():
+        events = summary["events"]
+        before = (previous or {}).get("modes", {}).get(mode, {}).get("events", {}).get("first_cursor")
+        cells = [summary["launch_s"], events.get("ready"), events.get("first_frame"),
+                 events.get("first_cursor"), before]
+        print(f"{mode:<12}" + "".join(f"{'-' if v is None else f'{v * 1000:.0f} ms':>{w}}"
+                                      for v, w in zip(cells, (9, 9, 11, 12, 10))))
+        print("    " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in summary["stages"].items()))
+    print("="*60)
+
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"📝 Appended to {args.history}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
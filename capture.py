@@ -0,0 +1,216 @@
+"""
+Camera capture sources for hand tracking
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+import cv2
+import config
+from stream import MJPEGStreamCapture, is_stream_url
+
+
+CAPTURE_MODES = ("direct", "latest", "ring")
+
+
+class DirectCapture:
+    """Reads frames inline on the caller's thread (one read per loop iteration)"""
+
+    def __init__(self, cap, color_order="BGR"):
+        """
+        Args:
+            cap: Opened cv2.VideoCapture
+            color_order: Channel order of the frames cap delivers ("BGR" or "RGB")
+        """
+        self.cap = cap
+        self.color_order = color_order
+        self.frames_captured = 0
+        self.dropped_frames = 0  # Never drops, kept for a uniform interface
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        """
+        Read the next frame from the camera
+
+        Returns:
+            tuple: (success, frame, capture_time) with capture_time from time.perf_counter()
+        """
+        success, frame = self.cap.read()
+        capture_time = time.perf_counter()
+        if success:
+            self.frames_captured += 1
+        return success, frame, capture_time
+
+    def release(self):
+        self.cap.release()
+
+
+class ThreadedCapture:
+    """
+    Reads frames on a background thread so inference never waits on camera I/O.
+
+    Only the newest `buffer_size` frames are kept. `read()` always hands out the
+    newest frame; any older frame that was never read is counted as dropped.
+    Like a blocking cap.read(), it fails only once the camera has failed or
+    the capture is released, not because a frame is slow to arrive (cameras
+    that start slowly, Wi-Fi stalls).
+    """
+
+    def __init__(self, cap, buffer_size=1, read_timeout=None, color_order="BGR"):
+        """
+        Args:
+            cap: Opened cv2.VideoCapture
+            buffer_size: Number of recent frames kept (1 = single latest-frame slot)
+            read_timeout: Seconds read() waits for a new frame before failing, None to wait
+            color_order: Channel order of the frames cap delivers ("BGR" or "RGB")
+        """
+        self.cap = cap
+        self.color_order = color_order
+        self.read_timeout = read_timeout
+        self.frames_captured = 0
+        self.dropped_frames = 0
+
+        self._frames = deque(maxlen=max(1, buffer_size))  # (seq, frame, capture_time)
+        self._condition = threading.Condition()
+        self._last_read_seq = 0
+        self._running = True
+        self._failed = False
+
+        self._thread = threading.Thread(target=self._reader, name="capture", daemon=True)
+        self._thread.start()
+
+    def _reader(self):
+        """Background loop: pull frames from the driver as fast as they arrive"""
+        while self._running:
+            success, frame = self.cap.read()
+            capture_time = time.perf_counter()
+
+            with self._condition:
+                if not success:
+                    self._failed = True
+                    self._condition.notify_all()
+                    return
+                self.frames_captured += 1
+                self._frames.append((self.frames_captured, frame, capture_time))
+                self._condition.notify_all()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        """
+        Return the newest frame not yet handed out, waiting for one if needed
+
+        Returns:
+            tuple: (success, frame, capture_time) with capture_time from time.perf_counter()
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._has_new_frame() or self._failed or not self._running,
+                timeout=self.read_timeout
+            )
+            if not self._has_new_frame():
+                return False, None, None
+
+            seq, frame, capture_time = self._frames[-1]
+            self.dropped_frames += seq - self._last_read_seq - 1
+            self._last_read_seq = seq
+            return True, frame, capture_time
+
+    def _has_new_frame(self):
+        return bool(self._frames) and self._frames[-1][0] > self._last_read_seq
+
+    def recent_frames(self):
+        """
+        Get the buffered history, oldest first
+
+        Returns:
+            list: (seq, frame, capture_time) tuples
+        """
+        with self._condition:
+            return list(self._frames)
+
+    def release(self):
+        """Stop the reader thread and release the camera once it's out of cap.read()"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+        self.cap.release()
+
+
+def _open_rgb_camera(index, width, height):
+    """
+    Open a V4L2 camera through a GStreamer pipeline that delivers RGB frames,
+    so no BGR→RGB conversion is needed before MediaPipe
+
+    Returns:
+        Opened cv2.VideoCapture, or None where this isn't available
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    match = re.search(r"GStreamer:\s+(\w+)", cv2.getBuildInformation())
+    if not match or match.group(1) != "YES":
+        return None
+
+    pipeline = (
+        f"v4l2src device=/dev/video{index} ! videoconvert ! "
+        f"video/x-raw,format=RGB,width={width},height={height} ! "
+        "appsink drop=true max-buffers=1 sync=false"
+    )
+    cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    return cap
+
+
+def open_capture(index=None, width=None, height=None, mode=None, buffer_size=None, rgb=None):
+    """
+    Open the camera and wrap it in the configured capture mode
+
+    Args:
+        index: Camera index, video file or MJPEG stream URL (defaults to config.CAMERA_INDEX)
+        width, height: Requested resolution (defaults to config values)
+        mode: "direct", "latest" or "ring" (defaults to config.CAPTURE_MODE)
+        buffer_size: Frames kept in "ring" mode (defaults to config.CAPTURE_BUFFER_SIZE)
+        rgb: Ask the backend for RGB frames where possible (defaults to config.CAPTURE_RGB);
+             check the result's color_order, this falls back to BGR
+
+    Returns:
+        DirectCapture, ThreadedCapture or MJPEGStreamCapture
+    """
+    index = config.CAMERA_INDEX if index is None else index
+    width = config.CAMERA_WIDTH if width is None else width
+    height = config.CAMERA_HEIGHT if height is None else height
+    mode = config.CAPTURE_MODE if mode is None else mode
+    buffer_size = config.CAPTURE_BUFFER_SIZE if buffer_size is None else buffer_size
+    rgb = config.CAPTURE_RGB if rgb is None else rgb
+
+    if mode not in CAPTURE_MODES:
+        raise ValueError(f"Unknown capture mode '{mode}', expected one of {CAPTURE_MODES}")
+
+    if is_stream_url(index):
+        # Has its own fetch and decode threads (newest frame only) whatever the capture mode
+        return MJPEGStreamCapture(index)
+
+    cap = _open_rgb_camera(index, width, height) if rgb else None
+    color_order = "RGB"
+    if cap is None:
+        color_order = "BGR"
+        cap = cv2.VideoCapture(index)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Keep the driver queue short so stale frames don't pile up behind us
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    if mode == "direct" or not cap.isOpened():
+        return DirectCapture(cap, color_order=color_order)
+    if mode == "latest":
+        return ThreadedCapture(cap, buffer_size=1, color_order=color_order)
+    return ThreadedCapture(cap, buffer_size=buffer_size, color_order=color_order)
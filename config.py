@@ -3,14 +3,95 @@ Configuration settings for hand-controlled mouse
 """
 
 # Camera settings
-CAMERA_INDEX = 1  # DroidCam found at index 1
+CAMERA_INDEX = None  # None = camera from the discovery cache (probed when missing or failing), an index to force
+                     # one, or an MJPEG stream URL such as "http://<phone-ip>:4747/video" (DroidCam)
+CAMERA_NAME = None   # When probing, prefer a device whose name contains this (e.g. "DroidCam"; Linux only)
+CAMERA_FALLBACK_INDEX = 1  # Without a name match, prefer this index when probing (1: DroidCam, the old default)
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
 
+# Camera discovery (discovery.py, find_camera.py)
+CAMERA_CACHE_PATH = "camera_cache.json"
+CAMERA_PROBE_INDICES = 11    # Probe indices 0..N-1, all in parallel
+CAMERA_PROBE_TIMEOUT = 5.0   # Seconds before a probe stuck in the driver is abandoned
+CAMERA_PROBE_RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+
+# Multi-camera capture (multicam.py): each camera captures and runs MediaPipe in its own process
+CAMERA_SOURCES = None         # e.g. [0, 2], or video files standing in for cameras; overrides CAMERA_INDEX
+FUSION_POLICY = "confidence"  # Per time slot, use the view with the most confident hand, or the most "visibility"
+FUSION_SLOT = 1 / 30          # Time slot length (seconds): at most one fused detection per slot
+FUSION_MAX_WAIT = 0.05        # Seconds past a slot's end to wait for a camera that is running behind
+
+# Capture settings
+CAPTURE_MODE = "latest"   # "direct" (read inline), "latest" (threaded, newest frame only) or "ring"
+CAPTURE_BUFFER_SIZE = 4   # Recent frames kept in "ring" mode
+CAPTURE_RGB = False       # Ask the camera backend for RGB frames (Linux + GStreamer), skipping the color conversion
+MIRROR_MODE = "landmarks" # "landmarks" (no image flip, landmarks mirrored where read) or "image" (flip every frame)
+
+# Network stream settings (CAMERA_INDEX set to an http:// URL)
+STREAM_CONNECT_TIMEOUT = 5.0   # Seconds to connect, and to wait on a stalled stream before reconnecting
+STREAM_READ_TIMEOUT = None     # Seconds read() waits for a frame before giving up, None = wait through reconnects
+STREAM_MAX_REDUCTION = 2       # Decode JPEGs at up to 1/2 size (4, 8 also possible; 1 = full size)
+STREAM_MIN_DECODE_WIDTH = 320  # ...but never narrower than this
+STREAM_BACKOFF_INITIAL = 0.5   # First reconnect delay (seconds), doubled after each failed attempt
+STREAM_BACKOFF_MAX = 8.0       # Longest reconnect delay
+
+# Runtime settings
+RUNTIME_MODE = "serial"   # "serial" (one loop) or "pipelined" (capture → inference → gesture/output workers)
+PIPELINE_QUEUE_SIZE = 2   # Frames buffered between pipeline stages
+PIPELINE_DROP_POLICIES = {
+    "inference": "drop_oldest",  # Camera frames waiting for MediaPipe: stay current
+    "output": "block",           # Detections waiting for gesture/output: never skip a click transition
+}
+STARTUP_MODE = "concurrent"  # "concurrent" (camera, mouse output and MediaPipe set up in parallel) or "serial"
+STARTUP_WARMUP = True        # Run one MediaPipe inference on a blank frame before the first camera frame
+
+# Process-pool inference (inference_pool.py): MediaPipe in worker processes, frames in shared memory
+INFERENCE_WORKERS = 0        # 0 = in this process; N = N worker processes, one core each (implies "pipelined")
+INFERENCE_AFFINITY = 4       # Consecutive frames pinned to one worker, so its hand tracking stays continuous
+INFERENCE_RING_SLOTS = None  # Frames in flight in the shared ring, None = workers × affinity + 2
+
+# Multi-session server (server.py): several cameras/users sharing one inference worker pool
+SERVER_SESSIONS = []          # e.g. [{"name": "desk", "source": 0}, {"name": "tv", "source": "http://...", "backend": "null", "slo": 0.2}]
+SERVER_WORKERS = 2            # Inference worker processes shared by all sessions
+SESSION_LATENCY_SLO = 0.1     # Capture-to-output latency target per frame (seconds); frames that can't make it are shed
+SESSION_MAX_IN_FLIGHT = 1     # Frames one session may have queued or in inference at once
+
 # MediaPipe settings
 MIN_DETECTION_CONFIDENCE = 0.5  # Balanced for stability
 MIN_TRACKING_CONFIDENCE = 0.7   # Higher for smoother tracking
 MAX_NUM_HANDS = 1  # Start with one hand for simplicity
+MODEL_COMPLEXITY = 1  # Hand landmark model: 0 = lite (faster), 1 = full (more accurate)
+
+# Adaptive quality governor: steps inference resolution / model complexity to hold TARGET_FPS
+QUALITY_GOVERNOR = False
+TARGET_FPS = 30
+QUALITY_LEVELS = [        # (input scale, model complexity), best quality first
+    (1.0, 1),
+    (1.0, 0),
+    (0.75, 0),
+    (0.5, 0),
+]
+GOVERNOR_WINDOW = 30            # Frames averaged before each decision
+GOVERNOR_DOWNGRADE_RATIO = 1.0  # Step down when average latency exceeds this fraction of the frame budget
+GOVERNOR_UPGRADE_RATIO = 0.6    # Step back up when it drops below this fraction
+GOVERNOR_UPGRADE_DWELL = 30     # Further frames it must stay below before stepping up; doubles each time a step up is undone
+
+# ROI inference: run MediaPipe on a crop around the previous frame's hand
+ROI_INFERENCE = False
+ROI_PADDING = 0.5        # Padding on each side of the hand box, as a fraction of its size
+ROI_MIN_SIZE = 160       # Minimum crop side in pixels
+ROI_EDGE_MARGIN = 0.05   # Re-center the crop when a landmark gets this close to its edge (normalized)
+ROI_MIN_SCORE = 0.8      # Fall back to the full frame below this hand confidence
+
+# Frame skipping: run MediaPipe on a subset of frames and predict the cursor in between
+FRAME_SKIP = False
+FRAME_SKIP_MAX = 2              # Most predicted frames between two detections
+FRAME_SKIP_SLOW_SPEED = 0.3     # Hand speed (frame widths/s) at or below which FRAME_SKIP_MAX is used
+FRAME_SKIP_FAST_SPEED = 1.5     # Hand speed at or above which every frame is inferred
+INFERENCE_BUDGET = None         # Max fraction of wall time spent in MediaPipe (e.g. 0.5), None = speed only
+PREDICTION_HISTORY = 4          # Recent detections the constant-velocity model is fitted to
+PREDICTION_MAX_AHEAD = 0.1      # Never extrapolate further than this past the last detection (seconds)
 
 # Screen settings (will be auto-detected)
 SCREEN_WIDTH = None  # Auto-detected at runtime
@@ -20,19 +101,51 @@ SCREEN_HEIGHT = None  # Auto-detected at runtime
 PINCH_THRESHOLD = 0.05  # Distance threshold for pinch detection (normalized)
 FIST_THRESHOLD = 0.1    # Distance threshold for fist detection
 SCROLL_THRESHOLD = 30   # Pixel movement threshold for scroll activation
+PINCH_RELEASE_THRESHOLD = None  # A pinch ends above this distance (hysteresis), None = PINCH_THRESHOLD
+GESTURE_HOLD_FRAMES = 1  # Consecutive frames a click pose must be held before it clicks
 
 # Smoothing settings
 SMOOTHING_FRAMES = 10   # Increased for smoother movement
 DEAD_ZONE = 8           # Reduced jitter
+KALMAN_PREDICTION = 1.0          # Fraction of capture-to-output latency the Kalman filter predicts ahead
+KALMAN_PROCESS_NOISE = 5000.0    # Acceleration noise (px²/s³): higher follows turns faster, lower is smoother
+KALMAN_MEASUREMENT_NOISE = 16.0  # Landmark jitter variance (px²)
+CURSOR_FILTER = "combined"  # Cursor filter from smoothing.FILTERS: "combined", "one_euro", "kalman" or "none"
+CURSOR_FILTER_PARAMS = {    # Constructor arguments per filter (positions are screen pixels)
+    "combined": {"window_size": SMOOTHING_FRAMES, "dead_zone": DEAD_ZONE},
+    "one_euro": {"min_cutoff": 1.0, "beta": 0.007, "d_cutoff": 1.0},
+    "kalman": {
+        "process_noise": KALMAN_PROCESS_NOISE,
+        "measurement_noise": KALMAN_MEASUREMENT_NOISE,
+        "prediction": KALMAN_PREDICTION,
+        "max_latency": 0.15,
+    },
+}
 
 # Mouse control settings
 MOUSE_SPEED_MULTIPLIER = 1.2  # Slightly slower for better control
+OUTPUT_BACKEND = "pyautogui"  # "pyautogui", "pynput", "xtest" (X11, python-xlib), "null" or "recording"
+OUTPUT_COALESCE_MOVES = True  # Pending cursor moves collapse to the newest; same-pixel moves are dropped
 SCROLL_SPEED = 20             # Scroll speed in pixels
 
 # Debug settings
 DEBUG_MODE = True       # Show debug window with landmarks
 SHOW_FPS = True        # Display FPS counter
 PRINT_GESTURES = True  # Print detected gestures to console
+RECORD_LANDMARKS_PATH = None  # e.g. "session.hlm" to record landmarks for replay.py
+REPLAY_LATENCY = 0.05         # Capture-to-output latency the Kalman filter compensates for in replay.py (seconds)
+RENDER_SINK = "window"   # Debug preview in hand_mouse.py: "none", "window" or "video"
+RENDER_FPS = 15          # Preview rate cap; rendering runs on its own thread
+RENDER_OUTPUT_PATH = "preview.mp4"  # "video" sink: .mp4/.avi file, or a directory for PNG frames
+
+# Metrics: per-stage latency histograms, frame/detection/click counters, per-thread CPU time
+METRICS = False
+METRICS_PORT = None           # e.g. 9464: Prometheus text at http://127.0.0.1:9464/metrics (JSON at /metrics.json)
+METRICS_LOG_PATH = None       # e.g. "metrics.jsonl": append a JSON snapshot every METRICS_LOG_INTERVAL seconds
+METRICS_LOG_INTERVAL = 10.0
+METRICS_BUCKETS = [           # Latency histogram bucket upper bounds (seconds)
+    0.0005, 0.001, 0.002, 0.005, 0.01, 0.015, 0.02, 0.033, 0.05, 0.075, 0.1, 0.2, 0.5, 1.0,
+]
 
 # Gesture cooldowns (in seconds)
 CLICK_COOLDOWN = 0.3    # Minimum time between clicks
@@ -0,0 +1,196 @@
+"""
+Cursor and click control driven by hand landmarks (no camera or GUI dependencies)
+"""
+
+import time
+import config
+from gesture_machine import DOWN, SCROLL, UP, GestureMachine
+from gestures import GestureDetector
+from prediction import MotionPredictor
+from smoothing import create_filter
+
+
+# Mouse call and console message per button gesture event; SCROLL events scroll by their amount
+BUTTON_ACTIONS = {
+    ("left_click", DOWN): ("mouseDown", "🖱️ Left Click DOWN"),
+    ("left_click", UP): ("mouseUp", "🖱️ Left Click UP"),
+    ("right_click", DOWN): ("rightClick", "🖱️ Right Click"),
+}
+
+
+class CursorController:
+    """Turns per-frame hand landmarks into cursor moves, clicks and scrolls"""
+
+    def __init__(self, screen_width, screen_height, mouse, alpha=0.5, print_gestures=None,
+                 filter_name=None, gestures=None, mirrored=True, filter_params=None):
+        """
+        Args:
+            screen_width, screen_height: Target screen size in pixels
+            mouse: Output with pyautogui's moveTo/mouseDown/mouseUp/rightClick/scroll API
+                   (an output.MouseInjector in the app)
+            alpha: Exponential smoothing factor for the "combined" position filter
+            print_gestures: Print gesture events (defaults to config.PRINT_GESTURES)
+            filter_name: Position filter from smoothing.FILTERS (defaults to config.CURSOR_FILTER)
+            gestures: Gesture table for the click/scroll state machine (defaults to gesture_table.default_gestures())
+            mirrored: True if landmarks come from a horizontally flipped frame (MIRROR_MODE "image", recordings),
+                      False if they are in camera coordinates
+            filter_params: Extra constructor arguments for the position filter (e.g. a fixed Kalman latency)
+        """
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.mouse = mouse
+        self.print_gestures = config.PRINT_GESTURES if print_gestures is None else print_gestures
+        self.mirrored = mirrored
+
+        # Initialize gesture detector and smoothing filter
+        self.gesture_detector = GestureDetector()
+        filter_name = config.CURSOR_FILTER if filter_name is None else filter_name
+        filter_params = dict(filter_params or {})
+        if filter_name == "combined":
+            filter_params.setdefault("alpha", alpha)
+        self.position_filter = create_filter(filter_name, **filter_params)
+
+        # Motion model over recent detections, moves the cursor on frames without inference
+        self.predictor = MotionPredictor()
+        self.hand_speed = None  # Frame widths/s from the last detection, None while no hand is tracked
+
+        # Click and scroll state: every gesture advances in one step per detection
+        self.gesture_machine = GestureMachine(gestures)
+
+    def normalized_to_screen(self, x, y):
+        """Scale normalized hand coordinates to (unsmoothed) screen pixels"""
+        # The cursor follows camera x: flip it back if the frame was flipped for the mirror view
+        if self.mirrored:
+            x = 1 - x
+        return x * self.screen_width, y * self.screen_height
+
+    def clamp_to_screen(self, screen_x, screen_y):
+        """Apply the speed multiplier and clamp to integer screen pixels"""
+        # Apply speed multiplier
+        screen_x *= config.MOUSE_SPEED_MULTIPLIER
+        screen_y *= config.MOUSE_SPEED_MULTIPLIER
+
+        # Clamp to screen bounds
+        screen_x = max(0, min(self.screen_width - 1, screen_x))
+        screen_y = max(0, min(self.screen_height - 1, screen_y))
+
+        return int(screen_x), int(screen_y)
+
+    def map_to_screen(self, x, y, timestamp=None):
+        """Map normalized hand coordinates to screen coordinates"""
+        screen_x, screen_y = self.normalized_to_screen(x, y)
+
+        # Apply smoothing
+        screen_x, screen_y = self.position_filter.update(screen_x, screen_y, timestamp)
+
+        return self.clamp_to_screen(screen_x, screen_y)
+
+    def handle_event(self, event):
+        """Turn a gesture event into mouse output"""
+        if event.kind == SCROLL:
+            self.mouse.scroll(event.amount)
+            if self.print_gestures:
+                print(f"📜 Scroll: {event.amount}")
+            return
+
+        action = BUTTON_ACTIONS.get((event.gesture, event.kind))
+        if action is None:
+            return
+        method, message = action
+        getattr(self.mouse, method)()
+        if self.print_gestures:
+            print(message)
+
+    def update(self, hand_landmarks, current_time=None):
+        """
+        Move the cursor and handle click/scroll gestures for one detected hand
+
+        Args:
+            hand_landmarks: MediaPipe hand landmarks
+            current_time: Capture timestamp, used for cooldowns and the cursor filter
+                          (defaults to time.perf_counter(), the capture clock)
+
+        Returns:
+            tuple: (x, y, left_distance, right_distance) with x, y the normalized index tip position
+        """
+        current_time = time.perf_counter() if current_time is None else current_time
+
+        # Evaluate every gesture detector in one pass over the landmarks
+        features = self.gesture_detector.compute_features(hand_landmarks)
+
+        # Get index finger position for cursor control
+        x, y, z = features.index_tip
+        self.predictor.add(current_time, x, y)
+        self.hand_speed = self.predictor.speed()
+        screen_x, screen_y = self.map_to_screen(x, y, current_time)
+
+        # Move cursor
+        self.mouse.moveTo(screen_x, screen_y)
+
+        # Left click (thumb + index pinch), right click (thumb + middle pinch), open-palm scroll
+        for event in self.gesture_machine.step(features.distances, features.points, current_time):
+            self.handle_event(event)
+
+        left_distance = features.pinch_distance
+        right_distance = features.right_pinch_distance
+        return x, y, left_distance, right_distance
+
+    def update_predicted(self, current_time):
+        """
+        Move the cursor to the predicted index tip position on a frame that skipped inference.
+        Clicks and scrolls are only ever decided on real detections.
+
+        Args:
+            current_time: Frame timestamp, on the same clock as the update() timestamps
+
+        Returns:
+            tuple: Predicted normalized (x, y), or None when no hand is being tracked
+        """
+        position = self.predictor.predict(current_time)
+        if position is None:
+            return None
+
+        screen_x, screen_y = self.map_to_screen(*position, current_time)
+        self.mouse.moveTo(screen_x, screen_y)
+        return position
+
+    def hand_lost(self):
+        """A detection ran and found no hand: stop predicting from the old trajectory"""
+        self.predictor.reset()
+        self.hand_speed = None
+
+
+class RecordingMouse:
+    """Mouse output that records calls instead of moving the real cursor"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.events = []  # (time, name, args)
+
+    def _record(self, name, *args):
+        self.events.append((self.clock(), name, args))
+
+    def moveTo(self, x, y):
+        self._record("moveTo", x, y)
+
+    def mouseDown(self):
+        self._record("mouseDown")
+
+    def mouseUp(self):
+        self._record("mouseUp")
+
+    def rightClick(self):
+        self._record("rightClick")
+
+    def scroll(self, amount):
+        self._record("scroll", amount)
+
+    def counts(self):
+        """
+        Returns:
+            dict: Number of recorded calls per event name
+        """
+        counts = {}
+        for _, name, _ in self.events:
+            counts[name] = counts.get(name, 0) + 1
+        return counts
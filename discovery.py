@@ -0,0 +1,292 @@
+"""
+Camera discovery: parallel device probing with a persistent profile cache
+
+Opening a camera index that has no device behind it can block for seconds,
+so every candidate index is probed at the same time on its own daemon thread
+and probes that haven't finished within the timeout are abandoned. Working
+devices are saved to a JSON cache (config.CAMERA_CACHE_PATH) together
+with the one in use, so the controller opens that device straight away
+on the next start (once it has sent a frame) and only probes again when
+it stops working.
+"""
+
+import json
+import os
+import threading
+import time
+
+import cv2
+import config
+from capture import open_capture
+
+
+CACHE_VERSION = 1
+
+
+def device_name(index, cap):
+    """
+    Human-readable device name
+
+    Uses the V4L2 name on Linux. Elsewhere OpenCV can't name devices, so this
+    is the capture backend's name ("MSMF", "DSHOW"), as list_camera_names.py
+    reports it, and matching config.CAMERA_NAME against it only works on Linux.
+    """
+    try:
+        with open(f"/sys/class/video4linux/video{index}/name", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return cap.getBackendName()
+
+
+def probe_camera(index, resolutions=None):
+    """
+    Open one camera index and measure it
+
+    Args:
+        index: Camera index
+        resolutions: (width, height) pairs to test (defaults to config.CAMERA_PROBE_RESOLUTIONS)
+
+    Returns:
+        dict: Device profile (index, name, backend, width, height, fps, resolutions,
+              open_latency_s, first_frame_latency_s, probed_at), or None if no frames arrive
+    """
+    resolutions = config.CAMERA_PROBE_RESOLUTIONS if resolutions is None else resolutions
+
+    start_time = time.perf_counter()
+    # Same backend selection as open_capture, so indices mean the same device
+    cap = cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened():
+            return None
+        open_latency = time.perf_counter() - start_time
+
+        success, frame = cap.read()
+        if not success or frame is None:
+            return None
+        first_frame_latency = time.perf_counter() - start_time
+        height, width = frame.shape[:2]
+
+        profile = {
+            "index": index,
+            "name": device_name(index, cap),
+            "backend": cap.getBackendName(),
+            "width": width,
+            "height": height,
+            "fps": round(cap.get(cv2.CAP_PROP_FPS), 2),
+            "resolutions": [],
+            "open_latency_s": round(open_latency, 4),
+            "first_frame_latency_s": round(first_frame_latency, 4),
+            "probed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+        # Drivers silently fall back to something else for sizes they don't support
+        for res_width, res_height in resolutions:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, res_width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, res_height)
+            success, frame = cap.read()
+            if success and frame is not None and frame.shape[1] == res_width and frame.shape[0] == res_height:
+                profile["resolutions"].append([res_width, res_height])
+        return profile
+    finally:
+        cap.release()
+
+
+def discover(indices=None, timeout=None, resolutions=None, probe=probe_camera):
+    """
+    Probe camera indices in parallel
+
+    Every probe starts at once on its own thread, so a single deadline
+    bounds each of them by `timeout`. Probes still blocked in the driver
+    after that are abandoned: their threads are daemons, so they don't hold
+    up interpreter exit either (a thread pool's would be joined at exit).
+
+    Args:
+        indices: Indices to probe (defaults to range(config.CAMERA_PROBE_INDICES))
+        timeout: Seconds per probe (defaults to config.CAMERA_PROBE_TIMEOUT)
+        resolutions: Passed to probe
+        probe: probe_camera or a stand-in with the same signature
+
+    Returns:
+        tuple: (profiles sorted by index, indices whose probe timed out)
+    """
+    indices = list(range(config.CAMERA_PROBE_INDICES) if indices is None else indices)
+    timeout = config.CAMERA_PROBE_TIMEOUT if timeout is None else timeout
+    if not indices:
+        return [], []
+
+    results = {}  # index -> (profile, error)
+
+    def run_probe(index):
+        try:
+            results[index] = (probe(index, resolutions), None)
+        except Exception as e:
+            results[index] = (None, e)
+
+    threads = [threading.Thread(target=run_probe, args=(index,), name=f"camera-probe-{index}", daemon=True)
+               for index in indices]
+    for thread in threads:
+        thread.start()
+    deadline = time.perf_counter() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.perf_counter()))
+    finished = dict(results)
+
+    profiles = []
+    for index, (profile, error) in finished.items():
+        if error is not None:
+            print(f"⚠️ Probe of camera {index} failed: {error}")
+        elif profile is not None:
+            profiles.append(profile)
+    return (sorted(profiles, key=lambda profile: profile["index"]),
+            sorted(index for index in indices if index not in finished))
+
+
+def select_device(profiles, name=None, index=None):
+    """
+    Pick the camera to use
+
+    Args:
+        profiles: Device profiles from discover()
+        name: Prefer the first device whose name contains this (case-insensitive)
+        index: Without a name match, prefer the device at this index
+
+    Returns:
+        dict: The chosen profile (lowest index otherwise), or None if there are none
+    """
+    if name:
+        for profile in profiles:
+            if name.lower() in profile["name"].lower():
+                return profile
+    for profile in profiles:
+        if profile["index"] == index:
+            return profile
+    return profiles[0] if profiles else None
+
+
+def load_cache(path=None):
+    """
+    Returns:
+        dict: {"version", "selected", "devices", "updated_at"}, or None if missing or unreadable
+    """
+    path = config.CAMERA_CACHE_PATH if path is None else path
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return None
+    return cache
+
+
+def save_cache(profiles, selected, path=None):
+    """Write the device profiles and the chosen index (atomically replacing the old cache)"""
+    path = config.CAMERA_CACHE_PATH if path is None else path
+    cache = {
+        "version": CACHE_VERSION,
+        "selected": selected,
+        "devices": profiles,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(temp_path, path)
+    return cache
+
+
+def cached_profile(cache):
+    """The selected device's profile from a loaded cache, or None"""
+    if cache is None:
+        return None
+    for profile in cache.get("devices", ()):
+        if profile.get("index") == cache.get("selected"):
+            return profile
+    return None
+
+
+def refresh_cache(name=None, path=None, index=None):
+    """
+    Probe all candidate devices, pick one and save the cache
+
+    Args:
+        name: Preferred device name (defaults to config.CAMERA_NAME)
+        index: Preferred index when no name matches (defaults to config.CAMERA_FALLBACK_INDEX)
+
+    Returns:
+        tuple: (chosen profile or None, all profiles)
+    """
+    name = config.CAMERA_NAME if name is None else name
+    index = config.CAMERA_FALLBACK_INDEX if index is None else index
+    profiles, timed_out = discover()
+    if timed_out:
+        print(f"⏱️ Camera probes timed out: {timed_out}")
+    profile = select_device(profiles, name, index)
+    if name and profile is not None and name.lower() not in profile["name"].lower():
+        print(f"⚠️ No camera named '{name}' (names are only known on Linux), using {profile['index']}")
+    save_cache(profiles, profile["index"] if profile is not None else None, path)
+    return profile, profiles
+
+
+def grab_frame(cap, timeout=None):
+    """
+    Read one frame from an opened capture, giving up after `timeout`
+
+    The read runs on a daemon thread: a device that opens but never sends a
+    frame blocks inside the driver, and is abandoned like a timed-out probe.
+
+    Args:
+        timeout: Seconds to wait (defaults to config.CAMERA_PROBE_TIMEOUT)
+
+    Returns:
+        bool: Whether a frame arrived, or None if the read is still blocked
+    """
+    timeout = config.CAMERA_PROBE_TIMEOUT if timeout is None else timeout
+    result = []
+    thread = threading.Thread(target=lambda: result.append(cap.read()[0]), name="camera-check", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return bool(result[0]) if result else None
+
+
+def open_camera(cache_path=None, open_function=open_capture):
+    """
+    Open the configured camera, using the discovery cache when no index is set
+
+    An explicit config.CAMERA_INDEX is always opened as is. Otherwise the
+    cached device is opened directly and trusted once it sends a frame
+    within config.CAMERA_PROBE_TIMEOUT. Only if that fails (or there is no
+    cache yet) are devices probed, preferring config.CAMERA_NAME, then the
+    name of the device that failed (it may have moved to another index),
+    then its index, or config.CAMERA_FALLBACK_INDEX on the first run.
+
+    Returns:
+        tuple: (capture from open_function, camera index), capture None if nothing works
+    """
+    if config.CAMERA_INDEX is not None:
+        return open_function(config.CAMERA_INDEX), config.CAMERA_INDEX
+
+    cache = load_cache(cache_path)
+    previous = cached_profile(cache)
+    if previous is not None:
+        cap = open_function(previous["index"])
+        received = grab_frame(cap) if cap.isOpened() else False
+        if received:
+            return cap, previous["index"]
+        if received is None:
+            # Still blocked in the driver: releasing it now would free the device under the read
+            print(f"⏱️ Cached camera {previous['index']} ({previous['name']}) sent no frame within "
+                  f"{config.CAMERA_PROBE_TIMEOUT:.0f}s, probing devices...")
+        else:
+            cap.release()
+            print(f"⚠️ Cached camera {previous['index']} ({previous['name']}) failed, probing devices...")
+    else:
+        print("🔍 No camera cache yet, probing devices...")
+
+    profile, profiles = refresh_cache(config.CAMERA_NAME or (previous or {}).get("name"), cache_path,
+                                      (previous or {}).get("index"))
+    if profile is None:
+        return None, None
+    print(f"🎥 Using camera {profile['index']} ({profile['name']}), "
+          f"{len(profiles)} found, cached in {config.CAMERA_CACHE_PATH if cache_path is None else cache_path}")
+    return open_function(profile["index"]), profile["index"]
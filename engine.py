@@ -0,0 +1,497 @@
+"""
+Hand mouse engine: camera → MediaPipe → gestures → mouse output, with an optional debug preview
+
+Shared by hand_mouse.py (preview window) and hand_mouse_no_gui.py (headless).
+The preview is drawn on its own thread from snapshots (see render.py), so
+the control path costs the same with or without it.
+
+MediaPipe is imported lazily (create_hands) and, in "concurrent" startup
+mode, loaded and warmed up while the camera and mouse output open on
+worker threads. With config.INFERENCE_WORKERS > 0 it runs in worker
+processes instead (inference_pool.py), which start up the same way.
+With config.CAMERA_SOURCES, every camera captures and runs MediaPipe in
+its own process and the engine acts on the fused best view (multicam.py).
+"""
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import config
+from discovery import open_camera
+from governor import QualityGovernor
+from inference_pool import InferencePool
+from metrics import Metrics, MetricsServer, SnapshotLogger
+from multicam import MultiCameraCapture
+from output import MouseInjector, create_backend, screen_size
+from pipeline import PipelineEngine
+from render import PreviewRenderer, RenderSnapshot
+from roi import ROIInference
+from session import HandSession
+from startup import StartupTimer
+from stream import MJPEGStreamCapture
+
+
+class HandMouseController:
+    """Main controller for hand-based mouse input"""
+
+    def __init__(self, sink=None, alpha=0.5, capture=None, backend=None):
+        """
+        Args:
+            sink: Preview sink from render.create_sink, or None to run headless
+            alpha: Exponential smoothing factor for the "combined" cursor filter
+            capture: Frame source to use instead of opening the configured camera (harnesses, tests)
+            backend: Output backend to use instead of config.OUTPUT_BACKEND
+        """
+        # Time-to-first-cursor breakdown, measured from the import of startup.py
+        self.startup = StartupTimer()
+
+        # MediaPipe in worker processes: one per camera with several cameras, else an optional pool
+        multicam = capture is None and bool(config.CAMERA_SOURCES)
+        pooled = config.INFERENCE_WORKERS > 0 and not multicam
+
+        # Adaptive quality: input downscale and model complexity follow measured latency
+        # (not with the pool: its workers' Hands instances are fixed at startup)
+        self.governor = QualityGovernor() if config.QUALITY_GOVERNOR and not (pooled or multicam) else None
+
+        # Optional per-stage latency histograms and counters (config.METRICS)
+        self.metrics = Metrics() if config.METRICS else None
+        self.metrics_server = None
+        self.metrics_logger = None
+        self.pipeline = None
+
+        # Camera, mouse output and MediaPipe don't depend on each other: in "concurrent" startup
+        # mode the first two open on worker threads while this thread loads the hand model
+        executor = None
+        if config.STARTUP_MODE == "concurrent":
+            executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+        try:
+            # Initialize camera from the discovery cache (frames are read on a background thread
+            # unless CAPTURE_MODE = "direct")
+            if multicam:
+                camera = self.start_task(executor, "camera", self.open_cameras)
+            elif capture is None:
+                camera = self.start_task(executor, "camera", open_camera)
+            else:
+                camera = self.start_task(None, "camera", lambda: (capture, type(capture).__name__))
+
+            # Mouse output: events are queued and injected on a dedicated thread (config.OUTPUT_BACKEND)
+            output = self.start_task(executor, "output", self.open_output, backend)
+
+            # Initialize MediaPipe Hands, or the worker processes running it (warmed up there)
+            self.hands = self.pool = None
+            if pooled:
+                self.pool = self.startup.timed("hands", self.start_pool)
+            elif not multicam:
+                self.hands = self.startup.timed(
+                    "hands", self.create_hands,
+                    self.governor.model_complexity if self.governor else config.MODEL_COMPLEXITY
+                )
+                if config.STARTUP_WARMUP:
+                    self.startup.timed("warmup", self.warm_up)
+
+            self.cap, self.camera_index = camera.result()
+            self.mouse, (self.screen_width, self.screen_height) = output.result()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if self.cap is None or not self.cap.isOpened():
+            self.mouse.stop()
+            if self.pool is not None:
+                self.pool.close()
+            if self.cap is None:
+                raise Exception("No working camera found (see find_camera.py)")
+            raise Exception(f"Could not open camera at index {self.camera_index}")
+
+        # Optionally run inference on a crop around the previous frame's hand (in-process inference only)
+        # Crops get their own Hands instance: MediaPipe's tracking is tied to the image geometry
+        self.roi = None
+        if config.ROI_INFERENCE and self.hands is not None:
+            self.roi = ROIInference(self.hands, self.create_hands(self.model_complexity))
+
+        # Per-user state: preprocessing, cursor filter, click/scroll flags, frame skipping, recording, FPS
+        self.session = HandSession(
+            self.mouse,
+            (self.screen_width, self.screen_height),
+            alpha=alpha,
+            color_order=self.cap.color_order,
+            metrics=self.metrics,
+            record_path=config.RECORD_LANDMARKS_PATH,
+            # Camera workers never flip frames, whatever the mirror mode
+            mirror="landmarks" if multicam else None
+        )
+
+        # Debug preview, rendered off the control path at config.RENDER_FPS
+        self.renderer = PreviewRenderer(sink).start() if sink is not None else None
+        self.interactive = sink is not None and sink.interactive
+
+        if self.metrics is not None:
+            self.start_metrics()
+
+        mode = "" if self.interactive else " (No GUI Mode)"
+        print(f"🖐️ Hand Mouse Controller initialized{mode}")
+        print(f"📺 Screen resolution: {self.screen_width}x{self.screen_height}")
+        print(f"🎥 Camera {self.camera_index} resolution: {config.CAMERA_WIDTH}x{config.CAMERA_HEIGHT}")
+        if self.pool is not None:
+            print(f"🧠 Inference: {self.pool.workers} worker processes, "
+                  f"{self.pool.affinity} consecutive frames each, {self.pool.ring.slots} shared frame slots")
+        print("\n✨ Controls:")
+        print("  • Move hand to control cursor")
+        print("  • Pinch (thumb + index) for left click")
+        print("  • Pinch (thumb + middle) for right click")
+        print("  • Move hand up/down with open palm to scroll")
+        print("  • Press 'q' in the preview window to quit" if self.interactive else "  • Press Ctrl+C to quit")
+        print("\n" + "="*50 + "\n")
+        self.startup.mark("ready")
+
+    def start_task(self, executor, name, function, *args):
+        """
+        Run a timed startup step on the executor, or inline when there is none
+
+        Returns:
+            Future: The step's result (already resolved when run inline)
+        """
+        if executor is not None:
+            return executor.submit(self.startup.timed, name, function, *args)
+        future = Future()
+        try:
+            future.set_result(self.startup.timed(name, function, *args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def open_output(self, backend=None):
+        """
+        Start the mouse injector on the given backend, or the configured one
+
+        Returns:
+            tuple: (MouseInjector, (screen_width, screen_height))
+        """
+        backend = create_backend() if backend is None else backend
+        mouse = MouseInjector(backend, metrics=self.metrics).start()
+        return mouse, screen_size(mouse.backend)
+
+    def start_metrics(self):
+        """Hook up counters owned by other components and start the endpoint / snapshot log"""
+        self.metrics.add_source(self.metric_counters)
+        if config.METRICS_PORT is not None:
+            self.metrics_server = MetricsServer(self.metrics).start()
+            print(f"📈 Metrics at {self.metrics_server.url}")
+        if config.METRICS_LOG_PATH:
+            self.metrics_logger = SnapshotLogger(self.metrics).start()
+            print(f"📈 Metrics snapshots every {self.metrics_logger.interval:.0f}s to {self.metrics_logger.path}")
+
+    def metric_counters(self):
+        """Counters kept by the capture source, pipeline and mouse injector, read at export time"""
+        dropped = self.cap.dropped_frames
+        if self.pipeline is not None:
+            dropped += self.pipeline.dropped_frames
+        return dict(self.session.output_counters(), dropped_frames=dropped)
+
+    def create_hands(self, model_complexity):
+        """Build the MediaPipe Hands graph for a given model complexity"""
+        import mediapipe as mp  # Deferred: the heaviest import, overlapped with camera startup
+        self.mp_hands = mp.solutions.hands
+        self.model_complexity = model_complexity
+        return self.mp_hands.Hands(
+            min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE,
+            max_num_hands=config.MAX_NUM_HANDS,
+            model_complexity=model_complexity
+        )
+
+    def open_cameras(self):
+        """
+        Start a capture + MediaPipe worker process per configured camera
+
+        Returns:
+            tuple: (MultiCameraCapture, description of the sources)
+        """
+        cameras = MultiCameraCapture().start()
+        return cameras, ", ".join(str(source) for source in cameras.sources)
+
+    def start_pool(self):
+        """Spawn the inference worker processes and wait until their models are loaded"""
+        return InferencePool().start()
+
+    def warm_up(self):
+        """Run one inference on a blank frame so the first camera frame doesn't pay for graph setup"""
+        scale = self.governor.scale if self.governor is not None else 1.0
+        height = max(1, int(round(config.CAMERA_HEIGHT * scale)))
+        width = max(1, int(round(config.CAMERA_WIDTH * scale)))
+        self.hands.process(np.zeros((height, width, 3), dtype=np.uint8))
+
+    def update_quality(self, latency):
+        """Feed one frame's latency to the quality governor and apply any level change"""
+        if self.governor is None or not self.governor.record(latency):
+            return
+
+        if self.governor.model_complexity != self.model_complexity:
+            self.hands.close()
+            self.hands = self.create_hands(self.governor.model_complexity)
+            if self.roi is not None:
+                self.roi.crop_hands.close()
+                self.roi.hands = self.hands
+                self.roi.crop_hands = self.create_hands(self.governor.model_complexity)
+
+        # Crop coordinates refer to the old input size
+        if self.roi is not None:
+            self.roi.reset()
+
+    def calculate_fps(self):
+        """Calculate and update FPS"""
+        # The preview window shows FPS itself
+        if self.session.calculate_fps() and config.SHOW_FPS and not self.interactive:
+            quality = f" ({self.governor.describe()})" if self.governor is not None else ""
+            print(f"📊 FPS: {self.session.current_fps}{quality}")
+
+    def process_frame(self, frame, results, capture_time=None):
+        """
+        Process a single frame with hand detection results
+
+        Returns:
+            tuple: (x, y, left_distance, right_distance) of the last hand, or None
+        """
+        if self.startup.mark("first_frame"):
+            self.startup.report()
+
+        cursor_state = self.session.process_frame(results, capture_time)
+
+        if cursor_state is not None and self.startup.mark("first_cursor"):
+            print(f"⏱️ Time to first cursor: {self.startup.events['first_cursor'] * 1000:.0f} ms")
+
+        return cursor_state
+
+    def predict_frame(self, capture_time):
+        """
+        Move the cursor along the predicted path on a frame without inference
+
+        Returns:
+            tuple: (x, y, None, None), or None when no hand is tracked
+        """
+        return self.session.predict_frame(capture_time)
+
+    def publish(self, frame, mirrored, results=None, cursor_state=None):
+        """Hand the latest frame and detections to the preview renderer (no drawing here)"""
+        if self.renderer is None:
+            return
+        hands = (results.multi_hand_landmarks or ()) if results is not None else ()
+        quality = self.governor.describe() if self.governor is not None else None
+        self.renderer.submit(RenderSnapshot(frame, mirrored, hands, cursor_state, self.session.current_fps, quality,
+                                            color_order=self.cap.color_order,
+                                            hands_mirrored=self.session.preprocessor.mirrors_image))
+
+    @property
+    def quit_requested(self):
+        return self.renderer is not None and self.renderer.quit_requested.is_set()
+
+    def preprocess(self, frame, out=None):
+        """
+        Prepare a camera frame for MediaPipe
+
+        Args:
+            out: Array to write the RGB frame into (an inference pool slot), None = reused buffer
+
+        Returns:
+            tuple: (display_frame, rgb_frame); rgb_frame is a reused buffer, or `out`
+        """
+        return self.session.preprocess(frame, out)
+
+    def should_infer(self, capture_time):
+        """Frame skipping: True if MediaPipe should run on this frame, False to predict the cursor"""
+        return self.session.should_infer(capture_time)
+
+    def detect(self, rgb_frame):
+        """Run MediaPipe on a frame (downscaled by the governor, through the ROI crop when enabled)"""
+        start_time = time.perf_counter()
+        if self.governor is not None and self.governor.scale != 1.0:
+            # Landmarks are normalized, so inference resolution doesn't change their scale
+            rgb_frame = self.session.preprocessor.resize(rgb_frame, self.governor.scale)
+
+        if self.roi is not None:
+            results = self.roi.process(rgb_frame)
+        else:
+            results = self.hands.process(rgb_frame)
+        return self.session.finish_inference(results, start_time, time.perf_counter() - start_time)
+
+    def infer(self, packet):
+        """Inference stage: preprocess a pipeline packet and run MediaPipe on it"""
+        if not self.should_infer(packet.capture_time):
+            # Skipped frame: packet.results stays None and the output stage predicts the cursor
+            return
+
+        start_time = time.perf_counter()
+        packet.frame, packet.rgb_frame = self.preprocess(packet.frame)
+        packet.results = self.detect(packet.rgb_frame)
+        self.update_quality(time.perf_counter() - start_time)
+
+    def submit(self, packet):
+        """Pool inference stage: convert the frame into a shared ring slot and queue it for a worker"""
+        if not self.should_infer(packet.capture_time):
+            return
+
+        slot = None
+        while slot is None:
+            if self.pipeline is not None and not self.pipeline.running:
+                return
+            # All slots in flight: wait here, so the inference queue's drop policy applies upstream
+            slot = self.pool.acquire_slot(timeout=0.1)
+
+        packet.frame, _ = self.preprocess(packet.frame, out=self.pool.view(slot, packet.frame.shape))
+        self.pool.submit(packet.seq, slot, packet.frame.shape)
+        packet.pending = True
+
+    def finish_pooled(self, packet, duration):
+        """Reorder stage: a pooled frame's results are back, in frame order"""
+        self.session.finish_inference(packet.results, time.perf_counter() - duration, duration)
+
+    def handle_packet(self, packet):
+        """Gesture/output stage: act on a pipeline packet's detections"""
+        if packet.results is None:
+            cursor_state = self.predict_frame(packet.capture_time)
+            self.publish(packet.frame, False, cursor_state=cursor_state)
+        else:
+            cursor_state = self.process_frame(packet.frame, packet.results, packet.capture_time)
+            self.publish(packet.frame, self.session.preprocessor.mirrors_image, packet.results, cursor_state)
+        self.record_frame(packet.capture_time)
+        self.calculate_fps()
+
+    def record_frame(self, capture_time):
+        """Metrics: count a finished frame and its capture-to-output latency"""
+        self.session.record_frame(capture_time)
+
+    def run(self):
+        """Main loop"""
+        print("🚀 Starting hand mouse controller...")
+        print("👋 Show your hand to the camera!\n")
+
+        try:
+            if isinstance(self.cap, MultiCameraCapture):
+                self.run_fused()
+            elif config.RUNTIME_MODE == "pipelined" or self.pool is not None:
+                self.run_pipelined()
+            else:
+                self.run_serial()
+
+        except KeyboardInterrupt:
+            print("\n⚠️ Interrupted by user")
+
+        finally:
+            self.cleanup()
+
+    def run_serial(self):
+        """Read, infer and act on each frame in turn on the calling thread"""
+        while not self.quit_requested:
+            read_start = time.perf_counter()
+            success, frame, capture_time = self.cap.read()
+            if not success:
+                print("❌ Failed to read from camera")
+                break
+
+            frame_start = time.perf_counter()
+            if self.metrics is not None:
+                self.metrics.observe("capture", frame_start - read_start)
+            if self.should_infer(capture_time):
+                frame, rgb_frame = self.preprocess(frame)
+
+                # Process frame with MediaPipe
+                results = self.detect(rgb_frame)
+
+                # Process detections
+                cursor_state = self.process_frame(frame, results, capture_time)
+
+                self.update_quality(time.perf_counter() - frame_start)
+                self.publish(frame, self.session.preprocessor.mirrors_image, results, cursor_state)
+            else:
+                # Between detections: move the cursor along the predicted path, no MediaPipe
+                cursor_state = self.predict_frame(capture_time)
+                self.publish(frame, False, cursor_state=cursor_state)
+
+            self.record_frame(capture_time)
+            # Calculate FPS
+            self.calculate_fps()
+
+    def run_fused(self):
+        """Multi-camera: act on the best view of each time slot (the camera workers ran MediaPipe)"""
+        # Camera images stay in their worker processes; the preview draws landmarks on a blank frame
+        canvas = np.zeros((config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3), dtype=np.uint8)
+        while not self.quit_requested:
+            success, view, capture_time = self.cap.read()
+            if not success:
+                print("❌ Cameras stopped delivering frames")
+                break
+
+            cursor_state = self.process_frame(canvas, view.results, capture_time)
+            self.publish(canvas, False, view.results, cursor_state)
+            self.record_frame(capture_time)
+            self.calculate_fps()
+
+    def run_pipelined(self):
+        """Run capture, inference and gesture/output on separate workers until one of them stops"""
+        if self.pool is not None:
+            engine = PipelineEngine(self.cap, self.submit, self.handle_packet, pool=self.pool,
+                                    finish=self.finish_pooled)
+        else:
+            engine = PipelineEngine(self.cap, self.infer, self.handle_packet)
+        self.pipeline = engine
+        engine.start()
+
+        try:
+            while not engine.wait(0.1) and not self.quit_requested:
+                pass
+        finally:
+            engine.stop()
+            engine.join()
+            print(f"🧵 Pipeline: {engine.frames_processed} frames processed, "
+                  f"{engine.dropped_frames} dropped between stages")
+            if self.pool is not None:
+                print(f"🧠 Inference pool: frames per worker {self.pool.frames_per_worker}, "
+                      f"up to {engine.max_in_flight} frames in flight")
+
+    def cleanup(self):
+        """Cleanup resources"""
+        print("\n🧹 Cleaning up...")
+        self.cap.release()
+        self.session.close()
+        print(f"🖱️ Mouse events: {self.mouse.events_injected} injected, "
+              f"{self.mouse.moves_coalesced} moves coalesced, {self.mouse.moves_suppressed} suppressed "
+              f"({self.mouse.max_pending} max pending)")
+        if self.renderer is not None:
+            self.renderer.stop()
+            print(f"🖼️ Preview: {self.renderer.frames_rendered} frames rendered, "
+                  f"{self.renderer.snapshots_replaced} skipped by the rate cap")
+        if self.roi is not None:
+            stats = self.roi.stats()
+            print(f"✂️ ROI crops: {stats['crop_hits']} hits, {stats['crop_misses']} misses, "
+                  f"{stats['tracking_resets']} tracking resets, {stats['pixel_ratio']:.0%} of pixels processed")
+        scheduler, recorder = self.session.scheduler, self.session.recorder
+        if scheduler is not None:
+            print(f"⏭️ Frame skipping: {scheduler.predicted_frames} predicted, "
+                  f"{scheduler.inferred_frames} inferred ({scheduler.skip_ratio():.0%} skipped)")
+        if recorder is not None:
+            print(f"💾 Recorded {recorder.frame_count} frames to {recorder.path}")
+        print(f"🎞️ Frames dropped by capture: {self.cap.dropped_frames}")
+        if self.metrics is not None:
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            if self.metrics_logger is not None:
+                self.metrics_logger.stop()
+            stages = self.metrics.snapshot()["stages"]
+            print("📈 Stage latency (mean, p95 bucket): " + ", ".join(
+                f"{name} {stats['mean_ms']:.1f}/≤{stats['p95_le_ms']} ms"
+                for name, stats in stages.items() if stats["count"]))
+        if isinstance(self.cap, MultiCameraCapture):
+            fusion = self.cap.fusion
+            print(f"🎥 Cameras: {fusion.slots_fused} slots fused, best view per camera {fusion.views_used}, "
+                  f"detections per camera {self.cap.frames_captured}, {fusion.late_detections} too late")
+        if isinstance(self.cap, MJPEGStreamCapture):
+            print(f"📡 Stream: {self.cap.frames_received} JPEGs received, {self.cap.decode_errors} undecodable, "
+                  f"{self.cap.reconnects} reconnects")
+        if self.pool is not None:
+            self.pool.close()
+        if self.hands is not None:
+            self.hands.close()
+        if self.roi is not None:
+            self.roi.crop_hands.close()
+        print("✅ Cleanup complete")
@@ -3,38 +3,40 @@ Script to find all available camera indices
 """
 
 import cv2
+import config
+from discovery import discover, save_cache, select_device
 
 print("🔍 Searching for available cameras...\n")
-print("This may take a moment...\n")
+print(f"Probing indices 0-{config.CAMERA_PROBE_INDICES - 1} in parallel...\n")
 
-available_cameras = []
+profiles, timed_out = discover()
+found = {profile['index']: profile for profile in profiles}
 
-# Check indices 0-10
-for index in range(11):
-    print(f"Checking index {index}...", end=" ")
-    cap = cv2.VideoCapture(index)
-    
-    if cap.isOpened():
-        # Try to read a frame to verify it really works
-        ret, frame = cap.read()
-        if ret:
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
-            
-            print(f"✅ FOUND! Resolution: {width}x{height}, FPS: {fps}")
-            available_cameras.append({
-                'index': index,
-                'width': width,
-                'height': height,
-                'fps': fps
-            })
-        else:
-            print("⚠️  Opened but cannot read frames")
-        cap.release()
+for index in range(config.CAMERA_PROBE_INDICES):
+    print(f"Index {index}: ", end="")
+    if index in found:
+        profile = found[index]
+        print(f"✅ FOUND! {profile['name']} - Resolution: {profile['width']}x{profile['height']}, "
+              f"FPS: {profile['fps']:.0f}, first frame after {profile['first_frame_latency_s'] * 1000:.0f} ms")
+    elif index in timed_out:
+        print(f"⏱️  No answer within {config.CAMERA_PROBE_TIMEOUT:.0f}s")
     else:
         print("❌ Not available")
 
+available_cameras = [
+    {
+        'index': profile['index'],
+        'width': profile['width'],
+        'height': profile['height'],
+        'fps': int(profile['fps'])
+    }
+    for profile in profiles
+]
+
+# The controller starts from this cache (when config.CAMERA_INDEX is None)
+selected = select_device(profiles, config.CAMERA_NAME, config.CAMERA_FALLBACK_INDEX)
+save_cache(profiles, selected['index'] if selected else None)
+
 print("\n" + "="*60)
 
 if available_cameras:
@@ -46,7 +48,8 @@ if available_cameras:
         print(f"      FPS: {cam['fps']}")
         print()
     
-    print("📝 To use a specific camera, edit config.py:")
+    print(f"💾 Saved to {config.CAMERA_CACHE_PATH}; the controller will use index {selected['index']}")
+    print("📝 To force a specific camera, edit config.py:")
     print(f"   CAMERA_INDEX = {available_cameras[0]['index']}  # Change this number\n")
     
     # Test first camera
@@ -0,0 +1,212 @@
+"""
+Table-driven gesture state machine: every gesture advances in one vectorized step per frame
+
+Gestures are rows of a declarative table (gesture_table.default_gestures):
+the landmark pairs they watch, the distance threshold those pairs must
+cross, a release threshold for hysteresis, how many frames the pose must be
+held, a cooldown and the gestures that suppress it. GestureMachine compiles
+the table into arrays and bitmasks once; each frame, every pose is then
+evaluated by the same few numpy operations over the FEATURE_PAIRS distance
+vector (see gestures.pair_distances), however many gestures there are, and
+the events come out typed (DOWN, UP, SCROLL) for the cursor controller to
+act on.
+
+Two kinds of gesture:
+  - "button": a DOWN event when the pose is entered (and held, and out of
+    cooldown), an UP event when it is left
+  - "scroll": while the pose is held, SCROLL events as a tracked landmark
+    coordinate moves past a threshold
+"""
+
+import numpy as np
+from gesture_table import Gesture, default_gestures  # noqa: F401  (Gesture re-exported for callers)
+
+
+# Event kinds
+DOWN = "down"
+UP = "up"
+SCROLL = "scroll"
+
+
+class GestureEvent:
+    """A gesture's DOWN, UP or SCROLL (with a scroll amount) on one frame"""
+
+    __slots__ = ("gesture", "kind", "amount")
+
+    def __init__(self, gesture, kind, amount=None):
+        self.gesture = gesture
+        self.kind = kind
+        self.amount = amount
+
+    def __eq__(self, other):
+        return isinstance(other, GestureEvent) and \
+            (self.gesture, self.kind, self.amount) == (other.gesture, other.kind, other.amount)
+
+    def __repr__(self):
+        amount = "" if self.amount is None else f", {self.amount}"
+        return f"GestureEvent({self.gesture!r}, {self.kind!r}{amount})"
+
+
+def _bit_indices(bits):
+    """Indices of the set bits of a gesture bitmask, lowest (first in the table) first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class GestureMachine:
+    """
+    A gesture table compiled to arrays and bitmasks, stepped once per frame
+
+    Every frame, all poses are evaluated together: one gather of the pair
+    distances, one threshold comparison, one per-gesture count. Gesture
+    state (in pose, pressed, ...) is kept as bitmasks, so the follow-up work
+    only touches the gestures in play: those whose pose just changed, and
+    those that could emit an event.
+    """
+
+    def __init__(self, gestures=None):
+        """
+        Args:
+            gestures: List of Gesture (default_gestures())
+        """
+        self.gestures = default_gestures() if gestures is None else list(gestures)
+        self.names = [gesture.name for gesture in self.gestures]
+        index = {name: i for i, name in enumerate(self.names)}
+        if len(index) != len(self.names):
+            raise ValueError("Gesture names must be unique")
+
+        # One row per (gesture, pair), grouped by gesture. Thresholds are stored sign-flipped for
+        # "above" gestures, so every row's test is `signed distance < signed threshold`
+        rows = [(i, column, gesture) for i, gesture in enumerate(self.gestures) for column in gesture.columns]
+        self._columns = np.array([column for _, column, _ in rows], dtype=np.intp)
+        self._owner = np.array([i for i, _, _ in rows], dtype=np.intp)
+        self._sign = np.array([1.0 if gesture.below else -1.0 for _, _, gesture in rows])
+        self._press = self._sign * [gesture.threshold for _, _, gesture in rows]
+        self._release = self._sign * [gesture.release for _, _, gesture in rows]
+        self._row_starts = np.searchsorted(self._owner, np.arange(len(self.gestures)))
+        self._min_pairs = np.array([gesture.min_pairs for gesture in self.gestures])
+
+        # Bit i of every mask is gesture i
+        self._button_bits = sum(1 << i for i, gesture in enumerate(self.gestures) if gesture.kind == "button")
+        self._scroll_bits = sum(1 << i for i, gesture in enumerate(self.gestures) if gesture.kind == "scroll")
+        self._blocks = [0] * len(self.gestures)  # Gestures each gesture blocks
+        for i, gesture in enumerate(self.gestures):
+            for name in gesture.blocked_by:
+                if name not in index:
+                    raise ValueError(f"Gesture {gesture.name!r} is blocked by unknown gesture {name!r}")
+                self._blocks[index[name]] |= 1 << i
+        self._blocker_bits = sum(1 << i for i, blocks in enumerate(self._blocks) if blocks)
+
+        groups = sorted({gesture.cooldown_group for gesture in self.gestures})
+        self._group = [groups.index(gesture.cooldown_group) for gesture in self.gestures]
+        self._group_count = len(groups)
+        self.reset()
+
+    def reset(self):
+        """Forget every pose, pressed button, scroll anchor and cooldown"""
+        self.on = 0        # Gestures in their pose on the last frame (after hysteresis)
+        self.acting = 0    # In the pose and not blocked
+        self.pressed = 0   # Button gestures between DOWN and UP
+        self.frame = 0
+        self._since = [0] * len(self.gestures)       # Frame each gesture started acting
+        self._anchor = [None] * len(self.gestures)   # Scroll gestures: tracked coordinate at the last scroll check
+        self.last_event = [0.0] * self._group_count  # Per cooldown group
+        self._on_bytes = bytes(len(self.gestures))
+        self._row_thresholds = self._press.copy()
+        self._update_candidates()
+
+    def is_pressed(self, name):
+        return bool(self.pressed >> self.names.index(name) & 1)
+
+    def _pose_changed(self, on_flags):
+        """Gestures entered or left their pose: switch thresholds (hysteresis), blocking and hold counts"""
+        self._on_bytes = on_flags.tobytes()
+        self.on = on = int.from_bytes(np.packbits(on_flags, bitorder="little").tobytes(), "little")
+        self._row_thresholds = np.where(on_flags[self._owner], self._release, self._press)
+
+        blocked = 0
+        for i in _bit_indices(on & self._blocker_bits):
+            blocked |= self._blocks[i]
+        for i in _bit_indices(blocked & self._scroll_bits):
+            self._anchor[i] = None
+
+        acting = on & ~blocked
+        for i in _bit_indices(acting & ~self.acting):
+            self._since[i] = self.frame
+        self.acting = acting
+        self._update_candidates()
+
+    def _update_candidates(self):
+        """Gestures that could emit an event: held buttons not yet down, released buttons, active scrolls"""
+        self._candidates = ((self._button_bits & self.acting & ~self.pressed) | (self.pressed & ~self.on)
+                            | (self._scroll_bits & self.acting))
+
+    def step(self, distances, points, current_time):
+        """
+        Advance every gesture by one frame
+
+        Args:
+            distances: (len(FEATURE_PAIRS),) pair distances of the frame (HandFeatures.distances)
+            points: (21, 3) landmark array of the frame
+            current_time: Frame timestamp for cooldowns
+
+        Returns:
+            list: GestureEvents in table order (usually empty)
+        """
+        self.frame += 1
+
+        # Poses: each row against its entry or release threshold, then pairs passing per gesture
+        rows_on = distances[self._columns] * self._sign < self._row_thresholds
+        on_flags = np.add.reduceat(rows_on, self._row_starts, dtype=np.intp) >= self._min_pairs
+        if on_flags.tobytes() != self._on_bytes:
+            self._pose_changed(on_flags)
+        on = self.on
+
+        events = []
+        if not self._candidates:
+            return events
+
+        fired_groups = 0
+        pressed = self.pressed
+        for i in _bit_indices(self._candidates):
+            bit = 1 << i
+            gesture = self.gestures[i]
+            if pressed & bit and not on & bit:
+                pressed ^= bit
+                events.append(GestureEvent(gesture.name, UP))
+                continue
+
+            group = self._group[i]
+            if (self.frame - self._since[i] + 1 < gesture.hold_frames
+                    or current_time - self.last_event[group] <= gesture.cooldown):
+                continue
+
+            if gesture.kind == "scroll":
+                # Compare the tracked coordinate with the last position seen out of cooldown
+                landmark, axis = gesture.track
+                position = float(points[landmark, axis])
+                anchor, self._anchor[i] = self._anchor[i], position
+                if anchor is None:
+                    continue
+                moved = (position - anchor) * gesture.scale
+                if abs(moved) <= gesture.move_threshold:
+                    continue
+
+            # A shared cooldown lets only the first gesture in table order act on a frame
+            if fired_groups >> group & 1:
+                continue
+            fired_groups |= 1 << group
+            self.last_event[group] = current_time
+            if gesture.kind == "scroll":
+                # Negative for natural scrolling: moving the hand up scrolls down
+                events.append(GestureEvent(gesture.name, SCROLL, -int(moved / gesture.step)))
+            else:
+                pressed |= bit
+                events.append(GestureEvent(gesture.name, DOWN))
+
+        if pressed != self.pressed:
+            self.pressed = pressed
+            self._update_candidates()
+        return events
@@ -0,0 +1,130 @@
+"""
+The gesture table: landmark ids, the landmark pairs gestures are measured
+on, and one Gesture row per gesture with its thresholds and timing
+
+Both the per-frame gesture flags (gestures.GestureDetector) and the click
+and scroll state machine (gesture_machine.GestureMachine) read their poses
+from default_gestures().
+"""
+
+import numpy as np
+import config
+
+
+# Landmark ids
+WRIST = 0
+THUMB_TIP = 4
+INDEX_MCP, INDEX_TIP = 5, 8
+MIDDLE_MCP, MIDDLE_TIP = 9, 12
+RING_MCP, RING_TIP = 13, 16
+PINKY_MCP, PINKY_TIP = 17, 20
+
+EXTENDED_THRESHOLD = 0.15  # Tip-to-MCP distance above which a finger counts as extended
+BENT_THRESHOLD = 0.12      # Tip-to-MCP distance below which a finger counts as bent
+
+# Every landmark pair any detector needs, gathered in a single vectorized pass
+FEATURE_PAIRS = np.array([
+    (THUMB_TIP, INDEX_TIP),    # 0: left-click pinch
+    (THUMB_TIP, MIDDLE_TIP),   # 1: right-click pinch
+    (WRIST, THUMB_TIP),        # 2-6: fist (fingertips to palm)
+    (WRIST, INDEX_TIP),
+    (WRIST, MIDDLE_TIP),
+    (WRIST, RING_TIP),
+    (WRIST, PINKY_TIP),
+    (INDEX_MCP, INDEX_TIP),    # 7-10: finger extension (pointing / scroll pose)
+    (MIDDLE_MCP, MIDDLE_TIP),
+    (RING_MCP, RING_TIP),
+    (PINKY_MCP, PINKY_TIP),
+])
+
+KINDS = ("button", "scroll")
+
+
+class Gesture:
+    """One row of the gesture table"""
+
+    __slots__ = ("name", "kind", "pairs", "columns", "below", "threshold", "release", "min_pairs", "hold_frames",
+                 "cooldown", "cooldown_group", "blocked_by", "track", "scale", "step", "move_threshold")
+
+    def __init__(self, name, kind, pairs, below=None, above=None, release=None, min_pairs=None, hold_frames=1,
+                 cooldown=0.0, cooldown_group=None, blocked_by=(), track=(WRIST, 1), scale=1.0, step=1.0,
+                 move_threshold=0.0):
+        """
+        Args:
+            name: Gesture name, carried by its events
+            kind: "button" (DOWN/UP events) or "scroll" (SCROLL events while the pose is held)
+            pairs: Landmark id pairs whose distances define the pose (each must be in FEATURE_PAIRS)
+            below / above: The pose holds when a pair's distance is below / above this threshold
+            release: Threshold to leave the pose once in it (hysteresis), None = same as entering
+            min_pairs: Pairs that must pass for the pose to hold, None = all of them
+            hold_frames: Consecutive frames in the pose before it acts
+            cooldown: Seconds after an event of the cooldown group before the next DOWN/SCROLL
+            cooldown_group: Gestures sharing a cooldown (default: the gesture's own name)
+            blocked_by: Gestures whose pose keeps this one from acting (a scroll also loses its anchor)
+            track: Scroll: (landmark id, axis) of the normalized coordinate that scrolls
+            scale: Scroll: factor from that coordinate to the units of move_threshold and step
+            step: Scroll: movement per scroll unit
+            move_threshold: Scroll: movement since the last position needed to scroll
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown gesture kind {kind!r}, expected one of {list(KINDS)}")
+        if (below is None) == (above is None):
+            raise ValueError(f"Gesture {name!r} needs exactly one of below/above")
+        self.name = name
+        self.kind = kind
+        self.pairs = [tuple(pair) for pair in pairs]
+        self.columns = np.array([pair_column(pair) for pair in self.pairs], dtype=np.intp)  # In FEATURE_PAIRS
+        self.below = below is not None
+        self.threshold = below if self.below else above
+        self.release = self.threshold if release is None else release
+        self.min_pairs = len(self.pairs) if min_pairs is None else min_pairs
+        self.hold_frames = max(1, hold_frames)
+        self.cooldown = cooldown
+        self.cooldown_group = name if cooldown_group is None else cooldown_group
+        self.blocked_by = tuple(blocked_by)
+        self.track = track
+        self.scale = scale
+        self.step = step
+        self.move_threshold = move_threshold
+
+    def pose(self, distances):
+        """
+        Whether the pose holds on its entering threshold alone (no hysteresis, hold frames or cooldown)
+
+        Args:
+            distances: FEATURE_PAIRS distances of one frame, or (T, NUM_PAIRS) for many
+
+        Returns:
+            numpy.bool_, or a (T,) bool array
+        """
+        values = np.asarray(distances)[..., self.columns]
+        passed = values < self.threshold if self.below else values > self.threshold
+        return np.count_nonzero(passed, axis=-1) >= self.min_pairs
+
+
+def default_gestures():
+    """The cursor controller's gestures, with thresholds from config"""
+    pinch_release = config.PINCH_RELEASE_THRESHOLD
+    return [
+        # Thumb + index pinch holds the left button; thumb + middle pinch right-clicks
+        Gesture("left_click", "button", [(THUMB_TIP, INDEX_TIP)], below=config.PINCH_THRESHOLD,
+                release=pinch_release, hold_frames=config.GESTURE_HOLD_FRAMES,
+                cooldown=config.CLICK_COOLDOWN, cooldown_group="click"),
+        Gesture("right_click", "button", [(THUMB_TIP, MIDDLE_TIP)], below=config.PINCH_THRESHOLD,
+                release=pinch_release, hold_frames=config.GESTURE_HOLD_FRAMES,
+                cooldown=config.CLICK_COOLDOWN, cooldown_group="click"),
+        # Open palm (3+ fingers extended) scrolls with the wrist's vertical movement, unless pinching
+        Gesture("scroll", "scroll",
+                [(INDEX_MCP, INDEX_TIP), (MIDDLE_MCP, MIDDLE_TIP), (RING_MCP, RING_TIP), (PINKY_MCP, PINKY_TIP)],
+                above=EXTENDED_THRESHOLD, min_pairs=3, cooldown=config.SCROLL_COOLDOWN,
+                blocked_by=("left_click", "right_click"), track=(WRIST, 1), scale=config.CAMERA_HEIGHT,
+                step=10, move_threshold=config.SCROLL_THRESHOLD),
+    ]
+
+
+def pair_column(pair):
+    """Index of a landmark pair (either order) in FEATURE_PAIRS"""
+    for column, (a, b) in enumerate(FEATURE_PAIRS.tolist()):
+        if (a, b) == pair or (b, a) == pair:
+            return column
+    raise ValueError(f"Landmark pair {pair} is not in gestures.FEATURE_PAIRS")
@@ -0,0 +1,113 @@
+"""
+Adaptive quality governor: trades inference resolution and model size for frame rate
+"""
+
+from collections import deque
+
+import config
+
+
+class QualityGovernor:
+    """
+    Watches per-frame latency against a target FPS and steps through
+    quality levels (input downscale factor, MediaPipe model complexity).
+
+    Decisions are made on the average of a full window of frames, and the
+    step-up threshold sits well below the step-down threshold. That gap alone
+    can't stop flapping when adjacent levels differ in cost by more than it
+    (the cheap level sits under the step-up threshold, the dear one over the
+    step-down threshold), so stepping up also waits for a dwell time, doubled
+    every time a step up has to be undone and reset once one holds.
+    """
+
+    def __init__(self, target_fps=None, levels=None, window=None,
+                 downgrade_ratio=None, upgrade_ratio=None, upgrade_dwell=None, start_level=0):
+        """
+        Args:
+            target_fps: Frame rate to sustain (config.TARGET_FPS)
+            levels: (scale, model_complexity) tuples, best quality first (config.QUALITY_LEVELS)
+            window: Frames averaged per decision (config.GOVERNOR_WINDOW)
+            downgrade_ratio: Step down above this fraction of the frame budget
+            upgrade_ratio: Step up below this fraction of the frame budget
+            upgrade_dwell: Further frames below upgrade_ratio before stepping up (config.GOVERNOR_UPGRADE_DWELL)
+            start_level: Index into levels to start from
+        """
+        self.target_fps = config.TARGET_FPS if target_fps is None else target_fps
+        self.levels = list(config.QUALITY_LEVELS if levels is None else levels)
+        self.window = config.GOVERNOR_WINDOW if window is None else window
+        self.downgrade_ratio = config.GOVERNOR_DOWNGRADE_RATIO if downgrade_ratio is None else downgrade_ratio
+        self.upgrade_ratio = config.GOVERNOR_UPGRADE_RATIO if upgrade_ratio is None else upgrade_ratio
+        self.upgrade_dwell = config.GOVERNOR_UPGRADE_DWELL if upgrade_dwell is None else upgrade_dwell
+
+        self.budget = 1.0 / self.target_fps
+        self.level_index = start_level
+        self.switches = []  # (from_index, to_index, average_latency)
+        self.dwell = self.upgrade_dwell  # Current step-up dwell, after backoff
+
+        self._latencies = deque(maxlen=self.window)
+        self._calm_frames = 0  # Consecutive decisions below the step-up threshold
+        self._frames_at_level = 0
+        self._upgraded_from = None  # Level of the last step up, until it holds
+
+    @property
+    def level(self):
+        """Current (scale, model_complexity)"""
+        return self.levels[self.level_index]
+
+    @property
+    def scale(self):
+        return self.level[0]
+
+    @property
+    def model_complexity(self):
+        return self.level[1]
+
+    def describe(self, index=None):
+        """Short label for overlays and logs, e.g. 'Q2/4 75% c0'"""
+        index = self.level_index if index is None else index
+        scale, complexity = self.levels[index]
+        return f"Q{index + 1}/{len(self.levels)} {scale:.0%} c{complexity}"
+
+    def record(self, latency):
+        """
+        Add one frame's processing time and switch level if needed
+
+        Args:
+            latency: Seconds spent on the frame
+
+        Returns:
+            bool: True if the quality level changed
+        """
+        self._latencies.append(latency)
+        self._frames_at_level += 1
+        if self._upgraded_from is not None and self._frames_at_level > self.window + self.dwell:
+            # The step up lasted as long as it was waited for: forget the backoff
+            self._upgraded_from = None
+            self.dwell = self.upgrade_dwell
+        if len(self._latencies) < self.window:
+            return False
+
+        average = sum(self._latencies) / len(self._latencies)
+        self._calm_frames = self._calm_frames + 1 if average < self.budget * self.upgrade_ratio else 0
+        new_index = self.level_index
+        if average > self.budget * self.downgrade_ratio and self.level_index < len(self.levels) - 1:
+            new_index = self.level_index + 1
+        elif self._calm_frames > self.dwell and self.level_index > 0:
+            new_index = self.level_index - 1
+
+        if new_index == self.level_index:
+            return False
+
+        print(f"⚙️ Quality {self.describe()} → {self.describe(new_index)} "
+              f"(avg {average * 1000:.1f}ms, budget {self.budget * 1000:.1f}ms)")
+        self.switches.append((self.level_index, new_index, average))
+        if new_index == self._upgraded_from:
+            # The level above can't be held: wait twice as long before trying it again
+            self.dwell *= 2
+        self._upgraded_from = self.level_index if new_index < self.level_index else None
+        self.level_index = new_index
+        # Judge the new level on its own frames only
+        self._latencies.clear()
+        self._calm_frames = 0
+        self._frames_at_level = 0
+        return True
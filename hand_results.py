@@ -0,0 +1,50 @@
+"""
+MediaPipe hand results built from landmark arrays, for the stand-ins of
+mp.solutions.hands.Hands in tests, benchmarks and the latency harness
+"""
+
+from inference_pool import RESULT_FIELDS, message_types
+
+
+def landmark_list(points):
+    """
+    Args:
+        points: (21, 2) or (21, 3) normalized landmarks (z defaults to 0)
+
+    Returns:
+        NormalizedLandmarkList: A real MediaPipe landmark message holding the points
+    """
+    hand = message_types()[0]()
+    for point in points.tolist():
+        hand.landmark.add(x=point[0], y=point[1], z=point[2] if len(point) > 2 else 0.0)
+    return hand
+
+
+def handedness(label, score):
+    """
+    Returns:
+        ClassificationList: A real MediaPipe handedness message with one label
+    """
+    classification = message_types()[2]()
+    classification.classification.add(label=label, score=score)
+    return classification
+
+
+class HandResults:
+    """Same attributes and protobuf messages as MediaPipe's hand results"""
+
+    __slots__ = RESULT_FIELDS
+
+    def __init__(self, hands=(), labels=None, scores=None):
+        """
+        Args:
+            hands: Landmark arrays, one per detected hand (see landmark_list); empty = no hand
+            labels: Handedness label per hand (default "Right")
+            scores: Handedness score per hand (default 1.0)
+        """
+        labels = ["Right"] * len(hands) if labels is None else labels
+        scores = [1.0] * len(hands) if scores is None else scores
+        # MediaPipe reports "no hands" as None rather than an empty list
+        self.multi_hand_landmarks = [landmark_list(points) for points in hands] or None
+        self.multi_hand_world_landmarks = None
+        self.multi_handedness = [handedness(label, score) for label, score in zip(labels, scores)] or None
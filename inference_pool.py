@@ -0,0 +1,336 @@
+"""
+Process-pool MediaPipe inference over a shared-memory frame ring
+
+One Hands instance keeps one core busy. InferencePool runs several, each
+in its own worker process. The parent converts every camera frame straight
+into a slot of a multiprocessing.shared_memory ring (the color conversion
+it does anyway writes there), so the only messages per frame are a
+(seq, slot, shape) task and the serialized landmarks coming back: pixels
+are never pickled or copied between processes.
+
+MediaPipe Hands tracks from the previous frame's landmarks, so frames are
+pinned to workers in runs of config.INFERENCE_AFFINITY consecutive frames:
+within a run a worker tracks frame to frame, and at the start of its next
+run it picks up from where its last run ended. Results arrive in whatever
+order the workers finish; the pipeline puts them back in frame order
+(see PipelineEngine).
+
+Several independent video streams can share one pool (server.py): each
+stream is pinned to one worker, which keeps a separate Hands instance per
+stream so tracking never mixes two cameras.
+"""
+
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+from queue import Empty
+
+import numpy as np
+import config
+
+
+# MediaPipe result fields shipped back from the workers
+RESULT_FIELDS = ("multi_hand_landmarks", "multi_hand_world_landmarks", "multi_handedness")
+
+
+def create_hands(options):
+    """Default worker hands factory: a MediaPipe Hands graph built from keyword options"""
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(**options)
+
+
+def hands_options(model_complexity=None):
+    """
+    Hands() keyword arguments from config, passed to the workers explicitly: spawned
+    processes re-import config.py and would not see settings changed at runtime
+    """
+    return {
+        "min_detection_confidence": config.MIN_DETECTION_CONFIDENCE,
+        "min_tracking_confidence": config.MIN_TRACKING_CONFIDENCE,
+        "max_num_hands": config.MAX_NUM_HANDS,
+        "model_complexity": config.MODEL_COMPLEXITY if model_complexity is None else model_complexity,
+    }
+
+
+def encode_results(results):
+    """Serialize hand results for the trip to the parent (a few hundred bytes per hand)"""
+    return tuple([item.SerializeToString() for item in getattr(results, name, None) or ()]
+                 for name in RESULT_FIELDS)
+
+
+def message_types():
+    """Protobuf message classes for RESULT_FIELDS (importing them loads mediapipe)"""
+    from mediapipe.framework.formats import classification_pb2, landmark_pb2
+    return (landmark_pb2.NormalizedLandmarkList, landmark_pb2.LandmarkList, classification_pb2.ClassificationList)
+
+
+class PooledResults:
+    """Hand results rebuilt in the parent: same attributes and protobuf messages as MediaPipe's"""
+
+    __slots__ = RESULT_FIELDS
+
+    def __init__(self, payload):
+        for name, message_type, items in zip(RESULT_FIELDS, message_types(), payload):
+            # MediaPipe reports "no hands" as None rather than an empty list
+            setattr(self, name, [message_type.FromString(item) for item in items] or None)
+
+
+class SharedFrameRing:
+    """
+    Fixed slots of RGB frame memory in a multiprocessing.shared_memory block
+
+    Each slot holds one frame of at most slot_bytes, stored contiguously from
+    the start of the slot so views of any smaller shape need no copy.
+    """
+
+    def __init__(self, slots, slot_bytes, name=None):
+        """
+        Args:
+            slots: Number of frames that can be in flight at once
+            slot_bytes: Capacity of one slot (height × width × 3 of the largest frame)
+            name: Attach to an existing ring (worker side) instead of creating one
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        if self.owner:
+            self._memory = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self.name = self._memory.name
+        self.array = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=self._memory.buf)
+
+        self._free = list(range(slots))
+        self._condition = threading.Condition()
+        self.closed = False
+
+    def view(self, slot, shape):
+        """(height, width, 3) uint8 view of a slot, no copy"""
+        return self.array[slot, :shape[0] * shape[1] * shape[2]].reshape(shape)
+
+    def fit(self, shape):
+        """
+        Returns:
+            tuple: `shape`, or the largest same-aspect shape that fits in a slot
+        """
+        height, width, channels = shape
+        if height * width * channels <= self.slot_bytes:
+            return shape
+        scale = (self.slot_bytes / (height * width * channels)) ** 0.5
+        return max(1, int(height * scale)), max(1, int(width * scale)), channels
+
+    def acquire(self, timeout=None):
+        """
+        Take a free slot, waiting for one while all are in flight
+
+        Returns:
+            int: Slot index, or None on timeout or once the ring is closed
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._free or self.closed, timeout=timeout)
+            if self.closed or not self._free:
+                return None
+            return self._free.pop()
+
+    def release(self, slot):
+        with self._condition:
+            self._free.append(slot)
+            self._condition.notify()
+
+    @property
+    def in_flight(self):
+        with self._condition:
+            return self.slots - len(self._free)
+
+    def close(self):
+        """Wake up waiting acquire() calls and free the memory (unlinked by the creating process)"""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+        del self.array
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
+
+
+def _worker_main(worker_id, ring_name, slots, slot_bytes, tasks, results, hands_factory, factory_args, warmup_shape):
+    """Worker process: build Hands instances (one per stream), then run them on ring slots until told to stop"""
+    ring = SharedFrameRing(slots, slot_bytes, name=ring_name)
+    streams = {}  # stream -> Hands
+
+    def hands_for(stream, warmup_shape=None):
+        hands = streams.get(stream)
+        if hands is None:
+            hands = streams[stream] = hands_factory(*factory_args)
+            if warmup_shape is not None:
+                hands.process(np.zeros(warmup_shape, dtype=np.uint8))
+        return hands
+
+    try:
+        hands_for(0, warmup_shape)
+        results.put(("ready", worker_id))
+
+        while True:
+            task = tasks.recv()
+            if task is None:
+                break
+            seq, slot, shape, stream = task
+            if slot is None:
+                hands_for(stream, shape)  # New stream announced: build and warm up its graph now
+                continue
+            hands = hands_for(stream)
+            start_time = time.perf_counter()
+            detections = hands.process(ring.view(slot, shape))
+            results.put(("result", worker_id, seq, slot, encode_results(detections),
+                         time.perf_counter() - start_time))
+    except EOFError:
+        pass  # Parent went away
+    except Exception as e:
+        results.put(("error", worker_id, f"{type(e).__name__}: {e}"))
+    finally:
+        for hands in streams.values():
+            hands.close()
+        ring.close()
+
+
+class InferencePool:
+    """MediaPipe Hands in worker processes, fed through a SharedFrameRing"""
+
+    def __init__(self, workers=None, affinity=None, slots=None, frame_shape=None,
+                 hands_factory=None, factory_args=None, warmup=None):
+        """
+        Args:
+            workers: Worker processes (config.INFERENCE_WORKERS)
+            affinity: Consecutive frames per worker before moving to the next (config.INFERENCE_AFFINITY)
+            slots: Frames in flight (config.INFERENCE_RING_SLOTS, None = workers × affinity + 2)
+            frame_shape: Largest frame a slot holds unscaled (default: configured camera size)
+            hands_factory: Picklable top-level callable building the per-worker Hands (create_hands)
+            factory_args: Arguments for hands_factory (default: (hands_options(),))
+            warmup: Run one inference on a blank frame in each worker before reporting ready
+                    (config.STARTUP_WARMUP)
+        """
+        self.workers = max(1, config.INFERENCE_WORKERS if workers is None else workers)
+        self.affinity = max(1, config.INFERENCE_AFFINITY if affinity is None else affinity)
+        slots = config.INFERENCE_RING_SLOTS if slots is None else slots
+        slots = self.workers * self.affinity + 2 if slots is None else slots
+        self.frame_shape = (config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3) if frame_shape is None else frame_shape
+        self.hands_factory = create_hands if hands_factory is None else hands_factory
+        self.factory_args = (hands_options(),) if factory_args is None else factory_args
+        self.warmup = config.STARTUP_WARMUP if warmup is None else warmup
+
+        self.ring = SharedFrameRing(slots, int(np.prod(self.frame_shape)))
+
+        # Counters
+        self.frames_submitted = 0
+        self.frames_per_worker = [0] * self.workers
+        self.inference_time = [0.0] * self.workers
+
+        self._context = multiprocessing.get_context("spawn")  # MediaPipe graphs don't survive fork
+        self._results = self._context.Queue()
+        self._tasks = []
+        self._processes = []
+
+    def start(self, timeout=60.0):
+        """Spawn the workers and wait until each has built (and warmed up) its Hands instance"""
+        for worker_id in range(self.workers):
+            receiver, sender = self._context.Pipe(duplex=False)
+            process = self._context.Process(
+                target=_worker_main, name=f"inference-{worker_id}", daemon=True,
+                args=(worker_id, self.ring.name, self.ring.slots, self.ring.slot_bytes, receiver, self._results,
+                      self.hands_factory, self.factory_args, self.frame_shape if self.warmup else None))
+            process.start()
+            receiver.close()
+            self._tasks.append(sender)
+            self._processes.append(process)
+
+        message_types()  # Load the protobuf types while the workers start
+        deadline = time.perf_counter() + timeout
+        ready = 0
+        while ready < self.workers:
+            message = self._next_message(max(0.0, deadline - time.perf_counter()))
+            if message is None:
+                self.close()
+                raise RuntimeError(f"Inference workers not ready after {timeout:.0f}s")
+            ready += 1
+        return self
+
+    def worker_for(self, index):
+        """Worker for the index-th submitted frame: runs of `affinity` frames, round-robin"""
+        return (index // self.affinity) % self.workers
+
+    def acquire_slot(self, timeout=None):
+        """Free ring slot to prepare the next frame into (None once the pool is closed)"""
+        return self.ring.acquire(timeout)
+
+    def view(self, slot, shape):
+        return self.ring.view(slot, self.ring.fit(shape))
+
+    def worker_for_stream(self, stream):
+        """Worker a separate stream is pinned to"""
+        return stream % self.workers
+
+    def open_stream(self, stream, shape=None):
+        """Have a stream's worker build (and warm up) its Hands instance before the first frame"""
+        shape = self.frame_shape if shape is None else shape
+        self._tasks[self.worker_for_stream(stream)].send((None, None, self.ring.fit(shape), stream))
+
+    def submit(self, seq, slot, shape, stream=None):
+        """
+        Queue the frame in `slot` for its worker; its result comes back from get_result()
+
+        Args:
+            seq: Frame id, returned with the result
+            stream: Separate video stream id (see open_stream), None = the pool's single stream
+        """
+        if stream is None:
+            worker_id, stream = self.worker_for(self.frames_submitted), 0
+        else:
+            worker_id = self.worker_for_stream(stream)
+        self._tasks[worker_id].send((seq, slot, self.ring.fit(shape), stream))
+        self.frames_submitted += 1
+
+    def get_result(self, timeout=None):
+        """
+        Next finished frame, in completion order; its ring slot is freed
+
+        Returns:
+            tuple: (seq, PooledResults, inference seconds), or None on timeout
+        """
+        message = self._next_message(timeout)
+        if message is None:
+            return None
+        worker_id, seq, slot, payload, duration = message[1:]
+        self.ring.release(slot)
+        self.frames_per_worker[worker_id] += 1
+        self.inference_time[worker_id] += duration
+        return seq, PooledResults(payload), duration
+
+    def _next_message(self, timeout):
+        """Next worker message; raises if a worker failed or died"""
+        try:
+            message = self._results.get(timeout=timeout)
+        except Empty:
+            for process in self._processes:
+                if not process.is_alive():
+                    raise RuntimeError(f"Inference worker {process.name} exited (code {process.exitcode})")
+            return None
+        if message[0] == "error":
+            raise RuntimeError(f"Inference worker {message[1]} failed: {message[2]}")
+        return message
+
+    def close(self, timeout=2.0):
+        """Stop the workers and free the shared memory"""
+        for sender in self._tasks:
+            try:
+                sender.send(None)
+                sender.close()
+            except OSError:
+                pass  # Worker already gone
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._results.close()
+        self._results.cancel_join_thread()
+        self.ring.close()
@@ -0,0 +1,507 @@
+"""
+End-to-end motion-to-cursor latency harness (headless)
+
+Plays a fingertip trajectory with known timestamps through the full engine
+in real time: paced capture → preprocessing → hand detection →
+gestures/filter → mouse injector thread → output backend. Every cursor
+move is recorded with the time the backend call returned, and the cursor
+path is cross-correlated with the input trajectory:
+
+    latency_ms        shift that best aligns the cursor with the fingertip
+    added_jitter_px   cursor jitter minus the jitter already in the input
+    error_px          RMS cursor distance from the (shifted, scaled) input
+
+for each filter × backend configuration. The cursor only moves once per
+frame, so the latency includes the average half-frame hold between moves,
+as a user watching the cursor would see it.
+
+Sources:
+    --synthetic          Blank frames and a scripted detector standing in for
+                         MediaPipe (fixed inference time, Gaussian landmark noise);
+                         needs no hand footage. The default.
+    --template hand.jpg  A photo of a hand moved along the trajectory, real
+                         MediaPipe; truth is the template's fingertip plus the offset.
+    --video clip.mp4     Recorded footage, real MediaPipe; truth is the index tip
+                         from an offline MediaPipe pass over every frame.
+
+Usage:
+    python latency_harness.py --filters combined one_euro kalman none
+    python latency_harness.py --template hand.jpg --backends recording xtest   # xtest: xvfb-run -a
+    python latency_harness.py --video clip.mp4 --runtime pipelined --output latency.json
+    python latency_harness.py --video clip.mp4 --roi --filters combined    # crop hit/miss counters
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+import cv2
+import numpy as np
+import config
+from benchmark_filters import centered_average
+from cursor_control import RecordingMouse
+from engine import HandMouseController
+from gestures import INDEX_TIP
+from hand_results import HandResults
+from output import RecordingBackend, create_backend
+from smoothing import FILTERS
+
+
+LAG_STEP = 0.001          # Cross-correlation resolution (seconds)
+JITTER_WINDOW = 5         # Frames in the centered average jitter is measured against
+
+# Pointing hand (index extended, other fingers curled, thumb well clear of both
+# pinch targets), as offsets from the index tip in normalized image coordinates
+POINTING_HAND = np.array([
+    (0.000, 0.300),                                                   # Wrist
+    (-0.050, 0.260), (-0.090, 0.220), (-0.110, 0.180), (-0.120, 0.150),  # Thumb
+    (-0.020, 0.150), (-0.010, 0.100), (0.000, 0.050), (0.000, 0.000),    # Index
+    (0.020, 0.150), (0.030, 0.120), (0.030, 0.160), (0.025, 0.180),      # Middle
+    (0.050, 0.160), (0.055, 0.130), (0.055, 0.170), (0.050, 0.190),      # Ring
+    (0.070, 0.180), (0.075, 0.160), (0.075, 0.190), (0.070, 0.210),      # Pinky
+])
+
+
+def trajectory(seconds, fps, amplitude=(0.15, 0.12)):
+    """
+    Fingertip offsets over time: two sines per axis plus a few fast sweeps
+
+    Returns:
+        tuple: (times from 0, (N, 2) normalized offsets)
+    """
+    t = np.arange(0, seconds, 1 / fps)
+    x = 0.7 * np.sin(2 * np.pi * 0.25 * t) + 0.3 * np.sin(2 * np.pi * 1.1 * t)
+    y = 0.8 * np.sin(2 * np.pi * 0.18 * t + 1.0) + 0.2 * np.sin(2 * np.pi * 0.9 * t)
+    return t, np.column_stack((amplitude[0] * x, amplitude[1] * y))
+
+
+def encode_index(frame, index):
+    """Stamp a frame number into the top-left pixels (gray, so channel order doesn't matter)"""
+    for position, shift in enumerate((16, 8, 0)):
+        frame[0, position] = (index >> shift) & 0xFF
+    return frame
+
+
+def decode_index(frame):
+    return (int(frame[0, 0, 0]) << 16) | (int(frame[0, 1, 0]) << 8) | int(frame[0, 2, 0])
+
+
+class ScriptedHands:
+    """
+    Stand-in for mp.solutions.hands.Hands: looks up the truth for the frame
+    number stamped into the image, adds landmark noise and takes a fixed time
+    """
+
+    def __init__(self, truth, noise=0.002, inference_time=0.015, seed=0):
+        """
+        Args:
+            truth: (N, 2) normalized index tip per frame (camera image coordinates)
+            noise: Landmark noise (standard deviation, normalized units)
+            inference_time: Seconds each process() call takes
+        """
+        self.truth = truth
+        self.noise = noise
+        self.inference_time = inference_time
+        self.rng = np.random.default_rng(seed)
+
+    def process(self, rgb_frame):
+        deadline = time.perf_counter() + self.inference_time
+        tip = self.truth[decode_index(rgb_frame)] + self.rng.normal(0, self.noise, 2)
+        points = tip + POINTING_HAND
+        while time.perf_counter() < deadline:
+            time.sleep(max(0.0, min(0.001, deadline - time.perf_counter())))
+        return HandResults([points])
+
+    def close(self):
+        pass
+
+
+class SyntheticSource:
+    """Blank frames with their number stamped in, detected by ScriptedHands"""
+
+    name = "synthetic"
+
+    def __init__(self, seconds=10.0, fps=30.0, noise=0.002, inference_time=0.015, size=(160, 120)):
+        self.fps = fps
+        self.times, offsets = trajectory(seconds, fps)
+        # Keeps the cursor inside the screen at MOUSE_SPEED_MULTIPLIER (no clamping)
+        self.truth = np.array([0.55, 0.4]) + offsets
+        self.noise = noise
+        self.inference_time = inference_time
+        self.size = size
+
+    def __len__(self):
+        return len(self.times)
+
+    def frame(self, index):
+        return encode_index(np.zeros((self.size[1], self.size[0], 3), dtype=np.uint8), index)
+
+    def hands(self):
+        return ScriptedHands(self.truth, self.noise, self.inference_time)
+
+
+def detect_tips(frames, model_complexity=None):
+    """
+    Index tip per frame from an offline MediaPipe pass (NaN where no hand)
+
+    Returns:
+        np.ndarray: (N, 2) normalized camera image coordinates
+    """
+    import mediapipe as mp
+
+    tips = np.full((len(frames), 2), np.nan)
+    with mp.solutions.hands.Hands(
+        min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
+        min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE,
+        max_num_hands=1,
+        model_complexity=config.MODEL_COMPLEXITY if model_complexity is None else model_complexity,
+    ) as hands:
+        for i, frame in enumerate(frames):
+            results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if results.multi_hand_landmarks:
+                tip = results.multi_hand_landmarks[0].landmark[INDEX_TIP]
+                tips[i] = (tip.x, tip.y)
+    return tips
+
+
+class TemplateSource:
+    """A hand photo translated along the trajectory, run through real MediaPipe"""
+
+    name = "template"
+
+    def __init__(self, path, seconds=10.0, fps=30.0):
+        self.template = cv2.imread(path)
+        if self.template is None:
+            raise ValueError(f"Could not read {path}")
+        self.fps = fps
+        self.times, self.offsets = trajectory(seconds, fps)
+        tip = detect_tips([self.template])[0]
+        if np.isnan(tip).any():
+            raise ValueError(f"No hand found in {path}")
+        self.truth = tip + self.offsets
+
+    def __len__(self):
+        return len(self.times)
+
+    def frame(self, index):
+        height, width = self.template.shape[:2]
+        dx, dy = self.offsets[index]
+        matrix = np.float32([[1, 0, dx * width], [0, 1, dy * height]])
+        return cv2.warpAffine(self.template, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE)
+
+    def hands(self):
+        return None
+
+
+class VideoSource:
+    """Recorded footage replayed at its frame rate, truth from an offline MediaPipe pass"""
+
+    name = "video"
+
+    def __init__(self, path, max_frames=900):
+        cap = cv2.VideoCapture(path)
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frames = []
+        while len(self.frames) < max_frames:
+            success, frame = cap.read()
+            if not success:
+                break
+            self.frames.append(frame)
+        cap.release()
+        if not self.frames:
+            raise ValueError(f"No frames in {path}")
+        self.times = np.arange(len(self.frames)) / self.fps
+        self.truth = detect_tips(self.frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame(self, index):
+        return self.frames[index]
+
+    def hands(self):
+        return None
+
+
+class PacedCapture:
+    """
+    Delivers a source's frames on the real clock, like a camera in "latest" mode:
+    a reader that falls behind gets the newest due frame and the rest are dropped
+    """
+
+    color_order = "BGR"
+
+    def __init__(self, source):
+        self.source = source
+        self.start = None  # perf_counter() of frame 0
+        self.frames_captured = 0
+        self.dropped_frames = 0
+        self._next = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        """
+        Returns:
+            tuple: (success, frame, capture_time) with capture_time the frame's scheduled time
+        """
+        if self.start is None:
+            self.start = time.perf_counter()
+        due = int((time.perf_counter() - self.start) * self.source.fps)
+        if due > self._next:
+            self.dropped_frames += min(due, len(self.source)) - self._next
+            self._next = due
+        if self._next >= len(self.source):
+            return False, None, None
+
+        index = self._next
+        capture_time = self.start + self.source.times[index]
+        delay = capture_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self._next += 1
+        self.frames_captured += 1
+        return True, self.source.frame(index), capture_time
+
+    def release(self):
+        pass
+
+
+class TimedBackend(RecordingMouse):
+    """Forwards every event to a real backend and records when the call returned"""
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def size(self):
+        return self.backend.size()
+
+    def _record(self, name, *args):
+        getattr(self.backend, name)(*args)
+        super()._record(name, *args)
+
+    def close(self):
+        if hasattr(self.backend, "close"):
+            self.backend.close()
+
+
+def make_backend(name):
+    return RecordingBackend() if name == "recording" else TimedBackend(create_backend(name))
+
+
+@contextlib.contextmanager
+def config_overrides(**values):
+    """Temporarily set config attributes"""
+    saved = {name: getattr(config, name) for name in values}
+    for name, value in values.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def zero_order_hold(event_times, values, times):
+    """Value of a step signal (last event at or before each time; first value before it)"""
+    indices = np.searchsorted(event_times, times, side="right") - 1
+    return values[np.clip(indices, 0, len(values) - 1)]
+
+
+def jitter(points):
+    """RMS distance of each point from the centered moving average of its neighbours"""
+    if len(points) < JITTER_WINDOW:
+        return float("nan")
+    residual = points - centered_average(points, JITTER_WINDOW)
+    return float(np.sqrt(np.mean(np.sum(residual ** 2, axis=1))))
+
+
+def analyze(input_times, truth, move_times, moves, min_lag=-0.1, max_lag=0.5):
+    """
+    Align the cursor path with the input trajectory by cross-correlation
+
+    Args:
+        input_times: perf_counter() time of each input sample (when the hand was there)
+        truth: (N, 2) normalized fingertip positions (NaN where unknown)
+        move_times: perf_counter() time of each cursor move
+        moves: (M, 2) cursor pixels
+        min_lag, max_lag: Lag search range in seconds
+
+    Returns:
+        dict: latency_ms, correlation, error_px, jitter_in_px, jitter_out_px, added_jitter_px
+    """
+    valid = ~np.isnan(truth).any(axis=1)
+    input_times, truth = input_times[valid], truth[valid]
+    if len(moves) < 2 or len(truth) < 2:
+        return {"latency_ms": None}
+
+    # Uniform grid over the part of the run where every lag has both signals
+    start = max(move_times[0], input_times[0] + max_lag)
+    end = min(move_times[-1], input_times[-1] + min_lag)
+    grid = np.arange(start, end, LAG_STEP)
+    if len(grid) < 10:
+        return {"latency_ms": None}
+    output = zero_order_hold(move_times, moves, grid)
+    output = output - output.mean(axis=0)
+
+    best_lag, best_score = None, -np.inf
+    for lag in np.arange(min_lag, max_lag + LAG_STEP / 2, LAG_STEP):
+        shifted = np.column_stack([np.interp(grid - lag, input_times, truth[:, axis]) for axis in range(2)])
+        shifted -= shifted.mean(axis=0)
+        # Variance-weighted squared correlation over both axes (sign-free: the cursor is mirrored)
+        covariance = np.sum(shifted * output, axis=0)
+        norms = np.sum(shifted ** 2, axis=0) * np.sum(output ** 2, axis=0)
+        score = np.sum(covariance ** 2 / np.where(norms > 0, norms, np.inf) * np.var(output, axis=0))
+        if score > best_score:
+            best_lag, best_score = lag, score
+
+    # Per-axis linear fit at the best lag maps normalized input to cursor pixels
+    shifted = np.column_stack([np.interp(grid - best_lag, input_times, truth[:, axis]) for axis in range(2)])
+    cursor = zero_order_hold(move_times, moves, grid)
+    gains, offsets, correlations = [], [], []
+    for axis in range(2):
+        gain, offset = np.polyfit(shifted[:, axis], cursor[:, axis], 1)
+        gains.append(gain)
+        offsets.append(offset)
+        correlations.append(abs(np.corrcoef(shifted[:, axis], cursor[:, axis])[0, 1]))
+    gains, offsets = np.array(gains), np.array(offsets)
+    error = cursor - (shifted * gains + offsets)
+
+    # Jitter per input frame: the cursor as it was `latency` after each frame
+    frame_times = input_times[(input_times + best_lag >= move_times[0]) & (input_times + best_lag <= move_times[-1])]
+    truth_px = np.column_stack([np.interp(frame_times, input_times, truth[:, axis]) for axis in range(2)])
+    truth_px = truth_px * gains + offsets
+    jitter_in = jitter(truth_px)
+    jitter_out = jitter(zero_order_hold(move_times, moves, frame_times + best_lag).astype(np.float64))
+
+    return {
+        "latency_ms": round(1000 * best_lag, 1),
+        "correlation": round(float(np.mean(correlations)), 4),
+        "error_px": round(float(np.sqrt(np.mean(np.sum(error ** 2, axis=1)))), 2),
+        "jitter_in_px": round(jitter_in, 2),
+        "jitter_out_px": round(jitter_out, 2),
+        "added_jitter_px": round(jitter_out - jitter_in, 2),
+    }
+
+
+def run_config(source, filter_name, backend_name, runtime="serial", verbose=False, roi=False):
+    """
+    Run the engine once over the source with one filter and backend
+
+    Args:
+        roi: Run MediaPipe on crops around the hand (config.ROI_INFERENCE); real MediaPipe sources only
+
+    Returns:
+        dict: Configuration, frame/move counts and analyze() results
+    """
+    backend = make_backend(backend_name)
+    capture = PacedCapture(source)
+    overrides = dict(
+        CURSOR_FILTER=filter_name, RUNTIME_MODE=runtime, STARTUP_MODE="serial",
+        MIRROR_MODE="landmarks", QUALITY_GOVERNOR=False, ROI_INFERENCE=roi,
+        RECORD_LANDMARKS_PATH=None, METRICS=False, PRINT_GESTURES=False,
+    )
+    # The engine prints its own banners and stats; keep the report readable
+    quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with config_overrides(**overrides), quiet:
+        controller = HandMouseController(sink=None, capture=capture, backend=backend)
+        scripted = source.hands()
+        if scripted is not None:
+            controller.hands.close()
+            controller.hands = scripted
+        try:
+            if runtime == "pipelined":
+                controller.run_pipelined()
+            else:
+                controller.run_serial()
+        finally:
+            controller.cleanup()
+
+    moves = [(t, args) for t, name, args in backend.events if name == "moveTo"]
+    result = {
+        "source": source.name,
+        "filter": filter_name,
+        "backend": backend_name,
+        "runtime": runtime,
+        "frames": capture.frames_captured,
+        "frames_dropped": capture.dropped_frames,
+        "moves": len(moves),
+        "other_events": {name: count for name, count in backend.counts().items() if name != "moveTo"},
+    }
+    if controller.roi is not None:
+        result["roi"] = controller.roi.stats()
+    if moves:
+        move_times = np.array([t for t, _ in moves])
+        positions = np.array([args for _, args in moves], dtype=np.float64)
+        result.update(analyze(capture.start + source.times, source.truth, move_times, positions))
+    else:
+        result["latency_ms"] = None
+    return result
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="End-to-end motion-to-cursor latency")
+    source_group = parser.add_mutually_exclusive_group()
+    source_group.add_argument("--synthetic", action="store_true", help="Scripted detector on blank frames (default)")
+    source_group.add_argument("--template", help="Hand photo to move along the trajectory")
+    source_group.add_argument("--video", help="Recorded video with a visible hand")
+    parser.add_argument("--filters", nargs="+", default=sorted(FILTERS), choices=sorted(FILTERS))
+    parser.add_argument("--backends", nargs="+", default=["recording"],
+                        help="Output backends (anything but 'recording' moves the real cursor)")
+    parser.add_argument("--runtime", choices=["serial", "pipelined"], default="serial")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Trajectory length (synthetic/template)")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate (synthetic/template)")
+    parser.add_argument("--inference-ms", type=float, default=15.0, help="Scripted detector time per frame")
+    parser.add_argument("--noise", type=float, default=0.002, help="Scripted landmark noise (normalized)")
+    parser.add_argument("--roi", action="store_true", help="Crop around the hand (template/video sources)")
+    parser.add_argument("--output", default=None, help="JSON report path")
+    parser.add_argument("--verbose", action="store_true", help="Show the engine's own output")
+    args = parser.parse_args()
+    if args.roi and not (args.video or args.template):
+        parser.error("--roi needs real MediaPipe: the scripted detector reads frame numbers off the full image")
+
+    if args.video:
+        source = VideoSource(args.video)
+    elif args.template:
+        source = TemplateSource(args.template, args.seconds, args.fps)
+    else:
+        source = SyntheticSource(args.seconds, args.fps, args.noise, args.inference_ms / 1000)
+
+    results = []
+    for backend_name in args.backends:
+        for filter_name in args.filters:
+            print(f"▶️ {filter_name} → {backend_name} ({args.runtime}, {source.name}, {len(source)} frames)...")
+            results.append(run_config(source, filter_name, backend_name, args.runtime, args.verbose, args.roi))
+
+    print("\n" + "="*78)
+    print(f"{'Filter':<10}{'Backend':<11}{'latency ms':>11}{'corr':>8}{'error px':>10}"
+          f"{'jitter px':>11}{'added px':>10}{'dropped':>9}")
+    for result in results:
+        def cell(key, fmt):
+            value = result.get(key)
+            return "-" if value is None else format(value, fmt)
+        print(f"{result['filter']:<10}{result['backend']:<11}{cell('latency_ms', '.1f'):>11}"
+              f"{cell('correlation', '.3f'):>8}{cell('error_px', '.1f'):>10}{cell('jitter_out_px', '.2f'):>11}"
+              f"{cell('added_jitter_px', '+.2f'):>10}{result['frames_dropped']:>9}")
+    print("="*78)
+    for result in results:
+        if "roi" in result:
+            roi = result["roi"]
+            print(f"✂️ {result['filter']} → {result['backend']}: {roi['crop_hits']} crop hits, "
+                  f"{roi['crop_misses']} misses, {roi['full_frames']} full frames, "
+                  f"{roi['tracking_resets']} tracking resets, {roi['pixel_ratio']:.0%} of pixels processed")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"source": source.name, "frames": len(source), "results": results}, f, indent=2)
+        print(f"📝 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
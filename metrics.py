@@ -0,0 +1,389 @@
+"""
+Runtime metrics: per-stage latency histograms, counters and per-thread CPU time
+
+Stages record into fixed-bucket histograms (one bisect and two additions
+per observation, no allocation). Each histogram is written by a single
+thread, so updates take no lock; readers may see a snapshot that is one
+observation out of step, which is fine for monitoring. Metrics can be
+served on localhost in Prometheus text format (MetricsServer) and
+appended periodically to a JSON-lines log (SnapshotLogger). A MetricsGroup
+exports several Metrics (one per server session) as one, each series
+labelled with its member's name.
+"""
+
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+
+PREFIX = "hand_mouse"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds), Prometheus-style cumulative on export"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds=None):
+        """
+        Args:
+            bounds: Sorted bucket upper bounds in seconds (config.METRICS_BUCKETS); +Inf is implicit
+        """
+        self.bounds = list(config.METRICS_BUCKETS if bounds is None else bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last slot: above every bound
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Returns:
+            list: (upper bound, observations <= bound) pairs, ending with (inf, count)
+        """
+        pairs = []
+        total = 0
+        for bound, count in zip(self.bounds + [float("inf")], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None when empty)"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+def _windows_thread_cpu_time(native_id):
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenThread(0x0800, False, native_id)  # THREAD_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return None
+    try:
+        creation, exit_time, kernel, user = (wintypes.FILETIME() for _ in range(4))
+        if not kernel32.GetThreadTimes(handle, ctypes.byref(creation), ctypes.byref(exit_time),
+                                       ctypes.byref(kernel), ctypes.byref(user)):
+            return None
+        ticks = sum((t.dwHighDateTime << 32) + t.dwLowDateTime for t in (kernel, user))
+        return ticks * 100e-9  # FILETIME ticks are 100 ns
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def thread_cpu_time(thread):
+    """
+    CPU time (user + system) a Python thread has used so far
+
+    Returns:
+        float: Seconds, or None where the platform doesn't expose it
+    """
+    try:
+        if hasattr(time, "pthread_getcpuclockid"):
+            return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+        if sys.platform == "win32" and thread.native_id is not None:
+            return _windows_thread_cpu_time(thread.native_id)
+    except (OSError, ValueError, TypeError):
+        pass  # Thread exited between enumerate() and the query
+    return None
+
+
+def thread_cpu_times():
+    """
+    Returns:
+        dict: {thread name: CPU seconds} for live Python threads the platform can measure
+    """
+    times = {}
+    for thread in threading.enumerate():
+        cpu = thread_cpu_time(thread)
+        if cpu is not None:
+            times[thread.name] = cpu
+    return times
+
+
+class Metrics:
+    """
+    Latency histograms per stage plus named counters
+
+    Counters the engine owns elsewhere (capture drops, injected mouse events)
+    are pulled at export time through sources added with add_source().
+    """
+
+    def __init__(self, bounds=None):
+        self.bounds = list(config.METRICS_BUCKETS if bounds is None else bounds)
+        self.stages = {}    # name -> Histogram
+        self.counters = {}  # name -> int
+        self.started = time.time()
+        self._sources = []
+
+    def histogram(self, stage):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages.setdefault(stage, Histogram(self.bounds))
+        return histogram
+
+    def observe(self, stage, seconds):
+        """Record one latency sample for a stage"""
+        self.histogram(stage).observe(seconds)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_source(self, source):
+        """
+        Args:
+            source: Callable returning {counter name: value}, read at every export
+        """
+        self._sources.append(source)
+
+    def collect_counters(self):
+        counters = dict(self.counters)
+        for source in self._sources:
+            counters.update(source())
+        return counters
+
+    def thread_cpu_times(self):
+        return thread_cpu_times()
+
+    def stage_summary(self):
+        """
+        Returns:
+            dict: {stage: count, mean and p50/p95/p99 bucket bounds in milliseconds, cumulative buckets}
+        """
+        stages = {}
+        for name, histogram in list(self.stages.items()):
+            count = histogram.count
+            stages[name] = {
+                "count": count,
+                "mean_ms": round(1000 * histogram.sum / count, 3) if count else None,
+                "p50_le_ms": _ms(histogram.quantile(0.5)),
+                "p95_le_ms": _ms(histogram.quantile(0.95)),
+                "p99_le_ms": _ms(histogram.quantile(0.99)),
+                "buckets": {_bound_label(bound): total for bound, total in histogram.cumulative()},
+            }
+        return stages
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: JSON-ready view of every metric (latencies in milliseconds)
+        """
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "uptime_s": round(time.time() - self.started, 1),
+            "stages": self.stage_summary(),
+            "counters": self.collect_counters(),
+            "thread_cpu_s": {name: round(cpu, 3) for name, cpu in thread_cpu_times().items()},
+            "process_cpu_s": round(time.process_time(), 3),
+        }
+
+    def prometheus(self):
+        """
+        Returns:
+            str: Prometheus text exposition format (version 0.0.4)
+        """
+        return prometheus_text({None: self})
+
+
+class MetricsGroup:
+    """Several Metrics exported as one, each series labelled with its member's name"""
+
+    def __init__(self, label="session"):
+        """
+        Args:
+            label: Prometheus label (and snapshot key, pluralized) naming the members
+        """
+        self.label = label
+        self.members = {}  # name -> Metrics
+        self.started = time.time()
+
+    def add(self, name, metrics):
+        self.members[name] = metrics
+        return metrics
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Like Metrics.snapshot(), with stages and counters per member
+        """
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "uptime_s": round(time.time() - self.started, 1),
+            f"{self.label}s": {name: {"stages": metrics.stage_summary(), "counters": metrics.collect_counters()}
+                               for name, metrics in list(self.members.items())},
+            "thread_cpu_s": {name: round(cpu, 3) for name, cpu in thread_cpu_times().items()},
+            "process_cpu_s": round(time.process_time(), 3),
+        }
+
+    def prometheus(self):
+        return prometheus_text(dict(self.members), self.label)
+
+
+def _labels(pairs):
+    return ",".join(f'{key}="{value}"' for key, value in pairs)
+
+
+def prometheus_text(members, label=None):
+    """
+    Prometheus text exposition format (version 0.0.4) for one or more Metrics
+
+    Args:
+        members: {name: Metrics}; with no label, a single Metrics keyed by None
+        label: Label carrying each member's name on its series
+    """
+    scopes = [(metrics, [] if label is None else [(label, name)]) for name, metrics in members.items()]
+    lines = [
+        f"# HELP {PREFIX}_stage_latency_seconds Time spent in each stage per frame",
+        f"# TYPE {PREFIX}_stage_latency_seconds histogram",
+    ]
+    for metrics, scope in scopes:
+        for name, histogram in list(metrics.stages.items()):
+            series = scope + [("stage", name)]
+            for bound, total in histogram.cumulative():
+                bucket = _labels(series + [("le", _bound_label(bound))])
+                lines.append(f"{PREFIX}_stage_latency_seconds_bucket{{{bucket}}} {total}")
+            lines.append(f"{PREFIX}_stage_latency_seconds_sum{{{_labels(series)}}} {histogram.sum:.6f}")
+            lines.append(f"{PREFIX}_stage_latency_seconds_count{{{_labels(series)}}} {histogram.count}")
+
+    # Each counter family once, with every member's value under it
+    counters = [(metrics.collect_counters(), scope) for metrics, scope in scopes]
+    for name in sorted(set().union(*(values for values, _ in counters))):
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        for values, scope in counters:
+            if name in values:
+                series = f"{{{_labels(scope)}}}" if scope else ""
+                lines.append(f"{PREFIX}_{name}_total{series} {values[name]}")
+
+    lines.append(f"# HELP {PREFIX}_thread_cpu_seconds_total CPU time used by each Python thread")
+    lines.append(f"# TYPE {PREFIX}_thread_cpu_seconds_total counter")
+    for name, cpu in sorted(thread_cpu_times().items()):
+        lines.append(f'{PREFIX}_thread_cpu_seconds_total{{thread="{name}"}} {cpu:.6f}')
+    lines.append(f"# HELP {PREFIX}_process_cpu_seconds_total CPU time of the whole process, native threads included")
+    lines.append(f"# TYPE {PREFIX}_process_cpu_seconds_total counter")
+    lines.append(f"{PREFIX}_process_cpu_seconds_total {time.process_time():.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def _bound_label(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _ms(seconds):
+    if seconds is None:
+        return None
+    return "inf" if seconds == float("inf") else round(seconds * 1000, 3)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        metrics = self.server.metrics
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            body = metrics.prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps(metrics.snapshot(), indent=2).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    """Serves /metrics (Prometheus text) and /metrics.json on localhost"""
+
+    def __init__(self, metrics, port=None, host="127.0.0.1"):
+        """
+        Args:
+            metrics: Metrics or MetricsGroup to export
+            port: TCP port (config.METRICS_PORT); 0 picks a free one (see url)
+            host: Bind address, localhost only by default
+        """
+        port = config.METRICS_PORT if port is None else port
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.metrics = metrics
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+        self._server.server_close()
+
+
+class SnapshotLogger:
+    """Appends a JSON snapshot line to a file every `interval` seconds (and once more on stop)"""
+
+    def __init__(self, metrics, path=None, interval=None):
+        """
+        Args:
+            metrics: Metrics or MetricsGroup to log
+            path: JSON-lines file (config.METRICS_LOG_PATH)
+            interval: Seconds between snapshots (config.METRICS_LOG_INTERVAL)
+        """
+        self.metrics = metrics
+        self.path = config.METRICS_LOG_PATH if path is None else path
+        self.interval = config.METRICS_LOG_INTERVAL if interval is None else interval
+        self.snapshots_written = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="metrics-log", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.metrics.snapshot()) + "\n")
+        self.snapshots_written += 1
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                print(f"⚠️ Metrics log failed: {e}")
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self.write()
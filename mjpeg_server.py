@@ -0,0 +1,162 @@
+"""
+Stand-in MJPEG HTTP server with a DroidCam-style /video endpoint, for testing offline
+
+Serves a video file or a synthetic moving square as multipart/x-mixed-replace
+JPEGs. Connections can be cut after a number of frames to exercise the
+stream source's reconnects.
+
+Usage:
+    python mjpeg_server.py --video clip.mp4 --port 4747
+    # then in config.py: CAMERA_INDEX = "http://127.0.0.1:4747/video"
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+
+BOUNDARY = "frame"
+
+
+def synthetic_frames(count=30, width=1280, height=720):
+    """A white square sweeping across a dark frame"""
+    frames = []
+    for i in range(count):
+        frame = np.full((height, width, 3), 32, dtype=np.uint8)
+        x = int((width - height // 4) * i / max(1, count - 1))
+        cv2.rectangle(frame, (x, height // 3), (x + height // 4, height // 3 + height // 4), (255, 255, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+def video_frames(path, max_frames=300):
+    """Frames of a video file (at most max_frames, they are all JPEG-encoded up front)"""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise ValueError(f"No frames in {path}")
+    return frames
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server.mjpeg
+        if self.path.split("?")[0] != server.path:
+            self.send_error(404)
+            return
+        if server.refuse.is_set():
+            self.send_error(503)
+            return
+
+        server.connections += 1
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        sent = 0
+        interval = 1.0 / server.fps
+        try:
+            while not server.stopped.is_set() and not server.refuse.is_set():
+                if server.drop_after is not None and sent >= server.drop_after:
+                    return  # Simulated network drop
+                jpeg = server.jpegs[server.frames_sent % len(server.jpegs)]
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii"))
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                self.wfile.flush()
+                sent += 1
+                server.frames_sent += 1
+                time.sleep(interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MJPEGServer:
+    """Threaded MJPEG server on localhost"""
+
+    def __init__(self, frames=None, host="127.0.0.1", port=0, fps=30, path="/video", quality=80,
+                 drop_after=None):
+        """
+        Args:
+            frames: BGR frames to loop over (defaults to synthetic_frames())
+            port: 0 picks a free port (see url)
+            fps: Frames sent per second on each connection
+            quality: JPEG quality
+            drop_after: Close each connection after this many frames, None = never
+        """
+        frames = synthetic_frames() if frames is None else frames
+        self.jpegs = [cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+                      for frame in frames]
+        self.fps = fps
+        self.path = path
+        self.drop_after = drop_after
+        self.refuse = threading.Event()  # Set to answer 503 and cut current connections (outage)
+        self.stopped = threading.Event()
+
+        # Counters
+        self.connections = 0
+        self.frames_sent = 0
+
+        self._server = ThreadingHTTPServer((host, port), _StreamHandler)
+        self._server.daemon_threads = True
+        self._server.mjpeg = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mjpeg-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self._thread is not None:
+            self._server.shutdown()  # Would wait forever if serve_forever never ran
+        self._server.server_close()
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Stand-in MJPEG stream server")
+    parser.add_argument("--video", default=None, help="Video file to loop (default: synthetic frames)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4747)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--drop-after", type=int, default=None, help="Cut each connection after N frames")
+    args = parser.parse_args()
+
+    frames = video_frames(args.video) if args.video else None
+    server = MJPEGServer(frames, host=args.host, port=args.port, fps=args.fps, drop_after=args.drop_after).start()
+    print(f"📡 Serving MJPEG at {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"\n👋 {server.frames_sent} frames sent over {server.connections} connections")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,377 @@
+"""
+Multi-camera capture: one capture + MediaPipe worker process per camera, fused to the best view
+
+Each camera (an index, MJPEG URL or, for testing, a video file) runs in
+its own process with its own Hands instance, and sends back serialized
+landmarks stamped with the frame's capture time. The parent groups
+detections into time slots of config.FUSION_SLOT seconds and, per slot,
+keeps the single view the fusion policy rates best:
+
+    "confidence"  the hand MediaPipe is most sure about (handedness score)
+    "visibility"  the hand with the most landmarks inside the frame, largest first
+
+The fused stream then drives the same gesture/cursor path as one camera.
+Capture times come from time.perf_counter(), which is system-wide on
+Linux, macOS and Windows, so they compare across processes.
+"""
+
+import math
+import multiprocessing
+import os
+import time
+from collections import deque
+from queue import Empty
+
+import cv2
+import numpy as np
+import config
+from capture import open_capture
+from gestures import landmarks_to_array
+from inference_pool import PooledResults, create_hands, encode_results, hands_options, message_types
+
+
+FUSION_POLICIES = ("confidence", "visibility")
+
+
+def hand_confidence(results):
+    """Best handedness score among the detected hands, 0.0 when there is none"""
+    return max((handedness.classification[0].score for handedness in results.multi_handedness or ()),
+               default=0.0)
+
+
+def hand_visibility(results):
+    """
+    Fraction of the landmarks inside the frame, times the hand's size (box diagonal, normalized)
+
+    Prefers the camera that sees the whole hand, and sees it largest; 0.0 without a hand.
+    """
+    best = 0.0
+    for hand_landmarks in results.multi_hand_landmarks or ():
+        points = landmarks_to_array(hand_landmarks)[:, :2]
+        inside = ((points >= 0.0) & (points <= 1.0)).all(axis=1).mean()
+        best = max(best, inside * math.hypot(*np.ptp(points, axis=0)))
+    return best
+
+
+VIEW_SCORES = {
+    "confidence": hand_confidence,
+    "visibility": hand_visibility,
+}
+
+
+class FusedView:
+    """The view picked for one time slot"""
+
+    __slots__ = ("camera", "capture_time", "results", "score", "views")
+
+    def __init__(self, camera, capture_time, results, score, views):
+        self.camera = camera              # Index into the source list
+        self.capture_time = capture_time
+        self.results = results
+        self.score = score
+        self.views = views                # Cameras that reported in this slot
+
+
+class ViewFusion:
+    """
+    Groups per-camera detections into time slots and releases the best view of each, in slot order
+
+    A slot is released once every running camera has reported a frame
+    captured after it, or max_wait seconds after it ends, whichever is first.
+    A camera's newer frame in the same slot replaces its older one.
+    """
+
+    def __init__(self, cameras, slot=None, max_wait=None, policy=None, start=0.0):
+        """
+        Args:
+            cameras: Number of cameras
+            slot: Slot length in seconds (config.FUSION_SLOT)
+            max_wait: Seconds past a slot's end to wait for slow cameras (config.FUSION_MAX_WAIT)
+            policy: "confidence" or "visibility" (config.FUSION_POLICY)
+            start: Capture time at which slot 0 begins
+        """
+        policy = config.FUSION_POLICY if policy is None else policy
+        if policy not in VIEW_SCORES:
+            raise ValueError(f"Unknown fusion policy '{policy}', expected one of {FUSION_POLICIES}")
+        self.score = VIEW_SCORES[policy]
+        self.slot = config.FUSION_SLOT if slot is None else slot
+        self.max_wait = config.FUSION_MAX_WAIT if max_wait is None else max_wait
+        self.start = start
+
+        self._latest = {camera: -math.inf for camera in range(cameras)}  # Running cameras only
+        self._slots = {}  # slot index -> {camera: (capture_time, results)}
+        self._released = -1
+
+        # Counters
+        self.slots_fused = 0
+        self.late_detections = 0
+        self.views_used = [0] * cameras
+
+    def add(self, camera, capture_time, results):
+        """Queue one camera's detections for its time slot"""
+        self._latest[camera] = capture_time
+        index = math.floor((capture_time - self.start) / self.slot)
+        if index <= self._released:
+            self.late_detections += 1  # Its slot has gone out already
+            return
+        self._slots.setdefault(index, {})[camera] = (capture_time, results)
+
+    def end(self, camera):
+        """A camera stopped (end of file, read failure): stop waiting for it"""
+        self._latest.pop(camera, None)
+
+    @property
+    def finished(self):
+        return not self._latest and not self._slots
+
+    def next_deadline(self):
+        """Time at which the oldest pending slot is released regardless, or None"""
+        if not self._slots:
+            return None
+        return self.start + (min(self._slots) + 1) * self.slot + self.max_wait
+
+    def pop_ready(self, now):
+        """
+        Returns:
+            list: FusedView for every slot ready at `now`, oldest first
+        """
+        ready = []
+        for index in sorted(self._slots):
+            slot_end = self.start + (index + 1) * self.slot
+            waiting = any(latest < slot_end for latest in self._latest.values())
+            if waiting and now < slot_end + self.max_wait:
+                break
+            ready.append(self._fuse(self._slots.pop(index)))
+            self._released = index
+        return ready
+
+    def _fuse(self, views):
+        best = None
+        for camera, (capture_time, results) in sorted(views.items()):
+            score = self.score(results)
+            if best is None or score > best.score:
+                best = FusedView(camera, capture_time, results, score, len(views))
+        self.slots_fused += 1
+        self.views_used[best.camera] += 1
+        return best
+
+
+def _camera_worker(camera, source, messages, go, stop, start, hands_factory, factory_args, warmup):
+    """
+    Camera process: open the source, build Hands, then capture → infer → report until told to stop
+
+    Video files are paced on the real clock from the shared start time, skipping
+    frames when inference falls behind, so they behave like live cameras.
+    """
+    paced = isinstance(source, str) and os.path.isfile(source)
+    cap = open_capture(source, mode="direct" if paced else "latest")
+    hands = None
+    try:
+        if not cap.isOpened():
+            messages.put(("ready", camera, False))
+            return
+        hands = hands_factory(*factory_args)
+        if warmup:
+            hands.process(np.zeros((config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3), dtype=np.uint8))
+        messages.put(("ready", camera, True))
+        go.wait()
+
+        fps = (cap.cap.get(cv2.CAP_PROP_FPS) or 30.0) if paced else None
+        index = 0
+        skipped = 0
+        rgb = None
+        while not stop.is_set():
+            if paced:
+                due = int((time.perf_counter() - start.value) * fps)
+                while index < due and cap.cap.grab():  # Behind: skip to the frame due now
+                    index += 1
+                    skipped += 1
+                # Stamped mid-interval: on the slot grid itself, rounding would put some frames a slot early
+                capture_time = start.value + (index + 0.5) / fps
+                delay = capture_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                success, frame, _ = cap.read()
+                index += 1
+            else:
+                success, frame, capture_time = cap.read()
+            if not success:
+                break
+
+            if cap.color_order == "RGB":
+                rgb = frame
+            else:
+                if rgb is None or rgb.shape != frame.shape:
+                    rgb = np.empty_like(frame)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            start_time = time.perf_counter()
+            detections = hands.process(rgb)
+            messages.put(("detection", camera, capture_time, encode_results(detections),
+                          time.perf_counter() - start_time))
+        messages.put(("end", camera, cap.dropped_frames + skipped))
+    except Exception as e:
+        messages.put(("error", camera, f"{type(e).__name__}: {e}"))
+    finally:
+        if hands is not None:
+            hands.close()
+        cap.release()
+
+
+class MultiCameraCapture:
+    """
+    Frame source for several cameras at once: read() returns fused views instead of frames
+
+    Capture and MediaPipe both run in the per-camera worker processes, so the
+    results of read() are ready to act on (landmarks in camera coordinates, as in
+    "landmarks" mirror mode).
+    """
+
+    color_order = "BGR"
+
+    def __init__(self, sources=None, policy=None, slot=None, max_wait=None, read_timeout=2.0,
+                 hands_factory=None, factory_args=None, warmup=None):
+        """
+        Args:
+            sources: Camera indices, MJPEG URLs or video files (config.CAMERA_SOURCES)
+            policy, slot, max_wait: Fusion settings, see ViewFusion
+            read_timeout: Seconds read() waits without any camera reporting before failing
+            hands_factory: Picklable top-level callable building each worker's Hands
+                           (inference_pool.create_hands)
+            factory_args: Arguments for hands_factory (default: (hands_options(),))
+            warmup: Run one inference on a blank frame in each worker before starting (config.STARTUP_WARMUP)
+        """
+        self.sources = list(config.CAMERA_SOURCES if sources is None else sources)
+        self.fusion = ViewFusion(len(self.sources), slot, max_wait, policy)
+        self.read_timeout = read_timeout
+        self.hands_factory = create_hands if hands_factory is None else hands_factory
+        self.factory_args = (hands_options(),) if factory_args is None else factory_args
+        self.warmup = config.STARTUP_WARMUP if warmup is None else warmup
+
+        # Counters
+        self.frames_captured = [0] * len(self.sources)  # Detections reported per camera
+        self.camera_dropped = [0] * len(self.sources)   # Frames each camera skipped (known once it ends)
+        self.inference_time = [0.0] * len(self.sources)
+
+        context = multiprocessing.get_context("spawn")  # MediaPipe graphs don't survive fork
+        self._messages = context.Queue()
+        self._go = context.Event()
+        self._stop = context.Event()
+        self._start = context.Value("d", 0.0)
+        self._processes = [
+            context.Process(target=_camera_worker, name=f"camera-{camera}", daemon=True,
+                            args=(camera, source, self._messages, self._go, self._stop, self._start,
+                                  self.hands_factory, self.factory_args, self.warmup))
+            for camera, source in enumerate(self.sources)
+        ]
+        self._opened = False
+        self._ready = deque()
+        self._ended = set()  # Cameras that reported "end" or whose process is gone
+
+    def start(self, timeout=60.0):
+        """Start every camera worker, wait until all are open and loaded, then start them on one clock"""
+        for process in self._processes:
+            process.start()
+        message_types()  # Load the protobuf types while the workers start
+
+        opened = []
+        deadline = time.perf_counter() + timeout
+        try:
+            while len(opened) < len(self.sources):
+                remaining = deadline - time.perf_counter()
+                message = self._next_message(min(0.5, max(0.0, remaining)))
+                if message is None:
+                    if self._ended or remaining <= 0:
+                        break  # A worker died before reporting, or the timeout passed
+                    continue
+                if message[0] == "ready":
+                    opened.append(message[2])
+                    if not message[2]:
+                        print(f"❌ Could not open camera {self.sources[message[1]]}")
+        except RuntimeError:
+            self.release()
+            raise
+
+        self._opened = len(opened) == len(self.sources) and all(opened)
+        if self._opened:
+            self._start.value = self.fusion.start = time.perf_counter() + 0.05
+            self._go.set()
+        return self
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self):
+        """
+        Best view of the next time slot, waiting for the cameras as needed
+
+        Returns:
+            tuple: (success, FusedView, capture_time)
+        """
+        last_message = time.perf_counter()
+        while not self._ready:
+            now = time.perf_counter()
+            self._ready.extend(self.fusion.pop_ready(now))
+            if self._ready:
+                break
+            if self.fusion.finished or now - last_message > self.read_timeout:
+                return False, None, None
+
+            deadline = self.fusion.next_deadline()
+            timeout = 0.1 if deadline is None else min(0.1, max(0.0, deadline - now))
+            message = self._next_message(timeout)
+            if message is not None:
+                last_message = time.perf_counter()
+                self._handle(message)
+
+        view = self._ready.popleft()
+        return True, view, view.capture_time
+
+    def _handle(self, message):
+        kind, camera = message[:2]
+        if kind == "detection":
+            capture_time, payload, duration = message[2:]
+            self.frames_captured[camera] += 1
+            self.inference_time[camera] += duration
+            self.fusion.add(camera, capture_time, PooledResults(payload))
+        elif kind == "end":
+            self.camera_dropped[camera] = message[2]
+            self._ended.add(camera)
+            self.fusion.end(camera)
+
+    def _reap_workers(self):
+        """Stop waiting for cameras whose process exited without reporting "end" (crashed or killed)"""
+        for camera, process in enumerate(self._processes):
+            if camera in self._ended or process.pid is None or process.is_alive():
+                continue
+            self._ended.add(camera)
+            self.fusion.end(camera)
+            if process.exitcode != 0:
+                print(f"❌ Camera {self.sources[camera]} worker exited (code {process.exitcode})")
+
+    def _next_message(self, timeout):
+        """Next worker message; raises if a worker failed, ends cameras whose worker died"""
+        try:
+            message = self._messages.get(timeout=timeout)
+        except Empty:
+            self._reap_workers()
+            return None
+        if message[0] == "error":
+            raise RuntimeError(f"Camera {self.sources[message[1]]} failed: {message[2]}")
+        return message
+
+    @property
+    def dropped_frames(self):
+        """Detections that arrived after their slot was fused, plus frames the cameras skipped"""
+        return self.fusion.late_detections + sum(self.camera_dropped)
+
+    def release(self, timeout=2.0):
+        self._stop.set()
+        self._go.set()  # Workers still waiting to start
+        for process in self._processes:
+            if process.pid is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._messages.close()
+        self._messages.cancel_join_thread()
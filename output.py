@@ -0,0 +1,337 @@
+"""
+Mouse output backends and the injector thread that drives them
+
+The frame loop never talks to the OS directly: CursorController calls the
+pyautogui-style methods (moveTo, mouseDown, mouseUp, rightClick, scroll)
+on a MouseInjector, which queues them and returns immediately. A
+dedicated thread replays the queue, in order, on the selected backend.
+"""
+
+import threading
+import time
+from collections import deque
+
+import config
+from cursor_control import RecordingMouse
+
+
+class PyAutoGUIBackend:
+    """pyautogui, with its per-call sleep (PAUSE) and corner failsafe disabled"""
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+        # pyautogui sleeps PAUSE (0.1s) after every call by default
+        pyautogui.PAUSE = 0
+        # Disable PyAutoGUI failsafe for smooth operation
+        pyautogui.FAILSAFE = False
+
+    def size(self):
+        return tuple(self.pyautogui.size())
+
+    def moveTo(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def mouseDown(self):
+        self.pyautogui.mouseDown()
+
+    def mouseUp(self):
+        self.pyautogui.mouseUp()
+
+    def rightClick(self):
+        self.pyautogui.rightClick()
+
+    def scroll(self, amount):
+        self.pyautogui.scroll(amount)
+
+
+class PynputBackend:
+    """pynput's mouse controller (no per-call sleeps)"""
+
+    def __init__(self):
+        from pynput import mouse
+        self.button = mouse.Button
+        self.mouse = mouse.Controller()
+
+    def size(self):
+        # pynput has no screen query; ask Tk once
+        import tkinter
+        root = tkinter.Tk()
+        try:
+            return root.winfo_screenwidth(), root.winfo_screenheight()
+        finally:
+            root.destroy()
+
+    def moveTo(self, x, y):
+        self.mouse.position = (x, y)
+
+    def mouseDown(self):
+        self.mouse.press(self.button.left)
+
+    def mouseUp(self):
+        self.mouse.release(self.button.left)
+
+    def rightClick(self):
+        self.mouse.click(self.button.right)
+
+    def scroll(self, amount):
+        self.mouse.scroll(0, amount)
+
+
+class XTestBackend:
+    """
+    X11 XTest extension through python-xlib: one request per event, no
+    toolkit in between. Works against any X server, including Xvfb.
+    """
+
+    LEFT, RIGHT, WHEEL_UP, WHEEL_DOWN = 1, 3, 4, 5
+
+    def __init__(self, display_name=None):
+        """
+        Args:
+            display_name: X display, e.g. ":99" (defaults to $DISPLAY)
+        """
+        from Xlib import X, display
+        from Xlib.ext import xtest
+        self.X = X
+        self.xtest = xtest
+        self.display = display.Display(display_name)
+        if not self.display.has_extension("XTEST"):
+            raise RuntimeError("X server has no XTEST extension")
+        self.screen = self.display.screen()
+
+    def size(self):
+        return self.screen.width_in_pixels, self.screen.height_in_pixels
+
+    def position(self):
+        """Current pointer position (for tests)"""
+        pointer = self.screen.root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def _button(self, button, press):
+        self.xtest.fake_input(self.display, self.X.ButtonPress if press else self.X.ButtonRelease, button)
+
+    def moveTo(self, x, y):
+        self.xtest.fake_input(self.display, self.X.MotionNotify, x=int(x), y=int(y))
+        self.display.sync()
+
+    def mouseDown(self):
+        self._button(self.LEFT, True)
+        self.display.sync()
+
+    def mouseUp(self):
+        self._button(self.LEFT, False)
+        self.display.sync()
+
+    def rightClick(self):
+        self._button(self.RIGHT, True)
+        self._button(self.RIGHT, False)
+        self.display.sync()
+
+    def scroll(self, amount):
+        # X11 scrolls in wheel clicks: button 4 up, button 5 down
+        button = self.WHEEL_UP if amount > 0 else self.WHEEL_DOWN
+        for _ in range(abs(int(amount))):
+            self._button(button, True)
+            self._button(button, False)
+        self.display.sync()
+
+    def close(self):
+        self.display.close()
+
+
+class NullBackend:
+    """Discards every event (measure the pipeline without touching the cursor)"""
+
+    def __init__(self, width=1920, height=1080):
+        self.width = width
+        self.height = height
+
+    def size(self):
+        return self.width, self.height
+
+    def moveTo(self, x, y):
+        pass
+
+    def mouseDown(self):
+        pass
+
+    def mouseUp(self):
+        pass
+
+    def rightClick(self):
+        pass
+
+    def scroll(self, amount):
+        pass
+
+
+class RecordingBackend(RecordingMouse):
+    """Records every event with its injection time instead of moving the cursor"""
+
+    def __init__(self, width=1920, height=1080, clock=time.perf_counter):
+        super().__init__(clock)
+        self.width = width
+        self.height = height
+
+    def size(self):
+        return self.width, self.height
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGUIBackend,
+    "pynput": PynputBackend,
+    "xtest": XTestBackend,
+    "null": NullBackend,
+    "recording": RecordingBackend,
+}
+
+
+def create_backend(name=None):
+    """
+    Build an output backend by name
+
+    Args:
+        name: Key of BACKENDS (defaults to config.OUTPUT_BACKEND)
+    """
+    name = config.OUTPUT_BACKEND if name is None else name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown output backend {name!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def screen_size(backend):
+    """Screen size from config.SCREEN_WIDTH/HEIGHT when set, otherwise from the backend"""
+    if config.SCREEN_WIDTH and config.SCREEN_HEIGHT:
+        return config.SCREEN_WIDTH, config.SCREEN_HEIGHT
+    return backend.size()
+
+
+class MouseInjector:
+    """
+    Queues mouse events from the frame loop and injects them on a dedicated thread
+
+    Exposes the same moveTo/mouseDown/mouseUp/rightClick/scroll methods as
+    the backends, so it drops into CursorController's `mouse` slot. Calls
+    return immediately; the injector thread runs them in order.
+
+    With coalescing on, a move queued right behind another pending move
+    replaces it (latest wins), and a move to the pixel the cursor is already
+    headed for is dropped. Moves are never merged across a click or scroll,
+    so button and wheel events keep their place relative to the moves.
+    """
+
+    def __init__(self, backend, coalesce=None, metrics=None):
+        """
+        Args:
+            backend: Output backend (see BACKENDS)
+            coalesce: Collapse pending moves (defaults to config.OUTPUT_COALESCE_MOVES)
+            metrics: Optional metrics.Metrics; each injection is recorded as stage "output"
+        """
+        self.backend = backend
+        self.coalesce = config.OUTPUT_COALESCE_MOVES if coalesce is None else coalesce
+        self.metrics = metrics
+        self._events = deque()  # (name, args)
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self._move_target = None  # Integer pixel of the newest queued move
+
+        # Counters
+        self.events_queued = 0
+        self.events_injected = 0
+        self.moves_coalesced = 0   # Pending moves replaced by a newer one
+        self.moves_suppressed = 0  # Moves that wouldn't change the integer pixel
+        self.max_pending = 0
+        self.inject_time = 0.0
+        self.event_counts = {}  # Injected events by name
+
+    def start(self):
+        """Start the injector thread"""
+        self._thread = threading.Thread(target=self._run, name="mouse-injector", daemon=True)
+        self._thread.start()
+        return self
+
+    def _append(self, name, args):
+        """Queue an event (caller holds the lock)"""
+        self._events.append((name, args))
+        self.events_queued += 1
+        self.max_pending = max(self.max_pending, len(self._events))
+        self._condition.notify()
+
+    def _put(self, name, *args):
+        with self._condition:
+            self._append(name, args)
+
+    def moveTo(self, x, y):
+        if not self.coalesce:
+            self._put("moveTo", x, y)
+            return
+
+        target = (int(x), int(y))
+        with self._condition:
+            if target == self._move_target:
+                self.moves_suppressed += 1
+                return
+            self._move_target = target
+
+            if self._events and self._events[-1][0] == "moveTo":
+                # Still waiting behind the injector: only the newest target matters
+                self._events[-1] = ("moveTo", target)
+                self.moves_coalesced += 1
+                return
+            self._append("moveTo", target)
+
+    def mouseDown(self):
+        self._put("mouseDown")
+
+    def mouseUp(self):
+        self._put("mouseUp")
+
+    def rightClick(self):
+        self._put("rightClick")
+
+    def scroll(self, amount):
+        self._put("scroll", amount)
+
+    @property
+    def pending(self):
+        return len(self._events)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._events and not self._stopped:
+                    self._condition.wait()
+                if not self._events:
+                    return
+                name, args = self._events.popleft()
+
+            start = time.perf_counter()
+            try:
+                getattr(self.backend, name)(*args)
+            except Exception as e:
+                print(f"⚠️ Mouse output failed ({name}): {e}")
+            duration = time.perf_counter() - start
+            self.inject_time += duration
+            self.events_injected += 1
+            self.event_counts[name] = self.event_counts.get(name, 0) + 1
+            if self.metrics is not None:
+                self.metrics.observe("output", duration)
+
+    def flush(self, timeout=1.0):
+        """Wait until every queued event has been injected"""
+        deadline = time.perf_counter() + timeout
+        while self.events_injected < self.events_queued and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        return self.events_injected >= self.events_queued
+
+    def stop(self, timeout=1.0):
+        """Inject what is still queued, then stop the thread"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if hasattr(self.backend, "close"):
+            self.backend.close()
@@ -0,0 +1,282 @@
+"""
+Pipelined runtime: capture → inference → gesture/output on separate workers
+
+With an inference pool (inference_pool.py) the inference stage only hands
+frames to worker processes, and a reorder stage puts their results back in
+frame order before the gesture/output stage sees them.
+"""
+
+import threading
+from collections import deque
+
+import config
+
+
+DROP_POLICIES = ("drop_oldest", "block")
+
+
+class BoundedQueue:
+    """Fixed-size FIFO between two pipeline stages with a configurable overflow policy"""
+
+    def __init__(self, maxsize=2, drop_policy="drop_oldest"):
+        """
+        Args:
+            maxsize: Maximum number of queued items
+            drop_policy: "drop_oldest" discards the oldest item when full,
+                         "block" makes the producer wait for space
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}', expected one of {DROP_POLICIES}")
+
+        self.maxsize = max(1, maxsize)
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self.closed = False
+
+        self._items = deque()
+        self._condition = threading.Condition()
+
+    def put(self, item):
+        """
+        Add an item, dropping or blocking when the queue is full
+
+        Returns:
+            bool: False if the queue was closed before the item could be added
+        """
+        with self._condition:
+            while len(self._items) >= self.maxsize and not self.closed:
+                if self.drop_policy == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+                    break
+                self._condition.wait()
+
+            if self.closed:
+                return False
+
+            self._items.append(item)
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """
+        Remove and return the oldest item
+
+        Returns:
+            The item, or None on timeout or once the queue is closed and drained
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self.closed, timeout=timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def close(self):
+        """Wake up all waiting producers and consumers; further puts are refused"""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._items)
+
+
+class FramePacket:
+    """One frame travelling through the pipeline"""
+
+    __slots__ = ("seq", "capture_time", "frame", "rgb_frame", "results", "pending")
+
+    def __init__(self, seq, capture_time, frame):
+        self.seq = seq
+        self.capture_time = capture_time
+        self.frame = frame
+        self.rgb_frame = None
+        self.results = None
+        self.pending = False  # Submitted to an inference pool, results not back yet
+
+
+class PipelineEngine:
+    """
+    Runs capture, inference and gesture/output on their own worker threads,
+    connected by bounded queues.
+
+    Frames get a sequence number at capture; the output stage never handles a
+    packet older than the last one it processed, so clicks and scrolls are
+    always issued in capture order even when queues drop frames.
+    """
+
+    def __init__(self, capture, infer, output, queue_size=None, drop_policies=None, pool=None, finish=None):
+        """
+        Args:
+            capture: Frame source with read() -> (success, frame, capture_time)
+            infer: Callable(packet) that fills in packet.rgb_frame / packet.results, or with a pool,
+                   submits the frame to it and sets packet.pending
+            output: Callable(packet) that handles gestures and cursor output
+            queue_size: Capacity of each inter-stage queue (defaults to config.PIPELINE_QUEUE_SIZE)
+            drop_policies: Dict of "inference"/"output" queue name -> drop policy
+                           (defaults to config.PIPELINE_DROP_POLICIES)
+            pool: InferencePool whose results the reorder stage collects
+            finish: Callable(packet, inference_seconds) run in frame order once a pooled result is in
+        """
+        queue_size = config.PIPELINE_QUEUE_SIZE if queue_size is None else queue_size
+        policies = dict(config.PIPELINE_DROP_POLICIES)
+        policies.update(drop_policies or {})
+
+        self.capture = capture
+        self.infer = infer
+        self.output = output
+        self.pool = pool
+        self.finish = finish
+
+        self.inference_queue = BoundedQueue(queue_size, policies["inference"])
+        self.output_queue = BoundedQueue(queue_size, policies["output"])
+        # Preview frames are only ever shown newest-first
+        self.display_queue = BoundedQueue(1, "drop_oldest")
+
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.out_of_order = 0
+        self.last_output_seq = 0
+        self.max_in_flight = 0
+
+        # Pool mode: submitted packets in frame order, and results that came back ahead of their turn
+        self._in_flight = deque()
+        self._early_results = {}
+        self._in_flight_condition = threading.Condition()
+
+        self._stop_event = threading.Event()
+        self._errors = []
+        self._threads = []
+
+    def _run_stage(self, stage):
+        """Run a worker loop, stopping the whole pipeline if it fails"""
+        try:
+            stage()
+        except Exception as e:
+            self._errors.append(e)
+        finally:
+            self.stop()
+
+    def _capture_stage(self):
+        while not self._stop_event.is_set():
+            success, frame, capture_time = self.capture.read()
+            if not success:
+                print("❌ Failed to read from camera")
+                return
+
+            self.frames_captured += 1
+            packet = FramePacket(self.frames_captured, capture_time, frame)
+            if not self.inference_queue.put(packet):
+                return
+
+    def _inference_stage(self):
+        while True:
+            packet = self.inference_queue.get()
+            if packet is None:
+                return
+            self.infer(packet)
+            if self.pool is not None:
+                with self._in_flight_condition:
+                    self._in_flight.append(packet)
+                    self.max_in_flight = max(self.max_in_flight, len(self._in_flight))
+                    self._in_flight_condition.notify()
+            elif not self.output_queue.put(packet):
+                return
+
+    def _reorder_stage(self):
+        """Pool mode: release packets in frame order as their results come back from the workers"""
+        while not self._stop_event.is_set():
+            with self._in_flight_condition:
+                self._in_flight_condition.wait_for(lambda: self._in_flight or self._stop_event.is_set(), 0.1)
+                if not self._in_flight:
+                    continue
+                packet = self._in_flight[0]
+
+            if packet.pending and packet.seq not in self._early_results:
+                result = self.pool.get_result(timeout=0.1)
+                if result is not None:
+                    seq, results, duration = result
+                    self._early_results[seq] = (results, duration)
+                continue
+
+            with self._in_flight_condition:
+                self._in_flight.popleft()
+            if packet.pending:
+                packet.results, duration = self._early_results.pop(packet.seq)
+                packet.pending = False
+                self.finish(packet, duration)
+            if not self.output_queue.put(packet):
+                return
+
+    def _output_stage(self):
+        while True:
+            packet = self.output_queue.get()
+            if packet is None:
+                return
+
+            # Never act on a frame older than one we've already acted on
+            if packet.seq <= self.last_output_seq:
+                self.out_of_order += 1
+                continue
+
+            self.output(packet)
+            self.last_output_seq = packet.seq
+            self.frames_processed += 1
+            self.display_queue.put(packet)
+
+    def start(self):
+        """Start all stage workers"""
+        stages = [("capture", self._capture_stage), ("inference", self._inference_stage),
+                  ("output", self._output_stage)]
+        if self.pool is not None:
+            stages.append(("reorder", self._reorder_stage))
+        for name, stage in stages:
+            thread = threading.Thread(target=self._run_stage, args=(stage,), name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def next_display_packet(self, timeout=0.1):
+        """
+        Get the most recently processed packet for preview on the main thread
+
+        Returns:
+            FramePacket or None if nothing new arrived within the timeout
+        """
+        return self.display_queue.get(timeout=timeout)
+
+    @property
+    def running(self):
+        return not self._stop_event.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the pipeline stops or the timeout expires
+
+        Returns:
+            bool: True if the pipeline has stopped
+        """
+        return self._stop_event.wait(timeout)
+
+    def stop(self):
+        """Signal all workers to finish and unblock any waiting queue operations"""
+        self._stop_event.set()
+        with self._in_flight_condition:
+            self._in_flight_condition.notify_all()
+        self.inference_queue.close()
+        self.output_queue.close()
+        self.display_queue.close()
+
+    def join(self, timeout=1.0):
+        """Wait for workers to exit and re-raise the first worker error, if any"""
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        if self._errors:
+            raise self._errors[0]
+
+    @property
+    def dropped_frames(self):
+        """Frames dropped between stages (not counting capture-level drops)"""
+        return self.inference_queue.dropped + self.output_queue.dropped
@@ -0,0 +1,162 @@
+"""
+Frame skipping: run hand inference on a subset of frames and predict the cursor in between
+"""
+
+import math
+from collections import deque
+
+import config
+
+
+class MotionPredictor:
+    """Constant-velocity model fitted to the most recent index tip positions"""
+
+    def __init__(self, history=None, max_ahead=None):
+        """
+        Args:
+            history: Number of recent detections used for the fit (config.PREDICTION_HISTORY)
+            max_ahead: Longest extrapolation in seconds (config.PREDICTION_MAX_AHEAD)
+        """
+        self.history = config.PREDICTION_HISTORY if history is None else history
+        self.max_ahead = config.PREDICTION_MAX_AHEAD if max_ahead is None else max_ahead
+        self.samples = deque(maxlen=max(2, self.history))  # (t, x, y)
+
+        self._fit = None  # (t_mean, x_mean, y_mean, vx, vy)
+
+    def add(self, timestamp, x, y):
+        """Add a detected position (normalized coordinates)"""
+        self.samples.append((timestamp, x, y))
+        self._fit = None
+
+    def reset(self):
+        """Forget the trajectory (hand lost)"""
+        self.samples.clear()
+        self._fit = None
+
+    @property
+    def tracking(self):
+        return bool(self.samples)
+
+    def _fitted(self):
+        """Least-squares line through the samples, computed once per new detection"""
+        if self._fit is None:
+            n = len(self.samples)
+            t_mean = sum(s[0] for s in self.samples) / n
+            x_mean = sum(s[1] for s in self.samples) / n
+            y_mean = sum(s[2] for s in self.samples) / n
+            t_var = sum((s[0] - t_mean) ** 2 for s in self.samples)
+            if t_var > 0:
+                vx = sum((s[0] - t_mean) * (s[1] - x_mean) for s in self.samples) / t_var
+                vy = sum((s[0] - t_mean) * (s[2] - y_mean) for s in self.samples) / t_var
+            else:
+                vx = vy = 0.0
+            self._fit = (t_mean, x_mean, y_mean, vx, vy)
+        return self._fit
+
+    def velocity(self):
+        """
+        Returns:
+            tuple: (vx, vy) in normalized units per second
+        """
+        if len(self.samples) < 2:
+            return 0.0, 0.0
+        _, _, _, vx, vy = self._fitted()
+        return vx, vy
+
+    def speed(self):
+        """Hand speed in normalized units (frame widths) per second"""
+        vx, vy = self.velocity()
+        return math.hypot(vx, vy)
+
+    def predict(self, timestamp):
+        """
+        Extrapolate the position at `timestamp`
+
+        Returns:
+            tuple: (x, y) normalized, or None without any detection
+        """
+        if not self.samples:
+            return None
+        last_t, last_x, last_y = self.samples[-1]
+        if len(self.samples) < 2:
+            return last_x, last_y
+
+        t_mean, x_mean, y_mean, vx, vy = self._fitted()
+        # Don't run away from the last real detection if detections stop arriving
+        t = min(timestamp, last_t + self.max_ahead)
+        return x_mean + vx * (t - t_mean), y_mean + vy * (t - t_mean)
+
+
+class InferenceScheduler:
+    """
+    Decides per frame whether to run hand inference or predict the cursor.
+
+    Slow hands get up to `max_skip` predicted frames between detections,
+    fast hands get a detection every frame. With a budget set, inference is
+    also skipped while it would use more than that fraction of wall time.
+    """
+
+    def __init__(self, max_skip=None, slow_speed=None, fast_speed=None, budget=None):
+        """
+        Args:
+            max_skip: Most predicted frames between detections (config.FRAME_SKIP_MAX)
+            slow_speed: Speed at or below which max_skip is used (config.FRAME_SKIP_SLOW_SPEED)
+            fast_speed: Speed at or above which every frame is inferred (config.FRAME_SKIP_FAST_SPEED)
+            budget: Max fraction of wall time spent in inference, None for no budget
+                    (config.INFERENCE_BUDGET)
+        """
+        self.max_skip = config.FRAME_SKIP_MAX if max_skip is None else max_skip
+        self.slow_speed = config.FRAME_SKIP_SLOW_SPEED if slow_speed is None else slow_speed
+        self.fast_speed = config.FRAME_SKIP_FAST_SPEED if fast_speed is None else fast_speed
+        self.budget = config.INFERENCE_BUDGET if budget is None else budget
+
+        self.skipped = 0  # Predicted frames since the last inference
+        self.inferred_frames = 0
+        self.predicted_frames = 0
+
+        self._last_start = None
+        self._last_duration = 0.0
+
+    def skip_for_speed(self, speed):
+        """Number of frames that may be predicted between detections at this speed"""
+        if speed >= self.fast_speed:
+            return 0
+        if speed <= self.slow_speed:
+            return self.max_skip
+        fraction = (self.fast_speed - speed) / (self.fast_speed - self.slow_speed)
+        return int(round(self.max_skip * fraction))
+
+    def should_infer(self, now, speed=None):
+        """
+        Args:
+            now: Frame timestamp
+            speed: Current hand speed, or None when no hand is being tracked
+
+        Returns:
+            bool: True to run inference on this frame, False to predict
+        """
+        infer = speed is None or self.skipped >= self.skip_for_speed(speed)
+
+        if self.budget and self._last_start is not None and self.skipped < self.max_skip:
+            # Inference would exceed its share of wall time: predict instead
+            if self._last_duration > self.budget * (now - self._last_start):
+                infer = False
+
+        if infer:
+            self.skipped = 0
+            self.inferred_frames += 1
+        else:
+            self.skipped += 1
+            self.predicted_frames += 1
+        return infer
+
+    def record_inference(self, start, duration):
+        """Report when the last inference started (frame clock) and how long it took"""
+        self._last_start = start
+        self._last_duration = duration
+
+    def skip_ratio(self):
+        """Fraction of frames that were predicted instead of inferred"""
+        total = self.inferred_frames + self.predicted_frames
+        return self.predicted_frames / total if total else 0.0
+
@@ -0,0 +1,95 @@
+"""
+Frame preprocessing for MediaPipe without per-frame allocations
+"""
+
+import cv2
+import numpy as np
+import config
+
+
+MIRROR_MODES = ("landmarks", "image")
+# Handedness label MediaPipe would give the same hand on a horizontally flipped frame
+MIRRORED_HANDEDNESS = {"Left": "Right", "Right": "Left"}
+
+
+class FramePreprocessor:
+    """
+    Turns camera frames into MediaPipe input, reusing its output buffers.
+
+    In "landmarks" mirror mode the frame is never flipped: MediaPipe runs on
+    the camera image and its results are left in camera coordinates. The few
+    readers that care mirror what they read instead (CursorController, the
+    preview, the landmark recorder), so no per-frame pass rewrites the
+    results. Frames that already arrive as RGB are passed through unconverted.
+    """
+
+    def __init__(self, mirror=None, color_order="BGR"):
+        """
+        Args:
+            mirror: "landmarks" or "image" (config.MIRROR_MODE)
+            color_order: Channel order of the camera frames ("BGR" or "RGB")
+        """
+        self.mirror = config.MIRROR_MODE if mirror is None else mirror
+        if self.mirror not in MIRROR_MODES:
+            raise ValueError(f"Unknown mirror mode '{self.mirror}', expected one of {MIRROR_MODES}")
+        self.color_order = color_order
+
+        self._rgb = None
+        self._resized = None
+
+    @property
+    def mirrors_image(self):
+        """True if prepare() hands back a flipped display frame (and detections come out mirrored)"""
+        return self.mirror == "image"
+
+    @staticmethod
+    def _buffer(buffer, shape):
+        """Reuse `buffer` if it has the right shape, otherwise allocate a new one"""
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def prepare(self, frame, out=None):
+        """
+        Args:
+            frame: Camera frame in self.color_order
+            out: Array to write the RGB frame into instead (e.g. a shared-memory ring slot);
+                 resized into when its shape differs from the frame's
+
+        Returns:
+            tuple: (display_frame, rgb_frame). rgb_frame may be a reused buffer, valid
+                   until the next call; display_frame is flipped only in "image" mode
+        """
+        if self.mirror == "image":
+            # Kept as a fresh array: the display frame outlives this call (preview snapshots)
+            frame = cv2.flip(frame, 1)
+
+        if out is not None and out.shape != frame.shape:
+            cv2.resize(self._convert(frame), (out.shape[1], out.shape[0]), dst=out, interpolation=cv2.INTER_AREA)
+            return frame, out
+
+        if self.color_order == "RGB":
+            if out is None:
+                return frame, frame
+            np.copyto(out, frame)
+            return frame, out
+
+        if out is None:
+            return frame, self._convert(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+        return frame, out
+
+    def _convert(self, frame):
+        if self.color_order == "RGB":
+            return frame
+        self._rgb = self._buffer(self._rgb, frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+    def resize(self, rgb_frame, scale):
+        """Downscale into a reused buffer (INTER_AREA)"""
+        height, width = rgb_frame.shape[:2]
+        size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        self._resized = self._buffer(self._resized, (size[1], size[0]) + rgb_frame.shape[2:])
+        cv2.resize(rgb_frame, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        return self._resized
@@ -0,0 +1,182 @@
+"""
+Compact binary recording format for hand landmarks
+
+File layout (little endian):
+    header   64 bytes   HEADER_DTYPE (magic, version, record size, frame count, start time)
+    records  N x 272    RECORD_DTYPE, one fixed-size record per processed frame
+
+Because every record has the same size, record i lives at
+HEADER_SIZE + i * RECORD_SIZE and the whole file can be opened with
+numpy.memmap. The capture_time column doubles as the seek index: it is
+monotonic, so seeking to a timestamp is a binary search over the mapped
+column without reading any landmarks.
+
+Landmarks and handedness are stored as seen in the mirror view (x flipped
+from the camera image), whatever mirror mode they were recorded in.
+"""
+
+import numpy as np
+from gestures import NUM_LANDMARKS, landmarks_to_array
+from preprocess import MIRRORED_HANDEDNESS
+
+
+MAGIC = b"HLMK"
+FORMAT_VERSION = 1
+
+HANDEDNESS_UNKNOWN = -1
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("record_size", "<u4"),
+    ("num_landmarks", "<u4"),
+    ("frame_count", "<u8"),
+    ("start_time", "<f8"),
+    ("reserved", "V32"),
+])
+
+RECORD_DTYPE = np.dtype([
+    ("seq", "<u4"),              # Frame sequence number
+    ("num_hands", "u1"),         # Hands detected in the frame (landmarks hold the first one)
+    ("handedness", "i1"),        # 0 = Left, 1 = Right, -1 = unknown / no hand
+    ("reserved", "V2"),
+    ("score", "<f4"),            # Handedness classification confidence
+    ("capture_time", "<f8"),     # Capture timestamp (time.perf_counter seconds)
+    ("landmarks", "<f4", (NUM_LANDMARKS, 3)),
+])
+
+HEADER_SIZE = HEADER_DTYPE.itemsize
+RECORD_SIZE = RECORD_DTYPE.itemsize
+
+
+class LandmarkRecorder:
+    """Appends one fixed-size record per frame to a landmark recording"""
+
+    def __init__(self, path, start_time=0.0, mirrored=True):
+        """
+        Args:
+            path: Output file path (overwritten)
+            start_time: Reference timestamp stored in the header
+            mirrored: True if results come from flipped frames; otherwise they are mirrored as they're written
+        """
+        self.path = path
+        self.mirrored = mirrored
+        self.frame_count = 0
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._header = np.zeros(1, dtype=HEADER_DTYPE)
+        self._header["magic"] = MAGIC
+        self._header["version"] = FORMAT_VERSION
+        self._header["record_size"] = RECORD_SIZE
+        self._header["num_landmarks"] = NUM_LANDMARKS
+        self._header["start_time"] = start_time
+
+        self._file = open(path, "wb")
+        self._file.write(self._header.tobytes())
+
+    def write(self, results, capture_time):
+        """
+        Append a frame
+
+        Args:
+            results: MediaPipe Hands results (frames without a hand are recorded too)
+            capture_time: Capture timestamp of the frame
+        """
+        record = self._record[0]
+        record["seq"] = self.frame_count + 1
+        record["capture_time"] = capture_time
+
+        hands = results.multi_hand_landmarks or []
+        record["num_hands"] = len(hands)
+        record["handedness"] = HANDEDNESS_UNKNOWN
+        record["score"] = 0.0
+
+        if hands:
+            landmarks = landmarks_to_array(hands[0], out=record["landmarks"])
+            if not self.mirrored:
+                landmarks[:, 0] = 1.0 - landmarks[:, 0]
+            if results.multi_handedness:
+                classification = results.multi_handedness[0].classification[0]
+                label = classification.label if self.mirrored else MIRRORED_HANDEDNESS.get(classification.label)
+                record["handedness"] = HANDEDNESS_CODES.get(label, HANDEDNESS_UNKNOWN)
+                record["score"] = classification.score
+        else:
+            record["landmarks"] = 0.0
+
+        self._file.write(self._record.tobytes())
+        self.frame_count += 1
+
+    def close(self):
+        """Write the final frame count into the header and close the file"""
+        if self._file.closed:
+            return
+        self._header["frame_count"] = self.frame_count
+        self._file.seek(0)
+        self._file.write(self._header.tobytes())
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LandmarkRecording:
+    """Memory-mapped read access to a landmark recording"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Recording file path
+        """
+        self.path = path
+        self.header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+
+        if self.header["magic"] != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording")
+        if self.header["version"] != FORMAT_VERSION or self.header["record_size"] != RECORD_SIZE:
+            raise ValueError(f"{path} uses unsupported format version {self.header['version']}")
+
+        # Trust the file size over the header count so interrupted recordings stay readable
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            frame_count = (f.tell() - HEADER_SIZE) // RECORD_SIZE
+
+        if frame_count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r",
+                                     offset=HEADER_SIZE, shape=(frame_count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    @property
+    def landmarks(self):
+        """(T, 21, 3) float32 view of all landmarks"""
+        return self.records["landmarks"]
+
+    @property
+    def capture_times(self):
+        """(T,) capture timestamps"""
+        return self.records["capture_time"]
+
+    def seek_time(self, timestamp):
+        """
+        Find the first frame captured at or after a timestamp
+
+        Returns:
+            int: Record index (len(self) if past the end)
+        """
+        return int(np.searchsorted(self.capture_times, timestamp, side="left"))
+
+    def duration(self):
+        """Seconds between the first and last recorded frame"""
+        if len(self) < 2:
+            return 0.0
+        return float(self.capture_times[-1] - self.capture_times[0])
@@ -0,0 +1,247 @@
+"""
+Debug preview rendering, kept off the control path
+
+The engine hands a snapshot of its latest frame and detections to a
+PreviewRenderer and moves on. The renderer's own thread wakes at a capped
+preview rate, draws the newest snapshot (older ones are simply replaced)
+and passes it to a sink: an OpenCV window, or an MP4 / PNG writer.
+"""
+
+import os
+import threading
+import time
+
+import cv2
+import config
+
+
+VIDEO_EXTENSIONS = (".mp4", ".avi")
+
+
+class RenderSnapshot:
+    """Everything needed to draw one preview frame"""
+
+    __slots__ = ("frame", "mirrored", "hands", "cursor", "fps", "quality", "color_order", "hands_mirrored")
+
+    def __init__(self, frame, mirrored, hands=(), cursor=None, fps=0, quality=None, color_order="BGR",
+                 hands_mirrored=None):
+        """
+        Args:
+            frame: Camera frame; the renderer draws on it in place only if it's mirrored BGR
+            mirrored: True if the frame is already flipped for the mirror view
+            hands: MediaPipe hand landmark lists to draw
+            cursor: (x, y, left_distance, right_distance); distances are None on predicted frames
+            fps: Control loop FPS
+            quality: Quality governor label, or None
+            color_order: "BGR" or "RGB" (RGB capture)
+            hands_mirrored: True if hands and cursor are in flipped-frame coordinates (defaults to mirrored)
+        """
+        self.frame = frame
+        self.mirrored = mirrored
+        self.hands = hands
+        self.cursor = cursor
+        self.fps = fps
+        self.quality = quality
+        self.color_order = color_order
+        self.hands_mirrored = mirrored if hands_mirrored is None else hands_mirrored
+
+
+class WindowSink:
+    """OpenCV preview window; pressing 'q' in it requests quit"""
+
+    interactive = True
+
+    def __init__(self, title="Hand Mouse Controller"):
+        self.title = title
+
+    def show(self, frame):
+        """
+        Returns:
+            bool: False once the user pressed 'q'
+        """
+        cv2.imshow(self.title, frame)
+        return cv2.waitKey(1) & 0xFF != ord('q')
+
+    def close(self):
+        """Called on the render thread: HighGUI windows belong to the thread that shows them"""
+        cv2.destroyAllWindows()
+        cv2.waitKey(1)  # Let HighGUI process the destroy
+
+
+class VideoSink:
+    """Writes the preview to an MP4/AVI file, or to numbered PNGs when the path is a directory"""
+
+    interactive = False
+
+    def __init__(self, path=None, fps=None):
+        """
+        Args:
+            path: .mp4/.avi file, or a directory for PNG frames (config.RENDER_OUTPUT_PATH)
+            fps: Frame rate stored in the video file (config.RENDER_FPS)
+        """
+        self.path = config.RENDER_OUTPUT_PATH if path is None else path
+        self.fps = config.RENDER_FPS if fps is None else fps
+        self.writer = None
+        self.frames_written = 0
+
+        if not self.path.lower().endswith(VIDEO_EXTENSIONS):
+            os.makedirs(self.path, exist_ok=True)
+
+    def show(self, frame):
+        if self.path.lower().endswith(VIDEO_EXTENSIONS):
+            if self.writer is None:
+                height, width = frame.shape[:2]
+                fourcc = cv2.VideoWriter_fourcc(*("mp4v" if self.path.lower().endswith(".mp4") else "MJPG"))
+                self.writer = cv2.VideoWriter(self.path, fourcc, self.fps, (width, height))
+            self.writer.write(frame)
+        else:
+            cv2.imwrite(os.path.join(self.path, f"frame_{self.frames_written:06d}.png"), frame)
+        self.frames_written += 1
+        return True
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+        print(f"🎬 Preview: {self.frames_written} frames written to {self.path}")
+
+
+SINKS = {
+    "window": WindowSink,
+    "video": VideoSink,
+}
+
+
+def create_sink(name=None):
+    """
+    Build a render sink by name
+
+    Args:
+        name: "none", "window" or "video" (defaults to config.RENDER_SINK)
+
+    Returns:
+        Sink, or None for "none"
+    """
+    name = config.RENDER_SINK if name is None else name
+    if name == "none":
+        return None
+    if name not in SINKS:
+        raise ValueError(f"Unknown render sink {name!r}, expected 'none' or one of {sorted(SINKS)}")
+    return SINKS[name]()
+
+
+class PreviewRenderer:
+    """Draws the newest snapshot at a capped rate on its own thread"""
+
+    def __init__(self, sink, fps=None):
+        """
+        Args:
+            sink: WindowSink, VideoSink or anything with show(frame) -> bool and close()
+            fps: Preview rate cap (config.RENDER_FPS)
+        """
+        self.sink = sink
+        self.fps = config.RENDER_FPS if fps is None else fps
+        import mediapipe as mp  # Deferred so importing render.py stays cheap
+        self.mp_hands = mp.solutions.hands
+        self.mp_drawing = mp.solutions.drawing_utils
+
+        self.quit_requested = threading.Event()
+        self._latest = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        # Counters
+        self.frames_rendered = 0
+        self.snapshots_replaced = 0  # Submitted but superseded before the next render tick
+
+    def start(self):
+        """Start the render thread"""
+        self._thread = threading.Thread(target=self._run, name="preview-render", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, snapshot):
+        """Offer a snapshot for the next render tick (never blocks)"""
+        with self._lock:
+            if self._latest is not None:
+                self.snapshots_replaced += 1
+            self._latest = snapshot
+
+    def annotate(self, snapshot):
+        """Draw landmarks, cursor and overlay text onto the snapshot's frame"""
+        frame = snapshot.frame
+        if snapshot.color_order == "RGB":
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        # Landmarks are drawn in their own coordinates, so camera-coordinate ones go on before the flip
+        flip = not snapshot.mirrored
+        if flip and snapshot.hands_mirrored:
+            frame = cv2.flip(frame, 1)
+            flip = False
+        elif flip and frame is snapshot.frame:
+            frame = frame.copy()
+        height, width = frame.shape[:2]
+
+        if config.DEBUG_MODE:
+            for hand_landmarks in snapshot.hands:
+                self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+
+            if snapshot.cursor is not None:
+                x, y, left_distance, right_distance = snapshot.cursor
+                # Draw cursor position on frame
+                cv2.circle(frame, (int(x * width), int(y * height)), 10, (0, 255, 0), -1)
+
+                # Display distances
+                if left_distance is not None:
+                    cv2.putText(frame, f"L-Pinch: {left_distance:.3f}", (10, 30),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+                    cv2.putText(frame, f"R-Pinch: {right_distance:.3f}", (10, 60),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+        if flip:
+            frame = cv2.flip(frame, 1)
+
+        # Display FPS
+        if config.SHOW_FPS:
+            fps_text = f"FPS: {snapshot.fps}"
+            if snapshot.quality is not None:
+                fps_text += f"  {snapshot.quality}"
+            cv2.putText(frame, fps_text, (10, 90),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+        return frame
+
+    def _run(self):
+        try:
+            self._render_loop()
+        finally:
+            self.sink.close()
+
+    def _render_loop(self):
+        interval = 1.0 / self.fps
+        next_tick = time.perf_counter()
+        while not self._stopped.is_set():
+            delay = next_tick - time.perf_counter()
+            if delay > 0 and self._stopped.wait(delay):
+                break
+            # Don't try to catch up on missed ticks
+            next_tick = max(next_tick + interval, time.perf_counter())
+
+            with self._lock:
+                snapshot, self._latest = self._latest, None
+            if snapshot is None:
+                continue
+
+            try:
+                if not self.sink.show(self.annotate(snapshot)):
+                    print("\n👋 Quitting...")
+                    self.quit_requested.set()
+            except Exception as e:
+                print(f"⚠️ Preview failed: {e}")
+            self.frames_rendered += 1
+
+    def stop(self):
+        """Stop the render thread, which closes the sink on its way out"""
+        self._stopped.set()
+        if self._thread is None:
+            self.sink.close()
+            return
+        self._thread.join(1.0)
@@ -0,0 +1,148 @@
+"""
+Replay recorded landmarks through gesture detection, smoothing and mouse output
+
+Runs without a camera, MediaPipe or a display, so production sessions can be
+reproduced and the non-inference path benchmarked on a headless machine.
+
+Usage:
+    python replay.py session.hlm                 # as fast as possible
+    python replay.py session.hlm --realtime      # original speed
+    python replay.py session.hlm --speed 2 --start 30
+    python replay.py session.hlm --latency 0.08  # Kalman latency compensation
+"""
+
+import argparse
+import time
+
+import config
+from cursor_control import CursorController, RecordingMouse
+from recording import LandmarkRecording
+
+
+class _Point:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class RecordedHand:
+    """Exposes a (21, 3) landmark array through MediaPipe's `.landmark[i].x` interface"""
+
+    __slots__ = ("array", "_landmark")
+
+    def __init__(self, landmarks):
+        self.array = landmarks
+        self._landmark = None
+
+    @property
+    def landmark(self):
+        # Built on first use only; GestureDetector reads `array` directly
+        if self._landmark is None:
+            self._landmark = [_Point(x, y, z) for x, y, z in self.array.tolist()]
+        return self._landmark
+
+
+class ReplayEngine:
+    """Feeds a landmark recording through a CursorController"""
+
+    def __init__(self, recording, cursor=None, speed=None, latency=None):
+        """
+        Args:
+            recording: LandmarkRecording to play back
+            cursor: CursorController to drive (defaults to one writing to a RecordingMouse)
+            speed: Playback speed relative to the original (1.0 = realtime, None = as fast as possible)
+            latency: Fixed latency for the default cursor's Kalman filter (config.REPLAY_LATENCY)
+        """
+        self.recording = recording
+        self.speed = speed
+        self.latency = config.REPLAY_LATENCY if latency is None else latency
+        if cursor is None:
+            width = config.SCREEN_WIDTH or 1920
+            height = config.SCREEN_HEIGHT or 1080
+            # Recorded capture times are on another run's clock: measuring latency against
+            # the live clock would always hit max_latency, so the Kalman filter gets a fixed one
+            filter_params = {"latency": self.latency} if config.CURSOR_FILTER == "kalman" else None
+            # Recordings hold mirror-view landmarks
+            cursor = CursorController(width, height, RecordingMouse(), print_gestures=False, mirrored=True,
+                                      filter_params=filter_params)
+        self.cursor = cursor
+
+        self.frames_replayed = 0
+        self.hands_replayed = 0
+        self.processing_time = 0.0
+
+    def run(self, start=0, stop=None):
+        """
+        Replay records [start, stop)
+
+        Returns:
+            dict: Replay statistics
+        """
+        records = self.recording[start:stop]
+        wall_start = time.perf_counter()
+        first_capture_time = records["capture_time"][0] if len(records) else 0.0
+
+        for record in records:
+            capture_time = float(record["capture_time"])
+
+            if self.speed:
+                # Wait until this frame's original offset (scaled by speed) has elapsed
+                due = wall_start + (capture_time - first_capture_time) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            step_start = time.perf_counter()
+            if record["num_hands"]:
+                self.cursor.update(RecordedHand(record["landmarks"]), current_time=capture_time)
+                self.hands_replayed += 1
+            self.processing_time += time.perf_counter() - step_start
+            self.frames_replayed += 1
+
+        elapsed = time.perf_counter() - wall_start
+        return {
+            "frames": self.frames_replayed,
+            "frames_with_hand": self.hands_replayed,
+            "elapsed_s": elapsed,
+            "processing_s": self.processing_time,
+            "us_per_frame": 1e6 * self.processing_time / max(1, self.frames_replayed),
+        }
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Replay a landmark recording")
+    parser.add_argument("path", help="Recording file written with RECORD_LANDMARKS_PATH")
+    parser.add_argument("--realtime", action="store_true", help="Replay at original speed")
+    parser.add_argument("--speed", type=float, default=None, help="Replay speed multiplier")
+    parser.add_argument("--start", type=float, default=None, help="Start offset in seconds")
+    parser.add_argument("--latency", type=float, default=None,
+                        help="Latency the Kalman filter compensates for, in seconds (config.REPLAY_LATENCY)")
+    args = parser.parse_args()
+
+    recording = LandmarkRecording(args.path)
+    speed = args.speed or (1.0 if args.realtime else None)
+    engine = ReplayEngine(recording, speed=speed, latency=args.latency)
+
+    start = 0
+    if args.start is not None and len(recording):
+        start = recording.seek_time(recording.capture_times[0] + args.start)
+
+    print(f"▶️ Replaying {len(recording)} frames ({recording.duration():.1f}s) from {args.path}")
+    stats = engine.run(start=start)
+
+    print("\n" + "="*50)
+    print(f"Frames replayed:      {stats['frames']}")
+    print(f"Frames with a hand:   {stats['frames_with_hand']}")
+    print(f"Wall time:            {stats['elapsed_s']:.2f}s")
+    print(f"Processing per frame: {stats['us_per_frame']:.1f}µs")
+    if isinstance(engine.cursor.mouse, RecordingMouse):
+        print(f"Mouse events:         {engine.cursor.mouse.counts()}")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    main()
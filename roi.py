@@ -0,0 +1,175 @@
+"""
+Region-of-interest inference: run MediaPipe on a crop around the last known hand
+"""
+
+import numpy as np
+import config
+from gestures import landmarks_to_array
+
+
+class ROIInference:
+    """
+    Feeds MediaPipe Hands a crop around the hand found in the previous
+    frame instead of the full frame.
+
+    In video mode MediaPipe tracks the hand from its landmarks in the
+    previous image, so full frames and crops go through separate Hands
+    instances, each seeing one consistent geometry. The crop stays put while
+    the hand moves inside it and is re-centered once a landmark gets close
+    to its edge. When the crop loses the hand, or its confidence drops, the
+    same frame is re-run on the full image. Whenever an instance's input
+    geometry changed since its last image (new crop, re-centre, or full
+    frames after a run of crops), its tracking is reset so it detects afresh
+    instead of tracking from landmarks in other coordinates.
+    """
+
+    def __init__(self, hands, crop_hands, padding=None, min_size=None, edge_margin=None, min_score=None):
+        """
+        Args:
+            hands: mp.solutions.hands.Hands instance for full frames
+            crop_hands: Second Hands instance for crops
+            padding: Padding around the hand box, as a fraction of its size (config.ROI_PADDING)
+            min_size: Minimum crop side in pixels (config.ROI_MIN_SIZE)
+            edge_margin: Normalized distance to the crop edge that triggers re-centering
+                         (config.ROI_EDGE_MARGIN)
+            min_score: Handedness confidence below which the full frame is used (config.ROI_MIN_SCORE)
+        """
+        self.hands = hands
+        self.crop_hands = crop_hands
+        self.padding = config.ROI_PADDING if padding is None else padding
+        self.min_size = config.ROI_MIN_SIZE if min_size is None else min_size
+        self.edge_margin = config.ROI_EDGE_MARGIN if edge_margin is None else edge_margin
+        self.min_score = config.ROI_MIN_SCORE if min_score is None else min_score
+
+        self.roi = None  # (x0, y0, x1, y1) in pixels, None = full frame
+        self.crop_tracked = None   # Crop the crop instance's tracking refers to
+        self.full_tracked = True   # Whether the full-frame instance saw the previous frame
+
+        # Counters
+        self.crop_hits = 0       # Frames answered from the crop alone
+        self.crop_misses = 0     # Crops that lost the hand and fell back to the full frame
+        self.full_frames = 0     # Full-frame inferences (no ROI yet, or fallback)
+        self.pixels_processed = 0
+        self.pixels_full = 0
+        self.tracking_resets = 0
+
+    @staticmethod
+    def _confidence(results):
+        """Handedness score of the first hand (MediaPipe's per-hand confidence)"""
+        if not results.multi_handedness:
+            return 1.0
+        return results.multi_handedness[0].classification[0].score
+
+    def _usable(self, results):
+        return bool(results.multi_hand_landmarks) and self._confidence(results) >= self.min_score
+
+    def _roi_around(self, points, width, height):
+        """Padded square crop around normalized landmark points, clamped to the frame"""
+        x_min, y_min = points[:, 0].min() * width, points[:, 1].min() * height
+        x_max, y_max = points[:, 0].max() * width, points[:, 1].max() * height
+
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.padding)
+        side = int(min(max(side, self.min_size), width, height))
+        center_x = (x_min + x_max) / 2
+        center_y = (y_min + y_max) / 2
+
+        x0 = int(min(max(center_x - side / 2, 0), width - side))
+        y0 = int(min(max(center_y - side / 2, 0), height - side))
+        return x0, y0, x0 + side, y0 + side
+
+    def _near_edge(self, crop_points, x0, y0, x1, y1, width, height):
+        """True if the hand touches a crop edge that isn't also the frame edge"""
+        margin = self.edge_margin
+        near_left = x0 > 0 and crop_points[:, 0].min() < margin
+        near_top = y0 > 0 and crop_points[:, 1].min() < margin
+        near_right = x1 < width and crop_points[:, 0].max() > 1 - margin
+        near_bottom = y1 < height and crop_points[:, 1].max() > 1 - margin
+        return near_left or near_top or near_right or near_bottom
+
+    def _reset_tracking(self, hands):
+        """Drop an instance's tracked hand so its next image starts with palm detection"""
+        hands.reset()
+        self.tracking_resets += 1
+
+    def _full_frame(self, rgb_frame):
+        height, width = rgb_frame.shape[:2]
+        if not self.full_tracked:
+            self._reset_tracking(self.hands)
+            self.full_tracked = True
+        results = self.hands.process(rgb_frame)
+        self.full_frames += 1
+        self.pixels_processed += width * height
+
+        # Only crop when exactly one hand is tracked; a crop would hide any other
+        if self._usable(results) and len(results.multi_hand_landmarks) == 1:
+            points = landmarks_to_array(results.multi_hand_landmarks[0])
+            self.roi = self._roi_around(points, width, height)
+        else:
+            self.roi = None
+        return results
+
+    def process(self, rgb_frame):
+        """
+        Run hand detection, using the crop when possible
+
+        Args:
+            rgb_frame: Full RGB frame
+
+        Returns:
+            MediaPipe results with landmarks in full-frame normalized coordinates
+        """
+        height, width = rgb_frame.shape[:2]
+        self.pixels_full += width * height
+
+        if self.roi is None:
+            return self._full_frame(rgb_frame)
+
+        x0, y0, x1, y1 = self.roi
+        if self.crop_tracked != self.roi:
+            self._reset_tracking(self.crop_hands)
+            self.crop_tracked = self.roi
+        self.full_tracked = False
+        crop = np.ascontiguousarray(rgb_frame[y0:y1, x0:x1])
+        results = self.crop_hands.process(crop)
+        self.pixels_processed += (x1 - x0) * (y1 - y0)
+
+        if not self._usable(results):
+            self.crop_misses += 1
+            return self._full_frame(rgb_frame)
+
+        self.crop_hits += 1
+        crop_width, crop_height = x1 - x0, y1 - y0
+        crop_points = landmarks_to_array(results.multi_hand_landmarks[0])
+
+        # Remap every hand from crop-normalized to frame-normalized coordinates
+        scale_x, scale_y = crop_width / width, crop_height / height
+        offset_x, offset_y = x0 / width, y0 / height
+        for hand_landmarks in results.multi_hand_landmarks:
+            for point in hand_landmarks.landmark:
+                point.x = offset_x + point.x * scale_x
+                point.y = offset_y + point.y * scale_y
+                point.z = point.z * scale_x  # z shares x's scale in MediaPipe
+
+        if self._near_edge(crop_points, x0, y0, x1, y1, width, height):
+            frame_points = crop_points * (scale_x, scale_y, 1.0) + (offset_x, offset_y, 0.0)
+            self.roi = self._roi_around(frame_points, width, height)
+
+        return results
+
+    def reset(self):
+        """Forget the current crop; the next frame is processed in full"""
+        self.roi = None
+        self.crop_tracked = None
+
+    def stats(self):
+        """
+        Returns:
+            dict: Crop hit/miss counters and the fraction of pixels actually processed
+        """
+        return {
+            "crop_hits": self.crop_hits,
+            "crop_misses": self.crop_misses,
+            "full_frames": self.full_frames,
+            "tracking_resets": self.tracking_resets,
+            "pixel_ratio": self.pixels_processed / self.pixels_full if self.pixels_full else 1.0,
+        }
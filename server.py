@@ -0,0 +1,383 @@
+"""
+Multi-session hand mouse server: several cameras, one shared inference worker pool
+
+Each session is one camera driving its own mouse output, with its own
+cursor filter, click/scroll state and metrics (a HandSession). All of
+them share a bounded InferencePool: every session's stream is pinned to
+one worker, which keeps a separate MediaPipe graph per stream.
+
+Scheduling, per session:
+  - capture runs on its own thread and keeps only the newest frame, so a
+    slow session never builds a backlog;
+  - at most config.SESSION_MAX_IN_FLIGHT frames are queued or in inference
+    at once, and the dispatcher hands frames to the pool round-robin
+    across sessions, so a fast camera can't crowd out the others;
+  - load shedding: a frame whose age plus the session's recent
+    submit-to-result time already exceeds its latency SLO is dropped
+    before inference; the session's next frame is fresher.
+
+Usage:
+    python server.py --session desk=0 --session tv=http://192.168.1.20:4747/video
+"""
+
+import argparse
+import threading
+import time
+
+import config
+from capture import open_capture
+from inference_pool import InferencePool
+from metrics import Metrics, MetricsGroup, MetricsServer, SnapshotLogger
+from output import MouseInjector, create_backend, screen_size
+from session import HandSession
+
+
+class ServerSession(HandSession):
+    """One camera and mouse output served by HandMouseServer"""
+
+    # Weight of the newest sample in the submit-to-result time estimate
+    SERVICE_TIME_ALPHA = 0.2
+
+    def __init__(self, name, capture, mouse, screen_size, stream, slo=None, max_in_flight=None, metrics=None,
+                 record_path=None):
+        """
+        Args:
+            name: Session label in logs and metrics
+            capture: Frame source with read() -> (success, frame, capture_time)
+            stream: Inference pool stream id (selects the worker and its Hands instance)
+            slo: Capture-to-output latency target in seconds (config.SESSION_LATENCY_SLO)
+            max_in_flight: Frames queued or in inference at once (config.SESSION_MAX_IN_FLIGHT)
+        """
+        super().__init__(mouse, screen_size, color_order=capture.color_order, metrics=metrics,
+                         record_path=record_path, name=name)
+        # The server sheds frames itself rather than skipping and predicting
+        self.scheduler = None
+        self.capture = capture
+        self.stream = stream
+        self.slo = config.SESSION_LATENCY_SLO if slo is None else slo
+        self.max_in_flight = max(1, config.SESSION_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight)
+
+        # Newest captured frame not yet dispatched: (frame, capture_time), or None
+        self.latest = None
+        self.capture_done = False
+        self.in_flight = 0
+        self.service_time = 0.0  # Smoothed submit-to-result seconds
+        self.last_submit = 0.0
+
+        # Counters
+        self.frames_captured = 0
+        self.frames_replaced = 0
+        self.frames_shed = 0
+        self.frames_inferred = 0
+        self.slo_violations = 0
+
+    @property
+    def ready(self):
+        """True if a frame is waiting and the session may put another one in flight"""
+        return self.latest is not None and self.in_flight < self.max_in_flight
+
+    def should_shed(self, capture_time, now):
+        """
+        True if a frame can no longer finish within the SLO
+
+        A session that has shed everything for a second lets one frame
+        through anyway, so its service time estimate keeps up with the pool.
+        """
+        if now - self.last_submit > 1.0:
+            return False
+        return now - capture_time + self.service_time > self.slo
+
+    def record_service_time(self, seconds):
+        if self.frames_inferred == 0:
+            self.service_time = seconds
+        else:
+            self.service_time += self.SERVICE_TIME_ALPHA * (seconds - self.service_time)
+        self.frames_inferred += 1
+
+    def counters(self):
+        """Session counters for metrics export"""
+        return dict(
+            self.output_counters(),
+            frames_captured=self.frames_captured,
+            frames_replaced=self.frames_replaced,
+            frames_shed=self.frames_shed,
+            slo_violations=self.slo_violations,
+            dropped_frames=self.capture.dropped_frames,
+        )
+
+
+class HandMouseServer:
+    """Runs several ServerSessions over one InferencePool"""
+
+    def __init__(self, sessions=None, workers=None, hands_factory=None, factory_args=None, warmup=None):
+        """
+        Args:
+            sessions: Session specs (config.SERVER_SESSIONS): dicts with "name" and "source" (anything
+                      open_capture takes) or "capture" (an opened frame source), optionally "backend"
+                      (name or backend object, default config.OUTPUT_BACKEND), "slo" and "max_in_flight"
+            workers: Inference worker processes (config.SERVER_WORKERS)
+            hands_factory, factory_args, warmup: Passed to InferencePool
+        """
+        specs = config.SERVER_SESSIONS if sessions is None else sessions
+        if not specs:
+            raise ValueError("No sessions configured (SERVER_SESSIONS or --session name=source)")
+        workers = config.SERVER_WORKERS if workers is None else workers
+
+        self.metrics = MetricsGroup(label="session")
+        self.sessions = []
+        try:
+            for stream, spec in enumerate(specs):
+                self.sessions.append(self.open_session(stream, spec))
+        except Exception:
+            self.close_sessions()
+            raise
+
+        # One ring slot per frame any session may have in flight: the dispatcher never waits on the ring
+        self.pool = InferencePool(workers=workers, slots=sum(session.max_in_flight for session in self.sessions),
+                                  hands_factory=hands_factory, factory_args=factory_args, warmup=warmup)
+
+        self._condition = threading.Condition()
+        self._pending = {}  # seq -> (session, capture_time, submit_time)
+        self._next_session = 0
+        self._seq = 0
+        self._threads = []
+        self._errors = []
+        self.running = False
+        self._stopped = False
+        self._drain_deadline = 0.0
+        self.metrics_server = None
+        self.metrics_logger = None
+
+    def open_session(self, stream, spec):
+        """Open a session's camera and mouse output"""
+        name = spec.get("name", f"session-{stream}")
+        capture = spec.get("capture")
+        if capture is None:
+            capture = open_capture(spec["source"])
+        if not capture.isOpened():
+            capture.release()
+            raise Exception(f"Session {name}: could not open {spec.get('source')}")
+
+        backend = spec.get("backend")
+        if backend is None or isinstance(backend, str):
+            backend = create_backend(backend)
+        metrics = self.metrics.add(name, Metrics())
+        mouse = MouseInjector(backend, metrics=metrics).start()
+        session = ServerSession(name, capture, mouse, screen_size(backend), stream, slo=spec.get("slo"),
+                                max_in_flight=spec.get("max_in_flight"), metrics=metrics,
+                                record_path=spec.get("record_path"))
+        metrics.add_source(session.counters)
+        return session
+
+    def start(self):
+        """Start the inference workers (one Hands per session), then capture, dispatch and result threads"""
+        self.pool.start()
+        for session in self.sessions:
+            self.pool.open_stream(session.stream)
+
+        self.running = True
+        for session in self.sessions:
+            self._start_thread(self._capture_loop, f"capture-{session.name}", session)
+        self._start_thread(self._dispatch_loop, "dispatch")
+        self._start_thread(self._result_loop, "results")
+
+        if config.METRICS_PORT is not None:
+            self.metrics_server = MetricsServer(self.metrics).start()
+            print(f"📈 Metrics at {self.metrics_server.url}")
+        if config.METRICS_LOG_PATH:
+            self.metrics_logger = SnapshotLogger(self.metrics).start()
+            print(f"📈 Metrics snapshots every {self.metrics_logger.interval:.0f}s to {self.metrics_logger.path}")
+        return self
+
+    def _start_thread(self, target, name, *args):
+        thread = threading.Thread(target=self._run_loop, args=(target, *args), name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _run_loop(self, loop, *args):
+        """Run a worker loop, stopping the whole server if it fails (wait() re-raises the error)"""
+        try:
+            loop(*args)
+        except Exception as e:
+            self._errors.append(e)
+            self.stop()
+
+    def _capture_loop(self, session):
+        """Keep the session's newest frame; an unread older frame is replaced, never queued"""
+        while self.running:
+            success, frame, capture_time = session.capture.read()
+            with self._condition:
+                if not success:
+                    session.capture_done = True
+                    self._condition.notify_all()
+                    return
+                session.frames_captured += 1
+                if session.latest is not None:
+                    session.frames_replaced += 1
+                session.latest = (frame, capture_time)
+                self._condition.notify_all()
+
+    def _has_ready_session(self):
+        return any(session.ready for session in self.sessions)
+
+    def _pick_session(self):
+        """Next session with a dispatchable frame, round-robin from the one after the last served"""
+        count = len(self.sessions)
+        for offset in range(count):
+            session = self.sessions[(self._next_session + offset) % count]
+            if session.ready:
+                self._next_session = (session.stream + 1) % count
+                return session
+        return None
+
+    def _dispatch_loop(self):
+        """Hand frames to the pool fairly, shedding those that can't meet their session's SLO"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: not self.running or self._has_ready_session())
+                if not self.running:
+                    return
+                session = self._pick_session()
+                frame, capture_time = session.latest
+                session.latest = None
+
+                now = time.perf_counter()
+                if session.should_shed(capture_time, now):
+                    session.frames_shed += 1
+                    continue
+                session.in_flight += 1
+                session.last_submit = now
+
+            # Slots match the in-flight limits, so one is free; None only once the pool is closing
+            slot = self.pool.acquire_slot()
+            if slot is None:
+                return
+            _, rgb_frame = session.preprocess(frame, out=self.pool.view(slot, frame.shape))
+            with self._condition:
+                seq = self._seq
+                self._seq += 1
+                self._pending[seq] = (session, capture_time, time.perf_counter())
+            self.pool.submit(seq, slot, rgb_frame.shape, stream=session.stream)
+
+    def _result_loop(self):
+        """Act on each finished inference in its session: gestures, mouse output, latency accounting"""
+        while self.running or (self._pending and time.perf_counter() < self._drain_deadline):
+            result = self.pool.get_result(timeout=0.1)
+            if result is None:
+                continue
+            seq, results, duration = result
+            now = time.perf_counter()
+            with self._condition:
+                session, capture_time, submit_time = self._pending.pop(seq)
+            session.record_service_time(now - submit_time)
+            session.metrics.observe("queue", max(0.0, now - submit_time - duration))
+
+            session.finish_inference(results, now - duration, duration)
+            session.process_frame(results, capture_time)
+            if session.record_frame(capture_time) > session.slo:
+                session.slo_violations += 1
+            session.calculate_fps()
+
+            with self._condition:
+                session.in_flight -= 1
+                self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """
+        Wait until every session's camera has stopped delivering frames
+
+        Returns:
+            bool: True once all captures are done, False on timeout
+
+        Raises:
+            Exception: The first error of a capture, dispatch or result thread (the server has stopped)
+        """
+        with self._condition:
+            done = self._condition.wait_for(
+                lambda: self._errors or all(session.capture_done for session in self.sessions), timeout=timeout)
+        if self._errors:
+            raise self._errors[0]
+        return done
+
+    def stop(self, timeout=2.0):
+        """Stop the threads (results of frames in flight are still processed), then the pool and outputs
+
+        Safe to call again and from a failing worker thread: only the first call closes the pool and outputs,
+        every call waits for the other threads.
+        """
+        with self._condition:
+            first = not self._stopped
+            if first:
+                self._stopped = True
+                self.running = False
+                self._drain_deadline = time.perf_counter() + timeout
+                self._condition.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        if not first:
+            return
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.metrics_logger is not None:
+            self.metrics_logger.stop()
+        self.pool.close()
+        self.close_sessions()
+
+    def close_sessions(self):
+        for session in self.sessions:
+            session.capture.release()
+            session.close()
+
+    def report(self):
+        """Print a per-session summary"""
+        for session in self.sessions:
+            frame = session.metrics.histogram("frame")
+            p95 = frame.quantile(0.95) if frame.count else 0.0
+            print(f"👤 {session.name}: {session.frames_captured} frames captured, "
+                  f"{session.frames_inferred} inferred, {session.frames_shed} shed, "
+                  f"{session.frames_replaced} replaced before dispatch; "
+                  f"p95 latency ≤ {p95 * 1000:.0f} ms, {session.slo_violations} over the "
+                  f"{session.slo * 1000:.0f} ms SLO")
+        print(f"🧠 Inference pool: frames per worker {self.pool.frames_per_worker}")
+
+    def run(self):
+        """Serve until every camera stops or Ctrl+C; a worker thread error stops the server and is re-raised"""
+        self.start()
+        print(f"🚀 Serving {len(self.sessions)} sessions on {self.pool.workers} inference workers")
+        try:
+            while not self.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            print("\n⚠️ Interrupted by user")
+        finally:
+            print("\n🧹 Cleaning up...")
+            self.stop()
+            self.report()
+
+
+def parse_session(text):
+    """'name=source' from the command line; numeric sources are camera indices"""
+    name, separator, source = text.partition("=")
+    if not separator or not name or not source:
+        raise argparse.ArgumentTypeError(f"expected name=source, got {text!r}")
+    return {"name": name, "source": int(source) if source.isdigit() else source}
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Serve several hand mouse sessions over one inference pool")
+    parser.add_argument("--session", type=parse_session, action="append", default=None,
+                        help="name=source (camera index, video file or stream URL); repeat per session")
+    parser.add_argument("--workers", type=int, default=None, help="Inference worker processes")
+    parser.add_argument("--backend", default=None, help="Output backend for --session sessions")
+    args = parser.parse_args()
+
+    sessions = args.session
+    if sessions is not None and args.backend is not None:
+        sessions = [dict(spec, backend=args.backend) for spec in sessions]
+    HandMouseServer(sessions, workers=args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Per-session hand mouse state: everything one user's cursor carries from frame to frame
+
+A session owns the cursor controller (position filter, click and scroll
+state), its mouse output, frame preprocessing, the frame-skip scheduler,
+the landmark recorder, its metrics and FPS counter. It never touches a
+camera or a MediaPipe graph: HandMouseController runs one session on its
+own camera and model, server.py runs many over a shared inference pool.
+"""
+
+import time
+
+import config
+from cursor_control import CursorController
+from prediction import InferenceScheduler
+from preprocess import FramePreprocessor
+from recording import LandmarkRecorder
+
+
+class HandSession:
+    """Gesture, cursor and output state of one hand-tracking session"""
+
+    def __init__(self, mouse, screen_size, alpha=0.5, color_order="BGR", metrics=None, record_path=None,
+                 name=None, mirror=None):
+        """
+        Args:
+            mouse: Output with the moveTo/mouseDown/mouseUp/rightClick/scroll API (output.MouseInjector)
+            screen_size: (width, height) the cursor is mapped to
+            alpha: Exponential smoothing factor for the "combined" cursor filter
+            color_order: Channel order of this session's camera frames
+            metrics: metrics.Metrics to record stage latencies and counters into, or None
+            record_path: Landmark recording file for replay.py, or None
+            name: Label in logs and metrics
+            mirror: "landmarks" or "image" (config.MIRROR_MODE); "landmarks" for detections from unflipped frames
+        """
+        self.name = name
+        self.mouse = mouse
+        self.screen_width, self.screen_height = screen_size
+        self.metrics = metrics
+
+        # MediaPipe input: reused RGB buffer, frame flipped only in "image" mirror mode
+        self.preprocessor = FramePreprocessor(mirror=mirror, color_order=color_order)
+        mirrored = self.preprocessor.mirrors_image
+
+        # Cursor, click and scroll handling (gesture detector + smoothing filter)
+        self.cursor = CursorController(self.screen_width, self.screen_height, mouse=mouse, alpha=alpha,
+                                       mirrored=mirrored)
+
+        # Optionally skip MediaPipe on some frames and predict the cursor in between
+        self.scheduler = InferenceScheduler() if config.FRAME_SKIP else None
+
+        # Optional landmark recording for offline replay
+        self.recorder = LandmarkRecorder(record_path, mirrored=mirrored) if record_path else None
+
+        # FPS calculation
+        self.fps_counter = 0
+        self.fps_start_time = time.time()
+        self.current_fps = 0
+
+    def should_infer(self, capture_time):
+        """Frame skipping: True if MediaPipe should run on this frame, False to predict the cursor"""
+        if self.scheduler is None:
+            return True
+        return self.scheduler.should_infer(capture_time, self.cursor.hand_speed)
+
+    def preprocess(self, frame, out=None):
+        """
+        Prepare a camera frame for MediaPipe
+
+        Args:
+            out: Array to write the RGB frame into (an inference pool slot), None = reused buffer
+
+        Returns:
+            tuple: (display_frame, rgb_frame); rgb_frame is a reused buffer, or `out`
+        """
+        start_time = time.perf_counter()
+        prepared = self.preprocessor.prepare(frame, out)
+        if self.metrics is not None:
+            self.metrics.observe("preprocess", time.perf_counter() - start_time)
+        return prepared
+
+    def finish_inference(self, results, start_time, duration):
+        """Account for a finished inference (the results are left as MediaPipe returned them)"""
+        if self.scheduler is not None:
+            self.scheduler.record_inference(start_time, duration)
+        if self.metrics is not None:
+            self.metrics.observe("inference", duration)
+        return results
+
+    def process_frame(self, results, capture_time=None):
+        """
+        Move the cursor and handle gestures for a frame's detections
+
+        Returns:
+            tuple: (x, y, left_distance, right_distance) of the last hand, or None
+        """
+        if self.recorder is not None:
+            self.recorder.write(results, capture_time)
+
+        start_time = time.perf_counter()
+        cursor_state = None
+        if results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                # Move cursor and handle click/scroll gestures
+                cursor_state = self.cursor.update(hand_landmarks, capture_time)
+        else:
+            self.cursor.hand_lost()
+
+        if self.metrics is not None:
+            self.metrics.observe("gestures", time.perf_counter() - start_time)
+            self.metrics.count("detections" if results.multi_hand_landmarks else "frames_without_hand")
+        return cursor_state
+
+    def predict_frame(self, capture_time):
+        """
+        Move the cursor along the predicted path on a frame without inference
+
+        Returns:
+            tuple: (x, y, None, None), or None when no hand is tracked
+        """
+        start_time = time.perf_counter()
+        position = self.cursor.update_predicted(capture_time)
+        if self.metrics is not None:
+            self.metrics.observe("gestures", time.perf_counter() - start_time)
+            self.metrics.count("predicted_frames")
+        return None if position is None else (position[0], position[1], None, None)
+
+    def record_frame(self, capture_time):
+        """
+        Count a finished frame and its capture-to-output latency
+
+        Returns:
+            float: The latency in seconds
+        """
+        latency = time.perf_counter() - capture_time
+        if self.metrics is not None:
+            self.metrics.count("frames")
+            self.metrics.observe("frame", latency)
+        return latency
+
+    def calculate_fps(self):
+        """
+        Count a frame towards the FPS figure
+
+        Returns:
+            bool: True when current_fps was just updated (about once a second)
+        """
+        self.fps_counter += 1
+        if time.time() - self.fps_start_time > 1:
+            self.current_fps = self.fps_counter
+            self.fps_counter = 0
+            self.fps_start_time = time.time()
+            return True
+        return False
+
+    def output_counters(self):
+        """Mouse event counters of this session's output, for metrics export"""
+        events = self.mouse.event_counts
+        return {
+            "cursor_moves": events.get("moveTo", 0),
+            "left_clicks": events.get("mouseDown", 0),
+            "right_clicks": events.get("rightClick", 0),
+            "scroll_events": events.get("scroll", 0),
+            "moves_coalesced": self.mouse.moves_coalesced,
+        }
+
+    def close(self):
+        """Stop the mouse output and finish the recording"""
+        self.mouse.stop()
+        if self.recorder is not None:
+            self.recorder.close()
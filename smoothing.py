@@ -2,32 +2,140 @@
 Smoothing filters for hand tracking data
 """
 
+import math
+import time
 import numpy as np
-from collections import deque
+import config
+
+
+# Filter factories by name, selected with config.CURSOR_FILTER
+FILTERS = {}
+
+
+def register_filter(name):
+    """Class decorator adding a filter to the registry under `name`"""
+    def register(cls):
+        FILTERS[name] = cls
+        return cls
+    return register
+
+
+def create_filter(name=None, **overrides):
+    """
+    Build a registered filter
+
+    Args:
+        name: Registry name (defaults to config.CURSOR_FILTER)
+        **overrides: Constructor arguments taking precedence over config.CURSOR_FILTER_PARAMS
+
+    Returns:
+        Filter with update(x, y, timestamp=None) and reset()
+    """
+    name = config.CURSOR_FILTER if name is None else name
+    if name not in FILTERS:
+        raise ValueError(f"Unknown filter {name!r}, expected one of {sorted(FILTERS)}")
+    params = dict(config.CURSOR_FILTER_PARAMS.get(name, {}))
+    params.update(overrides)
+    return FILTERS[name](**params)
 
 
 class MovingAverageFilter:
-    """Simple moving average filter for position smoothing"""
+    """
+    Simple moving average filter for position smoothing
+
+    Keeps running sums over a preallocated ring, so each update costs the
+    same whatever the window size.
+    """
+    
+    __slots__ = ("window_size", "x_history", "y_history", "sum_x", "sum_y", "count", "index")
     
     def __init__(self, window_size=5):
         self.window_size = window_size
-        self.x_history = deque(maxlen=window_size)
-        self.y_history = deque(maxlen=window_size)
+        self.x_history = [0.0] * window_size
+        self.y_history = [0.0] * window_size
+        self.reset()
     
-    def update(self, x, y):
+    def update(self, x, y, timestamp=None):
         """Add new position and return smoothed position"""
-        self.x_history.append(x)
-        self.y_history.append(y)
+        index = self.index
+        self.sum_x += x - self.x_history[index]
+        self.sum_y += y - self.y_history[index]
+        self.x_history[index] = x
+        self.y_history[index] = y
         
-        smooth_x = sum(self.x_history) / len(self.x_history)
-        smooth_y = sum(self.y_history) / len(self.y_history)
+        index += 1
+        if index == self.window_size:
+            index = 0
+            # Re-sum once per lap so rounding in the running sums can't build up
+            self.sum_x = sum(self.x_history)
+            self.sum_y = sum(self.y_history)
+        self.index = index
+        if self.count < self.window_size:
+            self.count += 1
         
-        return smooth_x, smooth_y
+        return self.sum_x / self.count, self.sum_y / self.count
+    
+    def reset(self):
+        """Clear history"""
+        for i in range(self.window_size):
+            self.x_history[i] = 0.0
+            self.y_history[i] = 0.0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.count = 0
+        self.index = 0
+
+
+class ArrayMovingAverageFilter:
+    """
+    Moving average over many channels at once, e.g. all 21 landmarks x 3 coordinates
+
+    A preallocated numpy ring of shape (window_size, *shape) with running
+    sums: one update is O(1) per channel and allocates only the returned array.
+    """
+    
+    __slots__ = ("window_size", "history", "sums", "count", "index")
+    
+    def __init__(self, shape, window_size=5):
+        """
+        Args:
+            shape: Shape of one sample, e.g. (21, 3)
+            window_size: Samples averaged
+        """
+        self.window_size = window_size
+        self.history = np.zeros((window_size,) + tuple(np.atleast_1d(shape)), dtype=np.float64)
+        self.sums = np.zeros(self.history.shape[1:], dtype=np.float64)
+        self.reset()
+    
+    def update(self, values, out=None):
+        """
+        Add a sample and return the average of the last window_size samples
+
+        Args:
+            values: Array of the filter's sample shape
+            out: Optional float64 array to write the result into
+        """
+        slot = self.history[self.index]
+        self.sums -= slot
+        slot[...] = values
+        self.sums += slot
+        
+        self.index += 1
+        if self.index == self.window_size:
+            self.index = 0
+            # Re-sum once per lap so rounding in the running sums can't build up
+            self.history.sum(axis=0, out=self.sums)
+        if self.count < self.window_size:
+            self.count += 1
+        
+        return np.divide(self.sums, self.count, out=out)
     
     def reset(self):
         """Clear history"""
-        self.x_history.clear()
-        self.y_history.clear()
+        self.history.fill(0.0)
+        self.sums.fill(0.0)
+        self.count = 0
+        self.index = 0
 
 
 class ExponentialFilter:
@@ -42,7 +150,7 @@ class ExponentialFilter:
         self.prev_x = None
         self.prev_y = None
     
-    def update(self, x, y):
+    def update(self, x, y, timestamp=None):
         """Apply exponential smoothing"""
         if self.prev_x is None:
             self.prev_x = x
@@ -75,7 +183,7 @@ class DeadZoneFilter:
         self.last_x = None
         self.last_y = None
     
-    def update(self, x, y):
+    def update(self, x, y, timestamp=None):
         """Only return new position if movement exceeds threshold"""
         if self.last_x is None:
             self.last_x = x
@@ -97,6 +205,7 @@ class DeadZoneFilter:
         self.last_y = None
 
 
+@register_filter("combined")
 class CombinedFilter:
     """Combines multiple filters for optimal smoothing"""
     
@@ -105,7 +214,7 @@ class CombinedFilter:
         self.dead_zone = DeadZoneFilter(dead_zone)
         self.exponential = ExponentialFilter(alpha)
     
-    def update(self, x, y):
+    def update(self, x, y, timestamp=None):
         """Apply all filters in sequence"""
         # First apply exponential smoothing for responsiveness
         x, y = self.exponential.update(x, y)
@@ -123,3 +232,169 @@ class CombinedFilter:
         self.moving_avg.reset()
         self.dead_zone.reset()
         self.exponential.reset()
+
+
+@register_filter("one_euro")
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al., CHI 2012): a low-pass filter whose cutoff
+    rises with speed, so slow movement is smoothed hard and fast movement
+    gets little lag
+    """
+    
+    def __init__(self, min_cutoff=1.0, beta=0.007, d_cutoff=1.0, freq=30.0):
+        """
+        Args:
+            min_cutoff: Cutoff frequency (Hz) at rest. Lower = less jitter when still
+            beta: Cutoff increase per pixel/s of speed. Higher = less lag when moving fast
+            d_cutoff: Cutoff frequency (Hz) for the speed estimate
+            freq: Assumed sample rate when no timestamps are given
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.freq = freq
+        self.reset()
+    
+    @staticmethod
+    def _alpha(cutoff, dt):
+        """Smoothing factor of a first-order low-pass filter at this cutoff and time step"""
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+    
+    def update(self, x, y, timestamp=None):
+        """Filter a new position; timestamps (seconds) make the cutoff follow the real frame rate"""
+        if self.prev_x is None:
+            self.prev_x, self.prev_y = x, y
+            self.last_time = timestamp
+            return x, y
+        
+        if timestamp is not None and self.last_time is not None and timestamp > self.last_time:
+            dt = timestamp - self.last_time
+        else:
+            dt = 1.0 / self.freq
+        self.last_time = timestamp
+        
+        # Smoothed speed drives the cutoff; both axes share it so the direction isn't distorted
+        alpha_d = self._alpha(self.d_cutoff, dt)
+        self.dx = alpha_d * (x - self.prev_x) / dt + (1 - alpha_d) * self.dx
+        self.dy = alpha_d * (y - self.prev_y) / dt + (1 - alpha_d) * self.dy
+        cutoff = self.min_cutoff + self.beta * math.hypot(self.dx, self.dy)
+        
+        alpha = self._alpha(cutoff, dt)
+        self.prev_x = alpha * x + (1 - alpha) * self.prev_x
+        self.prev_y = alpha * y + (1 - alpha) * self.prev_y
+        
+        return self.prev_x, self.prev_y
+    
+    def reset(self):
+        """Reset filter state"""
+        self.prev_x = None
+        self.prev_y = None
+        self.dx = 0.0
+        self.dy = 0.0
+        self.last_time = None
+
+
+@register_filter("kalman")
+class KalmanFilter:
+    """
+    Constant-velocity Kalman filter that also compensates pipeline latency.
+
+    The filter tracks position and velocity on each axis. After each
+    correction it extrapolates the position forward by the time that has
+    passed since the frame was captured, so the cursor goes where the
+    finger is now rather than where the camera saw it.
+    """
+    
+    def __init__(self, process_noise=5000.0, measurement_noise=16.0, prediction=1.0,
+                 max_latency=0.15, latency=None, freq=30.0, clock=time.perf_counter):
+        """
+        Args:
+            process_noise: White acceleration noise density (px²/s³). Higher = follows
+                           direction changes faster, lower = smoother
+            measurement_noise: Landmark position noise variance (px²)
+            prediction: Fraction of the measured latency to predict ahead (0 = no compensation)
+            max_latency: Upper bound on the latency compensated for (seconds)
+            latency: Fixed latency instead of measuring clock() - timestamp; use for
+                     replayed or synthetic timestamps that aren't on `clock`
+            freq: Assumed sample rate when no timestamps are given
+            clock: Clock the update() timestamps come from (capture uses time.perf_counter)
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.prediction = prediction
+        self.max_latency = max_latency
+        self.latency = latency
+        self.freq = freq
+        self.clock = clock
+        self.last_latency = 0.0
+        self.reset()
+    
+    def _latency(self, timestamp):
+        """Seconds between capture and now, clamped to [0, max_latency]"""
+        if self.latency is not None:
+            latency = self.latency
+        elif timestamp is None:
+            return 0.0
+        else:
+            latency = self.clock() - timestamp
+        return min(max(latency, 0.0), self.max_latency)
+    
+    def update(self, x, y, timestamp=None):
+        """Correct with a measured position and return the latency-compensated estimate"""
+        if self.x is None:
+            self.x, self.y = x, y
+            self.vx = self.vy = 0.0
+            # Position known to measurement accuracy, velocity not at all (~1000 px/s)
+            self.p00, self.p01, self.p11 = self.measurement_noise, 0.0, 1e6
+            self.last_time = timestamp
+        else:
+            if timestamp is not None and self.last_time is not None and timestamp > self.last_time:
+                dt = timestamp - self.last_time
+            else:
+                dt = 1.0 / self.freq
+            self.last_time = timestamp
+            
+            # Predict: both axes share one model, so they share one covariance
+            q = self.process_noise
+            self.x += self.vx * dt
+            self.y += self.vy * dt
+            self.p00 += 2 * dt * self.p01 + dt * dt * self.p11 + q * dt ** 3 / 3
+            self.p01 += dt * self.p11 + q * dt * dt / 2
+            self.p11 += q * dt
+            
+            # Correct with the measured position
+            gain_p = self.p00 / (self.p00 + self.measurement_noise)
+            gain_v = self.p01 / (self.p00 + self.measurement_noise)
+            residual_x, residual_y = x - self.x, y - self.y
+            self.x += gain_p * residual_x
+            self.y += gain_p * residual_y
+            self.vx += gain_v * residual_x
+            self.vy += gain_v * residual_y
+            self.p11 -= gain_v * self.p01
+            self.p00 *= 1 - gain_p
+            self.p01 *= 1 - gain_p
+        
+        # Extrapolate from capture time to now
+        self.last_latency = self._latency(timestamp)
+        ahead = self.prediction * self.last_latency
+        return self.x + self.vx * ahead, self.y + self.vy * ahead
+    
+    def reset(self):
+        """Reset filter state"""
+        self.x = self.y = None
+        self.vx = self.vy = 0.0
+        self.p00 = self.p01 = self.p11 = 0.0
+        self.last_time = None
+
+
+@register_filter("none")
+class PassthroughFilter:
+    """No smoothing: positions go straight through"""
+    
+    def update(self, x, y, timestamp=None):
+        return x, y
+    
+    def reset(self):
+        pass
@@ -0,0 +1,77 @@
+"""
+Startup timing: time-to-first-cursor breakdown
+
+Import this module first (hand_mouse.py does) so PROCESS_START is taken
+before the heavy imports.
+"""
+
+import threading
+import time
+
+
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimer:
+    """
+    Records when startup stages begin and end (they may overlap across threads)
+    and when the first frame and the first cursor move happen
+    """
+
+    def __init__(self, start=None):
+        """
+        Args:
+            start: perf_counter() value counted as time zero (defaults to PROCESS_START)
+        """
+        self.start = PROCESS_START if start is None else start
+        self.stages = {}   # name -> (begin, end) in seconds since start
+        self.events = {}   # name -> seconds since start, first occurrence only
+        self._lock = threading.Lock()
+
+    def now(self):
+        return time.perf_counter() - self.start
+
+    def timed(self, name, function, *args, **kwargs):
+        """Run function and record it as stage `name`; safe to call from worker threads"""
+        begin = self.now()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.stages[name] = (begin, self.now())
+
+    def mark(self, name):
+        """
+        Record an event the first time it happens
+
+        Returns:
+            bool: True if this was the first time
+        """
+        if name in self.events:
+            return False
+        with self._lock:
+            if name in self.events:
+                return False
+            self.events[name] = self.now()
+        return True
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: {"stages": {name: {"begin_s", "end_s", "duration_s"}}, "events": {name: seconds}}
+        """
+        return {
+            "stages": {
+                name: {"begin_s": round(begin, 4), "end_s": round(end, 4), "duration_s": round(end - begin, 4)}
+                for name, (begin, end) in self.stages.items()
+            },
+            "events": {name: round(t, 4) for name, t in self.events.items()},
+        }
+
+    def report(self):
+        """Print the breakdown, stages in start order"""
+        print("⏱️ Startup breakdown:")
+        for name, (begin, end) in sorted(self.stages.items(), key=lambda item: item[1][0]):
+            print(f"   {name:<14}{begin * 1000:>8.0f} → {end * 1000:>6.0f} ms  ({(end - begin) * 1000:.0f} ms)")
+        for name, t in sorted(self.events.items(), key=lambda item: item[1]):
+            print(f"   {name:<14}{t * 1000:>8.0f} ms")
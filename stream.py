@@ -0,0 +1,247 @@
+"""
+Network MJPEG stream source (DroidCam's http://<phone-ip>:4747/video and similar)
+
+One thread pulls the multipart HTTP stream and cuts it into JPEGs, a second
+decodes them, at reduced scale (IMREAD_REDUCED_COLOR_2/4/8) when frames are
+larger than the hand model needs. Both hand over through single latest-frame
+slots, so a slow consumer only ever gets the newest frame. When the
+connection drops, the fetch thread reconnects with exponential backoff while
+read() keeps waiting, so the engine and its MediaPipe graph stay up.
+"""
+
+import threading
+import time
+import urllib.request
+
+import cv2
+import numpy as np
+import config
+
+
+STREAM_SCHEMES = ("http://", "https://")
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+JPEG_START = b"\xff\xd8"
+JPEG_END = b"\xff\xd9"
+
+
+def is_stream_url(source):
+    return isinstance(source, str) and source.lower().startswith(STREAM_SCHEMES)
+
+
+def decode_reduction(width, max_reduction, min_width):
+    """
+    Returns:
+        int: Largest JPEG decode reduction (1, 2, 4 or 8) up to max_reduction that keeps
+             frames at least min_width pixels wide
+    """
+    reduction = 1
+    for candidate in (2, 4, 8):
+        if candidate <= max_reduction and width // candidate >= min_width:
+            reduction = candidate
+    return reduction
+
+
+def split_jpegs(read, chunk_size=65536):
+    """
+    Cut a byte stream into JPEG images by their start/end markers
+
+    Works whatever the multipart boundary and headers look like (servers
+    disagree on both, and not all send Content-Length).
+
+    Args:
+        read: Callable returning up to chunk_size bytes, b"" at end of stream
+
+    Yields:
+        bytes: One complete JPEG
+    """
+    buffer = bytearray()
+    search_from = 0  # Where to resume looking for the end marker
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk
+        while True:
+            start = buffer.find(JPEG_START)
+            if start < 0:
+                # Keep a trailing 0xFF in case it's the first half of a start marker
+                del buffer[:max(0, len(buffer) - 1)]
+                search_from = 0
+                break
+            end = buffer.find(JPEG_END, max(start + 2, search_from))
+            if end < 0:
+                del buffer[:start]
+                search_from = max(0, len(buffer) - 1)
+                break
+            yield bytes(buffer[start:end + 2])
+            del buffer[:end + 2]
+            search_from = 0
+
+
+class MJPEGStreamCapture:
+    """
+    Capture source for an MJPEG-over-HTTP stream, with the same interface as
+    capture.ThreadedCapture (isOpened / read / release, BGR frames)
+    """
+
+    def __init__(self, url, connect_timeout=None, read_timeout=None, max_reduction=None,
+                 min_width=None, backoff_initial=None, backoff_max=None):
+        """
+        Args:
+            url: Stream URL
+            connect_timeout: Seconds to connect, and to wait on a stalled stream before
+                             reconnecting (config.STREAM_CONNECT_TIMEOUT)
+            read_timeout: Seconds read() waits for a new frame before failing, None to wait
+                          through reconnects until release() (config.STREAM_READ_TIMEOUT)
+            max_reduction: Largest decode reduction, 1 = full size (config.STREAM_MAX_REDUCTION)
+            min_width: Never decode narrower than this (config.STREAM_MIN_DECODE_WIDTH)
+            backoff_initial, backoff_max: Reconnect delay bounds in seconds (config.STREAM_BACKOFF_*)
+        """
+        self.url = url
+        self.color_order = "BGR"
+        self.connect_timeout = config.STREAM_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        self.read_timeout = config.STREAM_READ_TIMEOUT if read_timeout is None else read_timeout
+        self.max_reduction = config.STREAM_MAX_REDUCTION if max_reduction is None else max_reduction
+        self.min_width = config.STREAM_MIN_DECODE_WIDTH if min_width is None else min_width
+        self.backoff_initial = config.STREAM_BACKOFF_INITIAL if backoff_initial is None else backoff_initial
+        self.backoff_max = config.STREAM_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.reduction = None  # Chosen from the first frame's size
+
+        # Counters
+        self.frames_received = 0  # JPEGs pulled off the network
+        self.frames_captured = 0  # JPEGs decoded
+        self.dropped_frames = 0   # Received or decoded but replaced by a newer frame before use
+        self.decode_errors = 0
+        self.reconnects = 0
+
+        self._condition = threading.Condition()
+        self._jpeg = None   # (jpeg bytes, capture_time) waiting for the decoder
+        self._frame = None  # (seq, frame, capture_time), newest decoded
+        self._last_read_seq = 0
+        self._stopped = threading.Event()
+        self._connected = threading.Event()
+        self._response = None
+
+        self._fetch_thread = threading.Thread(target=self._fetch, name="stream-fetch", daemon=True)
+        self._decode_thread = threading.Thread(target=self._decode, name="stream-decode", daemon=True)
+        self._fetch_thread.start()
+        self._decode_thread.start()
+
+        # Like opening a camera: fail now if the stream isn't there at all
+        self._opened = self._connected.wait(self.connect_timeout)
+        if not self._opened:
+            print(f"❌ Could not connect to {url}")
+            self.release()
+
+    def _fetch(self):
+        """Network thread: read the stream, keep the newest JPEG, reconnect when it drops"""
+        backoff = self.backoff_initial
+        while not self._stopped.is_set():
+            try:
+                # The timeout also bounds each socket read, so a stalled stream raises too
+                with urllib.request.urlopen(self.url, timeout=self.connect_timeout) as response:
+                    self._response = response
+                    self._connected.set()
+                    for jpeg in split_jpegs(response.read1):
+                        self._offer(jpeg, time.perf_counter())
+                        backoff = self.backoff_initial
+                        if self._stopped.is_set():
+                            return
+                reason = "stream ended"
+            except Exception as e:  # Connection refused, reset, timeout, bad response, closed by release()
+                reason = str(e) or type(e).__name__
+            finally:
+                self._response = None
+
+            if self._stopped.is_set():
+                return
+            self.reconnects += 1
+            print(f"📡 Stream lost ({reason}), reconnecting in {backoff:.1f}s")
+            if self._stopped.wait(backoff):
+                return
+            backoff = min(backoff * 2, self.backoff_max)
+
+    def _offer(self, jpeg, capture_time):
+        with self._condition:
+            self.frames_received += 1
+            if self._jpeg is not None:
+                # The decoder hasn't caught up: the older frame is stale, skip it
+                self.dropped_frames += 1
+            self._jpeg = (jpeg, capture_time)
+            self._condition.notify_all()
+
+    def _decode(self):
+        """Decoder thread: turn the newest JPEG into a (possibly reduced) BGR frame"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._jpeg is not None or self._stopped.is_set())
+                if self._stopped.is_set():
+                    return
+                jpeg, capture_time = self._jpeg
+                self._jpeg = None
+
+            data = np.frombuffer(jpeg, dtype=np.uint8)
+            frame = cv2.imdecode(data, REDUCED_DECODE_FLAGS[self.reduction or 1])
+            if frame is None:
+                self.decode_errors += 1
+                continue
+            if self.reduction is None:
+                self.reduction = decode_reduction(frame.shape[1], self.max_reduction, self.min_width)
+                if self.reduction != 1:
+                    print(f"📡 Stream {frame.shape[1]}x{frame.shape[0]}, decoding at 1/{self.reduction} size")
+                    frame = cv2.imdecode(data, REDUCED_DECODE_FLAGS[self.reduction])
+
+            with self._condition:
+                self.frames_captured += 1
+                self._frame = (self.frames_captured, frame, capture_time)
+                self._condition.notify_all()
+
+    def _has_new_frame(self):
+        return self._frame is not None and self._frame[0] > self._last_read_seq
+
+    def isOpened(self):
+        return self._opened and not self._stopped.is_set()
+
+    def read(self):
+        """
+        Return the newest decoded frame not yet handed out, waiting for one if needed
+
+        Returns:
+            tuple: (success, frame, capture_time); capture_time (time.perf_counter()) is
+                   when the JPEG finished arriving
+        """
+        deadline = None if self.read_timeout is None else time.perf_counter() + self.read_timeout
+        with self._condition:
+            while not self._has_new_frame() and not self._stopped.is_set():
+                remaining = 0.5 if deadline is None else min(0.5, deadline - time.perf_counter())
+                if remaining <= 0:
+                    break
+                # Short waits keep Ctrl+C responsive while a reconnect is in progress
+                self._condition.wait(remaining)
+            if not self._has_new_frame():
+                return False, None, None
+
+            seq, frame, capture_time = self._frame
+            self.dropped_frames += seq - self._last_read_seq - 1
+            self._last_read_seq = seq
+            return True, frame, capture_time
+
+    def release(self):
+        """Stop both threads and close the connection"""
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        response = self._response
+        if response is not None:
+            try:
+                response.close()  # Unblocks the fetch thread's read
+            except Exception:
+                pass
+        for thread in (self._fetch_thread, self._decode_thread):
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
@@ -0,0 +1,157 @@
+"""
+Parity test: per-frame and batched gesture evaluation must match the original gesture formulas frame by frame
+
+Runs without a camera. Use `python test_batch_gestures.py` or pytest.
+"""
+
+import math
+
+import numpy as np
+import pytest
+from gestures import GestureDetector, FEATURE_PAIRS, PINCH, RIGHT_PINCH, _landmarks_from_wire, landmarks_to_array
+import config
+from hand_results import landmark_list
+
+
+def make_landmarks(num_frames=4000, seed=0):
+    """Random hands at several scales, plus frames pushed onto the detector thresholds"""
+    rng = np.random.default_rng(seed)
+    scales = rng.choice([0.05, 0.1, 0.2, 0.4], size=(num_frames, 1, 1))
+    landmarks = (rng.random((num_frames, 21, 3)) * scales).astype(np.float32)
+
+    # Place thumb/index and thumb/middle exactly at the pinch threshold on some frames
+    for i in range(0, num_frames, 7):
+        for pair in (FEATURE_PAIRS[PINCH], FEATURE_PAIRS[RIGHT_PINCH]):
+            a, b = pair
+            landmarks[i, b] = landmarks[i, a] + np.float32(config.PINCH_THRESHOLD) * np.array([1, 0, 0], np.float32)
+    return landmarks
+
+
+def reference_gestures(points):
+    """
+    The original per-landmark gesture checks, written out independently of gestures.py
+
+    Args:
+        points: (21, 3) landmarks as Python floats
+
+    Returns:
+        tuple: (is_pinching, pinch distance, is_right_pinching, right pinch distance,
+                is_fist, is_pointing, is_scroll_pose)
+    """
+    def distance(a, b):
+        return math.sqrt((points[a][0] - points[b][0]) ** 2 +
+                         (points[a][1] - points[b][1]) ** 2 +
+                         (points[a][2] - points[b][2]) ** 2)
+
+    pinch = distance(4, 8)
+    right_pinch = distance(4, 12)
+    fist = sum(distance(0, tip) for tip in (4, 8, 12, 16, 20)) / 5
+    pointing = distance(5, 8) > 0.15 and distance(9, 12) < 0.12
+    extended = sum(distance(tip, base) > 0.15 for tip, base in ((8, 5), (12, 9), (16, 13), (20, 17)))
+    return (pinch < config.PINCH_THRESHOLD, pinch, right_pinch < config.PINCH_THRESHOLD, right_pinch,
+            fist < config.FIST_THRESHOLD, pointing, extended >= 3)
+
+
+def check_parity(landmarks):
+    """
+    Compare per-frame GestureDetector results and batch results against reference_gestures
+
+    Returns:
+        int: Number of mismatching values (distances within 1e-12)
+    """
+    detector = GestureDetector()
+    batch = detector.compute_features_batch(landmarks)
+    mismatches = 0
+
+    def differ(expected, actual):
+        if isinstance(expected, float):
+            return not math.isclose(expected, actual, rel_tol=1e-12, abs_tol=1e-12)
+        return expected != actual
+
+    for t in range(len(landmarks)):
+        expected = reference_gestures(landmarks[t].tolist())
+        hand = landmark_list(landmarks[t])
+        is_pinching, pinch_distance = detector.detect_pinch(hand)
+        is_right, right_distance = detector.detect_two_finger_pinch(hand)
+        scalar = (
+            is_pinching, pinch_distance, is_right, right_distance,
+            detector.detect_fist(hand), detector.detect_pointing(hand),
+            detector.detect_scroll_gesture(hand),
+        )
+        batched = (
+            bool(batch.is_pinching[t]), float(batch.pinch_distance[t]),
+            bool(batch.is_right_pinching[t]), float(batch.right_pinch_distance[t]),
+            bool(batch.is_fist[t]), bool(batch.is_pointing[t]), bool(batch.is_scroll_pose[t]),
+        )
+        for actual in (scalar, batched):
+            mismatches += sum(differ(e, a) for e, a in zip(expected, actual))
+
+    return mismatches
+
+
+def test_batch_matches_detector():
+    assert check_parity(make_landmarks()) == 0
+
+
+def test_distances_on_the_threshold_do_not_pinch():
+    # Exactly representable in float64: thumb at the origin, index and middle tips at the threshold
+    landmarks = make_landmarks(50, seed=3).astype(np.float64)
+    landmarks[:, 4] = 0.0
+    landmarks[:, 8] = (config.PINCH_THRESHOLD, 0.0, 0.0)
+    landmarks[:, 12] = (0.0, config.PINCH_THRESHOLD, 0.0)
+    features = GestureDetector().compute_features_batch(landmarks)
+
+    assert reference_gestures(landmarks[0].tolist())[:4] == (False, config.PINCH_THRESHOLD, False,
+                                                             config.PINCH_THRESHOLD)
+    assert not features.is_pinching.any() and not features.is_right_pinching.any()
+    assert np.array_equal(features.pinch_distance, np.full(50, config.PINCH_THRESHOLD))
+
+
+def test_batch_wrappers_match_features():
+    landmarks = make_landmarks(500, seed=1)
+    detector = GestureDetector()
+    features = detector.compute_features_batch(landmarks)
+
+    assert np.array_equal(detector.detect_pinch_batch(landmarks)[0], features.is_pinching)
+    assert np.array_equal(detector.detect_two_finger_pinch_batch(landmarks)[0], features.is_right_pinching)
+    assert np.array_equal(detector.detect_fist_batch(landmarks), features.is_fist)
+    assert np.array_equal(detector.detect_pointing_batch(landmarks), features.is_pointing)
+    assert np.array_equal(detector.detect_scroll_gesture_batch(landmarks), features.is_scroll_pose)
+
+
+def scored_landmark_list(points, visibility=False, presence=False):
+    """A NormalizedLandmarkList holding the given points, with MediaPipe's optional per-point scores"""
+    hand = landmark_list(points)
+    for point in hand.landmark:
+        if visibility:
+            point.visibility = 0.9
+        if presence:
+            point.presence = 0.8
+    return hand
+
+
+@pytest.mark.parametrize("visibility, presence, from_wire", [
+    (False, False, True), (True, False, False), (False, True, False), (True, True, False)])
+def test_protobuf_landmarks_match_scalar_distances(visibility, presence, from_wire):
+    landmarks = make_landmarks(200, seed=2)
+    landmarks[::5, 3] = 0.0  # Coordinates at the proto default must still be read back
+    detector = GestureDetector()
+
+    for points in landmarks:
+        hand = scored_landmark_list(points, visibility, presence)
+        # The serialized-bytes shortcut only takes plain x, y, z lists; the rest read attributes
+        assert (_landmarks_from_wire(hand) is not None) == from_wire
+        assert np.array_equal(landmarks_to_array(hand), points.astype(np.float64))
+
+        expected = [GestureDetector.calculate_distance(hand.landmark[a], hand.landmark[b]) for a, b in FEATURE_PAIRS]
+        assert np.allclose(detector.compute_features(hand).distances, expected, rtol=1e-12, atol=0)
+
+
+if __name__ == "__main__":
+    print("🧪 Checking per-frame and batched gesture evaluation against the reference formulas...")
+    landmarks = make_landmarks()
+    mismatches = check_parity(landmarks)
+    if mismatches:
+        print(f"❌ {mismatches} mismatching values over {len(landmarks)} frames")
+        raise SystemExit(1)
+    print(f"✅ GestureDetector and batch results match the reference on all {len(landmarks)} frames")
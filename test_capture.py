@@ -0,0 +1,108 @@
+"""
+Threaded capture tests: newest-frame handout, dropped-frame counting, slow cameras and release, with a fake camera
+"""
+
+import threading
+import time
+
+import numpy as np
+from capture import ThreadedCapture
+
+
+class FakeCamera:
+    """Stand-in cv2.VideoCapture: read() blocks until the test releases the next frame"""
+
+    def __init__(self):
+        self.frames = []  # Frames (numbered arrays) or False for a failed read
+        self.available = threading.Semaphore(0)
+        self.in_read = False
+        self.released = False
+        self.reads = 0
+
+    def push(self, *numbers):
+        for number in numbers:
+            self.frames.append(number)
+            self.available.release()
+
+    def read(self):
+        self.in_read = True
+        self.available.acquire()
+        item = self.frames.pop(0)
+        self.reads += 1
+        self.in_read = False
+        if item is False:
+            return False, None
+        return True, np.full((2, 2, 3), item, dtype=np.uint8)
+
+    def isOpened(self):
+        return not self.released
+
+    def release(self):
+        assert not self.in_read, "released while the reader was inside read()"
+        self.released = True
+
+
+def wait_for_reads(camera, count, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while camera.reads < count and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    time.sleep(0.02)  # Let the reader store the frame
+
+
+def test_read_hands_out_the_newest_frame_and_counts_drops():
+    camera = FakeCamera()
+    capture = ThreadedCapture(camera, buffer_size=3)
+    camera.push(1, 2, 3)
+    wait_for_reads(camera, 3)
+
+    success, frame, capture_time = capture.read()
+    assert success and frame[0, 0, 0] == 3 and capture_time <= time.perf_counter()
+    assert capture.dropped_frames == 2 and capture.frames_captured == 3
+    assert [seq for seq, _, _ in capture.recent_frames()] == [1, 2, 3]
+
+    camera.push(4)
+    assert capture.read()[1][0, 0, 0] == 4 and capture.dropped_frames == 2
+
+    camera.push(5)  # Lets the reader return from its pending read before release
+    capture.release()
+    assert camera.released
+
+
+def test_slow_camera_is_waited_for():
+    camera = FakeCamera()
+    capture = ThreadedCapture(camera)
+    threading.Timer(1.5, camera.push, args=(7,)).start()  # A camera that takes a while to start
+
+    start = time.perf_counter()
+    success, frame, _ = capture.read()
+    assert success and frame[0, 0, 0] == 7 and time.perf_counter() - start >= 1.4
+
+    camera.push(8)
+    capture.release()
+
+
+def test_failure_and_release_end_reads():
+    camera = FakeCamera()
+    capture = ThreadedCapture(camera)
+    camera.push(1, False)
+    wait_for_reads(camera, 2)
+    assert capture.read()[0]  # The frame before the failure is still handed out
+    assert capture.read() == (False, None, None)
+
+    # A reader blocked waiting for a frame wakes up when the capture is released
+    camera = FakeCamera()
+    capture = ThreadedCapture(camera)
+    results = []
+    reader = threading.Thread(target=lambda: results.append(capture.read()))
+    reader.start()
+    time.sleep(0.1)
+    # release() must wait for the camera thread to leave cap.read() before freeing the camera
+    releaser = threading.Thread(target=capture.release)
+    releaser.start()
+    reader.join(1.0)
+    assert results == [(False, None, None)]
+    time.sleep(1.2)  # However long the driver takes
+    assert releaser.is_alive() and not camera.released
+    camera.push(9)
+    releaser.join(1.0)
+    assert camera.released
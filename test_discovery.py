@@ -0,0 +1,152 @@
+"""
+Camera discovery tests: parallel probing, timeouts and the cache-first open path, without real cameras
+"""
+
+import threading
+import time
+
+import config
+import discovery
+
+
+def profile(index, name="Camera"):
+    return {"index": index, "name": name, "backend": "TEST", "width": 640, "height": 480, "fps": 30.0,
+            "resolutions": [[640, 480]], "open_latency_s": 0.01, "first_frame_latency_s": 0.02,
+            "probed_at": "2026-01-01T00:00:00"}
+
+
+class FakeCapture:
+    def __init__(self, opened, frames=True, stall=None):
+        self.opened = opened
+        self.frames = frames  # Whether reads succeed
+        self.stall = stall    # Event a read waits for (a device that opens but never sends a frame)
+        self.released = False
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if self.stall is not None:
+            self.stall.wait(5)
+        return (True, object(), time.perf_counter()) if self.frames else (False, None, None)
+
+    def release(self):
+        self.released = True
+
+
+def test_discover_runs_probes_in_parallel_and_abandons_slow_ones():
+    release = threading.Event()
+
+    def probe(index, resolutions):
+        if index == 3:
+            release.wait(5)  # A driver call that never comes back in time
+        time.sleep(0.2)
+        return profile(index) if index % 2 == 0 else None
+
+    start = time.perf_counter()
+    profiles, timed_out = discovery.discover(indices=range(6), timeout=0.5, probe=probe)
+    elapsed = time.perf_counter() - start
+    # The abandoned probe can't hold up interpreter exit
+    assert [thread.daemon for thread in threading.enumerate() if thread.name == "camera-probe-3"] == [True]
+    release.set()
+
+    assert [p["index"] for p in profiles] == [0, 2, 4]
+    assert timed_out == [3]
+    assert elapsed < 1.0  # Six 0.2 s probes one after another would take 1.2 s
+
+
+def test_select_device_prefers_name():
+    profiles = [profile(0, "Integrated Webcam"), profile(2, "DroidCam Source 3")]
+    assert discovery.select_device(profiles, "droidcam")["index"] == 2
+    assert discovery.select_device(profiles, "missing")["index"] == 0
+    # Without names (Windows), the fallback index keeps the old default
+    assert discovery.select_device(profiles, "droidcam", index=0)["index"] == 2
+    assert discovery.select_device(profiles, "missing", index=2)["index"] == 2
+    assert discovery.select_device(profiles, None, index=5)["index"] == 0
+    assert discovery.select_device([], None) is None
+
+
+def test_cache_round_trip(tmp_path):
+    path = str(tmp_path / "cache.json")
+    assert discovery.load_cache(path) is None
+    discovery.save_cache([profile(0), profile(1, "DroidCam")], 1, path)
+    cache = discovery.load_cache(path)
+    assert discovery.cached_profile(cache)["name"] == "DroidCam"
+
+
+def test_open_camera_uses_cache_without_probing(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    discovery.save_cache([profile(1, "DroidCam")], 1, path)
+    monkeypatch.setattr(config, "CAMERA_INDEX", None)
+    monkeypatch.setattr(discovery, "discover", lambda: (_ for _ in ()).throw(AssertionError("probed")))
+
+    cap, index = discovery.open_camera(path, open_function=lambda i: FakeCapture(opened=True))
+    assert index == 1 and cap.isOpened()
+
+
+def test_open_camera_reprobes_when_cached_device_fails(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    discovery.save_cache([profile(1, "DroidCam")], 1, path)
+    monkeypatch.setattr(config, "CAMERA_INDEX", None)
+    monkeypatch.setattr(config, "CAMERA_NAME", None)
+    # The device moved from index 1 to index 2
+    monkeypatch.setattr(discovery, "discover", lambda: ([profile(0, "Webcam"), profile(2, "DroidCam")], []))
+
+    opened = []
+
+    def open_function(index):
+        opened.append(FakeCapture(opened=index == 2))
+        return opened[-1]
+
+    cap, index = discovery.open_camera(path, open_function=open_function)
+    assert index == 2 and cap.isOpened()
+    assert opened[0].released
+    assert discovery.load_cache(path)["selected"] == 2
+
+
+def test_open_camera_reprobes_when_cached_device_sends_no_frame(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    discovery.save_cache([profile(0, "MSMF"), profile(1, "MSMF")], 1, path)
+    monkeypatch.setattr(config, "CAMERA_INDEX", None)
+    monkeypatch.setattr(config, "CAMERA_NAME", None)
+    monkeypatch.setattr(config, "CAMERA_PROBE_TIMEOUT", 0.3)
+    monkeypatch.setattr(discovery, "discover", lambda: ([profile(0, "MSMF"), profile(2, "MSMF")], [1]))
+    stall = threading.Event()
+
+    opened = []
+
+    def open_function(index):
+        # Index 1 opens fine, then never delivers a frame
+        opened.append(FakeCapture(opened=True, stall=stall if index == 1 else None))
+        return opened[-1]
+
+    start = time.perf_counter()
+    cap, index = discovery.open_camera(path, open_function=open_function)
+    assert time.perf_counter() - start < 1.0
+    # Not released while its read is stuck in the driver; nothing matches by name, and the old index is gone
+    assert not opened[0].released and index == 0
+    stall.set()
+
+    # A device that opens but fails its first read is released before probing
+    discovery.save_cache([profile(0, "MSMF")], 0, path)
+    monkeypatch.setattr(discovery, "discover", lambda: ([profile(0, "MSMF")], []))
+    opened.clear()
+
+    def open_failing_first(index):
+        opened.append(FakeCapture(opened=True, frames=bool(opened)))
+        return opened[-1]
+
+    discovery.open_camera(path, open_function=open_failing_first)
+    assert opened[0].released and not opened[1].released
+
+
+def test_first_run_prefers_the_fallback_index(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    monkeypatch.setattr(config, "CAMERA_INDEX", None)
+    monkeypatch.setattr(config, "CAMERA_NAME", None)
+    monkeypatch.setattr(config, "CAMERA_FALLBACK_INDEX", 1)
+    # Windows: every device is named after the capture backend
+    monkeypatch.setattr(discovery, "discover", lambda: ([profile(0, "MSMF"), profile(1, "MSMF")], []))
+
+    cap, index = discovery.open_camera(path, open_function=lambda i: FakeCapture(opened=True))
+    assert index == 1 and discovery.load_cache(path)["selected"] == 1
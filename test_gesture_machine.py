@@ -0,0 +1,84 @@
+"""
+Gesture state machine tests: hysteresis, hold frames, shared cooldowns and scrolling on hand-made feature vectors
+"""
+
+import numpy as np
+import pytest
+from gesture_machine import DOWN, SCROLL, UP, Gesture, GestureEvent, GestureMachine, default_gestures
+from gestures import GestureDetector, EXTENSIONS, NUM_PAIRS, PINCH, RIGHT_PINCH, THUMB_TIP, INDEX_TIP, WRIST
+import config
+
+
+def frame(pinch=1.0, right_pinch=1.0, open_palm=False, wrist_y=0.5):
+    """Pair distances and landmarks of one frame"""
+    distances = np.full(NUM_PAIRS, 0.05)
+    distances[PINCH] = pinch
+    distances[RIGHT_PINCH] = right_pinch
+    distances[EXTENSIONS] = 0.2 if open_palm else 0.05
+    points = np.zeros((21, 3))
+    points[WRIST, 1] = wrist_y
+    return distances, points
+
+
+def test_hysteresis_and_hold_frames():
+    machine = GestureMachine([Gesture("click", "button", [(INDEX_TIP, THUMB_TIP)], below=0.05, release=0.08,
+                                      hold_frames=2)])
+    steps = [machine.step(*frame(pinch=pinch), current_time=t) for t, pinch in
+             enumerate([0.04, 0.04, 0.06, 0.07, 0.09, 0.04, 0.09, 0.04, 0.04])]
+    assert steps == [
+        [], [GestureEvent("click", DOWN)],  # Held for two frames
+        [], [],                             # Still pinched until past the release threshold
+        [GestureEvent("click", UP)],
+        [], [],                             # A single pinched frame is not enough
+        [], [GestureEvent("click", DOWN)],
+    ]
+
+
+def test_clicks_share_a_cooldown():
+    machine = GestureMachine()
+    cooldown = config.CLICK_COOLDOWN
+    # Both pinches on one frame: only the first gesture in the table acts
+    assert machine.step(*frame(pinch=0.01, right_pinch=0.01), current_time=1.0) == [
+        GestureEvent("left_click", DOWN)]
+    assert machine.step(*frame(right_pinch=0.01), current_time=1.0 + cooldown / 2) == [
+        GestureEvent("left_click", UP)]
+    assert machine.step(*frame(right_pinch=0.01), current_time=1.0 + cooldown * 1.1) == [
+        GestureEvent("right_click", DOWN)]
+    assert machine.is_pressed("right_click") and not machine.is_pressed("left_click")
+
+
+def test_scroll_follows_the_wrist_unless_pinching():
+    machine = GestureMachine()
+    step = 1.0
+    events = []
+    for wrist_y, pinch in [(0.5, 1.0), (0.6, 1.0), (0.6, 0.01), (0.45, 1.0), (0.3, 1.0)]:
+        step += 1.0
+        events += [event for event in machine.step(*frame(pinch=pinch, open_palm=True, wrist_y=wrist_y), step)
+                   if event.kind == SCROLL]
+    moved = 0.1 * config.CAMERA_HEIGHT
+    # The pinch drops the scroll anchor: the frame after it only sets a new one
+    assert events == [GestureEvent("scroll", SCROLL, -int(moved / 10)),
+                      GestureEvent("scroll", SCROLL, -int(-1.5 * moved / 10))]
+
+
+def test_more_gestures_same_evaluation():
+    extra = [Gesture(f"extra_{k}", "button", [(WRIST, INDEX_TIP)], below=0.01) for k in range(20)]
+    machine = GestureMachine(default_gestures() + extra)
+    assert machine.step(*frame(pinch=0.01), current_time=1.0) == [GestureEvent("left_click", DOWN)]
+    assert len(machine._columns) == 2 + 4 + 20  # One row per (gesture, pair), all compared at once
+
+
+def test_table_rows_resolve_their_pairs_once():
+    scroll = {gesture.name: gesture for gesture in default_gestures()}["scroll"]
+    assert scroll.columns.tolist() == list(range(7, 11))
+    assert scroll.pose(frame(open_palm=True)[0]) and not scroll.pose(frame()[0])
+    with pytest.raises(ValueError):
+        Gesture("thumb_to_wrist_x", "button", [(THUMB_TIP, 3)], below=0.1)
+
+
+def test_detector_pinch_threshold_is_the_table_threshold():
+    detector = GestureDetector()
+    assert detector.pinch_threshold == detector.gestures["left_click"].threshold == config.PINCH_THRESHOLD
+    detector.pinch_threshold = 0.08
+    assert detector.gestures["right_click"].threshold == 0.08
+    assert detector.pose("left_click", frame(pinch=0.07)[0])
@@ -0,0 +1,66 @@
+"""
+Quality governor tests: step-down, step-up and backoff on simulated per-level frame costs
+"""
+
+from governor import QualityGovernor
+
+BUDGET = 1 / 30
+LEVELS = [(1.0, 1), (1.0, 0), (0.5, 0)]
+
+
+def governor(**kwargs):
+    return QualityGovernor(target_fps=30, levels=LEVELS, window=10, downgrade_ratio=1.0, upgrade_ratio=0.6,
+                           **kwargs)
+
+
+def run(gov, costs, frames):
+    """Feed frames whose latency depends on the current level; returns the frame numbers of switches"""
+    changed = []
+    for frame in range(frames):
+        if gov.record(costs[gov.level_index] * BUDGET):
+            changed.append(frame)
+    return changed
+
+
+def test_steps_down_after_one_slow_window():
+    gov = governor(upgrade_dwell=10)
+    assert run(gov, [1.5, 1.2, 0.8], 25) == [9, 19]
+    assert gov.level_index == 2 and [switch[:2] for switch in gov.switches] == [(0, 1), (1, 2)]
+
+
+def test_steps_up_after_the_dwell():
+    gov = governor(upgrade_dwell=10, start_level=2)
+    # One window to judge the level, then the dwell on top
+    assert run(gov, [0.9, 0.5, 0.3], 60) == [19, 39]
+    assert gov.level_index == 0
+
+
+def test_no_dwell_steps_up_on_the_first_window():
+    gov = governor(upgrade_dwell=0, start_level=1)
+    assert run(gov, [0.5, 0.5, 0.5], 10) == [9]
+
+
+def test_levels_far_apart_in_cost_do_not_flap():
+    # Level 0 is over budget and level 1 is under the step-up threshold: the ratio gap can't settle it
+    costs = [1.2, 0.5, 0.3]
+    flapping = run(governor(upgrade_dwell=0), costs, 2000)
+    assert len(flapping) == 200  # Without a dwell: a switch (and a Hands rebuild) every window
+
+    gov = governor(upgrade_dwell=10)
+    changed = run(gov, costs, 2000)
+    assert len(changed) == 15
+    # Each failed step up doubles the wait before the next, so the gaps keep growing
+    gaps = [up - down for down, up in zip(changed[0::2], changed[1::2])]
+    assert all(later > earlier for earlier, later in zip(gaps, gaps[1:]))
+    assert gov.dwell > 10
+
+
+def test_a_step_up_that_holds_resets_the_backoff():
+    gov = governor(upgrade_dwell=10)
+    run(gov, [1.2, 0.5, 0.3], 200)
+    assert gov.dwell > 10
+    # The load drops: level 0 now fits, and holding it restores the short dwell
+    while gov.level_index:
+        gov.record(0.3 * BUDGET)
+    run(gov, [0.8, 0.5, 0.3], 200)
+    assert gov.level_index == 0 and gov.dwell == 10
@@ -0,0 +1,107 @@
+"""
+Inference pool tests: the shared frame ring, and frame-ordered results through the pipeline from
+worker processes running a stand-in for MediaPipe Hands
+"""
+
+import threading
+import time
+
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+from inference_pool import InferencePool, SharedFrameRing
+from pipeline import PipelineEngine
+
+
+class StampHands:
+    """Stand-in Hands: reports the frame number stamped into pixel (0, 0) as the wrist x coordinate"""
+
+    def __init__(self, slow_runs):
+        self.slow_runs = slow_runs
+
+    def process(self, rgb_frame):
+        index = int(rgb_frame[0, 0, 0])
+        if (index - 1) // 3 in self.slow_runs:
+            time.sleep(0.03)  # Finish after the next run's frames on the other worker
+        hand = landmark_pb2.NormalizedLandmarkList()
+        hand.landmark.add(x=index / 1000, y=0.5, z=0.0)
+        handedness = classification_pb2.ClassificationList()
+        handedness.classification.add(label="Right", score=1.0)
+
+        class Results:
+            multi_hand_landmarks = [hand]
+            multi_hand_world_landmarks = None
+            multi_handedness = [handedness]
+        return Results()
+
+    def close(self):
+        pass
+
+
+class StampedCapture:
+    """Frames numbered 1..count, then waits until told to report end of stream"""
+
+    def __init__(self, count, shape=(48, 64, 3)):
+        self.count = count
+        self.shape = shape
+        self.sent = 0
+        self.done = threading.Event()
+
+    def read(self):
+        if self.sent == self.count:
+            self.done.wait(10)
+            return False, None, None
+        self.sent += 1
+        frame = np.zeros(self.shape, dtype=np.uint8)
+        frame[0, 0] = self.sent
+        return True, frame, time.perf_counter()
+
+
+def test_ring_slots():
+    ring = SharedFrameRing(2, 12 * 16 * 3)
+    try:
+        assert ring.fit((12, 16, 3)) == (12, 16, 3)
+        assert ring.fit((24, 32, 3)) == (12, 16, 3)  # Too big: scaled down, same aspect
+
+        first, second = ring.acquire(), ring.acquire()
+        assert {first, second} == {0, 1}
+        assert ring.acquire(timeout=0.01) is None and ring.in_flight == 2
+        ring.view(first, (12, 16, 3))[:] = 7
+        assert (ring.array[first, :12 * 16 * 3] == 7).all()
+        ring.release(first)
+        assert ring.acquire(timeout=0.01) == first
+    finally:
+        ring.close()
+    assert ring.acquire() is None
+
+
+def test_pool_results_come_back_in_frame_order():
+    count = 18
+    pool = InferencePool(workers=2, affinity=3, frame_shape=(48, 64, 3), hands_factory=StampHands,
+                         factory_args=({0, 2, 4},), warmup=False).start()
+    capture = StampedCapture(count)
+    handled = []
+
+    def submit(packet):
+        slot = pool.acquire_slot()
+        np.copyto(pool.view(slot, packet.frame.shape), packet.frame)
+        pool.submit(packet.seq, slot, packet.frame.shape)
+        packet.pending = True
+
+    def output(packet):
+        handled.append((packet.seq, round(packet.results.multi_hand_landmarks[0].landmark[0].x * 1000)))
+        if len(handled) == count:
+            capture.done.set()
+
+    engine = PipelineEngine(capture, submit, output, drop_policies={"inference": "block"}, pool=pool,
+                            finish=lambda packet, duration: None)
+    try:
+        engine.start()
+        engine.wait(10)
+        engine.join()
+    finally:
+        pool.close()
+
+    assert handled == [(seq, seq) for seq in range(1, count + 1)]
+    assert engine.out_of_order == 0
+    assert pool.frames_per_worker == [9, 9]  # Runs of three frames, alternating workers
+    assert [pool.worker_for(index) for index in range(7)] == [0, 0, 0, 1, 1, 1, 0]
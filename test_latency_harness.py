@@ -0,0 +1,34 @@
+"""
+Latency harness tests: the cross-correlation on a known delay, and one short headless run of the full engine
+"""
+
+import numpy as np
+from latency_harness import SyntheticSource, analyze, decode_index, encode_index, run_config, trajectory
+
+
+def test_frame_index_round_trip():
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    assert decode_index(encode_index(frame, 70000)) == 70000
+
+
+def test_analyze_recovers_known_delay():
+    fps, delay = 30.0, 0.05
+    times, offsets = trajectory(8.0, fps)
+    truth = 0.5 + offsets
+    # Mirrored, scaled cursor moved `delay` after each frame
+    moves = np.column_stack(((1 - truth[:, 0]) * 1920, truth[:, 1] * 1080))
+    result = analyze(times, truth, times + delay, moves)
+
+    half_frame_ms = 500 / fps  # The cursor holds each position for a frame
+    assert abs(result["latency_ms"] - (1000 * delay + half_frame_ms)) <= 3
+    assert result["correlation"] > 0.99
+    assert abs(result["added_jitter_px"]) < 1
+
+
+def test_synthetic_run_through_engine():
+    source = SyntheticSource(seconds=2.0, noise=0.0, inference_time=0.01)
+    result = run_config(source, "none", "recording")
+
+    assert result["frames"] + result["frames_dropped"] == len(source)
+    assert result["other_events"] == {}  # The scripted pointing hand never clicks or scrolls
+    assert 10 <= result["latency_ms"] <= 150
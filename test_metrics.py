@@ -0,0 +1,78 @@
+"""
+Metrics tests: histogram buckets, Prometheus text, the localhost endpoint and the snapshot log
+"""
+
+import json
+import threading
+import urllib.request
+
+from metrics import Histogram, Metrics, MetricsGroup, MetricsServer, SnapshotLogger, thread_cpu_time
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram([0.001, 0.01, 0.1])
+    for seconds in (0.0005, 0.001, 0.005, 0.05, 2.0):
+        histogram.observe(seconds)
+    assert histogram.cumulative() == [(0.001, 2), (0.01, 3), (0.1, 4), (float("inf"), 5)]
+    assert histogram.count == 5
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_prometheus_text():
+    metrics = Metrics(bounds=[0.01, 0.1])
+    metrics.observe("inference", 0.02)
+    metrics.count("frames", 3)
+    metrics.add_source(lambda: {"left_clicks": 2})
+    lines = metrics.prometheus().splitlines()
+
+    assert 'hand_mouse_stage_latency_seconds_bucket{stage="inference",le="0.01"} 0' in lines
+    assert 'hand_mouse_stage_latency_seconds_bucket{stage="inference",le="0.1"} 1' in lines
+    assert 'hand_mouse_stage_latency_seconds_bucket{stage="inference",le="+Inf"} 1' in lines
+    assert 'hand_mouse_stage_latency_seconds_count{stage="inference"} 1' in lines
+    assert "hand_mouse_frames_total 3" in lines
+    assert "hand_mouse_left_clicks_total 2" in lines
+    assert any(line.startswith('hand_mouse_thread_cpu_seconds_total{thread="MainThread"}') for line in lines) \
+        == (thread_cpu_time(threading.main_thread()) is not None)
+
+
+def test_endpoint_serves_both_formats():
+    metrics = Metrics()
+    metrics.observe("capture", 0.004)
+    server = MetricsServer(metrics, port=0).start()
+    try:
+        with urllib.request.urlopen(server.url, timeout=2) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert b'stage="capture"' in response.read()
+        with urllib.request.urlopen(server.url + ".json", timeout=2) as response:
+            assert json.load(response)["stages"]["capture"]["count"] == 1
+    finally:
+        server.stop()
+
+
+def test_snapshot_log(tmp_path):
+    metrics = Metrics()
+    metrics.count("detections")
+    path = tmp_path / "metrics.jsonl"
+    logger = SnapshotLogger(metrics, path=str(path), interval=0.05).start()
+    threading.Event().wait(0.2)
+    logger.stop()
+
+    snapshots = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(snapshots) == logger.snapshots_written >= 2
+    assert snapshots[-1]["counters"]["detections"] == 1
+
+
+def test_group_labels_each_member():
+    group = MetricsGroup(label="session")
+    for name, frames in (("desk", 3), ("tv", 5)):
+        metrics = group.add(name, Metrics(bounds=[0.01]))
+        metrics.count("frames", frames)
+        metrics.observe("frame", 0.005)
+    lines = group.prometheus().splitlines()
+
+    assert 'hand_mouse_frames_total{session="desk"} 3' in lines
+    assert 'hand_mouse_frames_total{session="tv"} 5' in lines
+    assert lines.count("# TYPE hand_mouse_frames_total counter") == 1
+    assert 'hand_mouse_stage_latency_seconds_bucket{session="tv",stage="frame",le="0.01"} 1' in lines
+    assert group.snapshot()["sessions"]["desk"]["counters"] == {"frames": 3}
@@ -0,0 +1,128 @@
+"""
+Multi-camera tests: slot fusion on hand-made detections, and two video files standing in for cameras
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+from multicam import MultiCameraCapture, ViewFusion, hand_visibility
+
+
+def make_results(score=None, points=((0.5, 0.5), (0.6, 0.7))):
+    """Hand results with one hand of the given handedness score, or without a hand when score is None"""
+    class Results:
+        multi_hand_landmarks = None
+        multi_hand_world_landmarks = None
+        multi_handedness = None
+
+    results = Results()
+    if score is not None:
+        hand = landmark_pb2.NormalizedLandmarkList()
+        for x, y in points:
+            hand.landmark.add(x=x, y=y, z=0.0)
+        handedness = classification_pb2.ClassificationList()
+        handedness.classification.add(label="Right", score=score)
+        results.multi_hand_landmarks = [hand]
+        results.multi_handedness = [handedness]
+    return results
+
+
+class BrightnessHands:
+    """Stand-in Hands: a hand whose confidence is the frame's brightness"""
+
+    def process(self, rgb_frame):
+        return make_results(float(rgb_frame.mean()) / 255)
+
+    def close(self):
+        pass
+
+
+class CrashingHands(BrightnessHands):
+    """Stand-in Hands whose process dies without a word on a (nearly) black frame"""
+
+    def process(self, rgb_frame):
+        if rgb_frame.mean() < 20:
+            os._exit(1)
+        return super().process(rgb_frame)
+
+
+def write_video(path, levels, fps=30, size=(64, 48)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    for level in levels:
+        writer.write(np.full((size[1], size[0], 3), level, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+def test_fusion_picks_best_view_per_slot():
+    fusion = ViewFusion(2, slot=0.1, max_wait=0.05, policy="confidence")
+    fusion.add(0, 0.01, make_results(0.9))
+    fusion.add(1, 0.02, make_results(0.6))
+    assert fusion.pop_ready(0.05) == []  # Slot 0 still open for both cameras
+
+    fusion.add(0, 0.11, make_results(0.5))
+    assert fusion.pop_ready(0.12) == []  # Camera 1 may still report for slot 0
+    fusion.add(1, 0.12, make_results(0.8))
+    [view] = fusion.pop_ready(0.13)
+    assert (view.camera, view.capture_time, view.views) == (0, 0.01, 2)
+
+    fusion.end(0)  # Slot 1 now only waits on camera 1, and only until max_wait
+    assert fusion.pop_ready(0.2) == []
+    [view] = fusion.pop_ready(0.26)
+    assert view.camera == 1
+
+    fusion.add(0, 0.15, make_results(0.99))
+    assert fusion.late_detections == 1
+    assert fusion.views_used == [1, 1]
+
+
+def test_visibility_prefers_whole_hand_in_frame():
+    inside = make_results(0.5, points=((0.2, 0.2), (0.4, 0.5)))
+    cut_off = make_results(0.9, points=((0.8, 0.2), (1.1, 0.5)))
+    assert hand_visibility(inside) > hand_visibility(cut_off) > hand_visibility(make_results())
+
+
+def test_video_files_as_cameras(tmp_path):
+    # Camera 0 is bright for the first half second, camera 1 for the second
+    first = write_video(tmp_path / "first.avi", [200] * 15 + [40] * 15)
+    second = write_video(tmp_path / "second.avi", [40] * 15 + [200] * 15)
+    cameras = MultiCameraCapture([first, second], policy="confidence", slot=1 / 30, max_wait=0.1,
+                                 hands_factory=BrightnessHands, factory_args=(), warmup=False).start()
+    try:
+        assert cameras.isOpened()
+        chosen = []
+        while True:
+            success, view, capture_time = cameras.read()
+            if not success:
+                break
+            chosen.append((view.camera, capture_time))
+    finally:
+        cameras.release()
+
+    assert [time for camera, time in chosen] == sorted(time for camera, time in chosen)
+    assert [sent + skipped for sent, skipped in zip(cameras.frames_captured, cameras.camera_dropped)] == [30, 30]
+    assert chosen[0][0] == 0 and chosen[-1][0] == 1
+    assert min(cameras.fusion.views_used) >= 10
+
+
+def test_crashed_camera_stops_holding_up_slots(tmp_path):
+    crashing = write_video(tmp_path / "crashing.avi", [200] * 5 + [0] * 25)
+    healthy = write_video(tmp_path / "healthy.avi", [100] * 30)
+    cameras = MultiCameraCapture([crashing, healthy], policy="confidence", slot=1 / 30, max_wait=0.5,
+                                 hands_factory=CrashingHands, factory_args=(), warmup=False).start()
+    try:
+        delays = []
+        while True:
+            success, view, capture_time = cameras.read()
+            if not success:
+                break
+            delays.append(time.perf_counter() - capture_time)
+    finally:
+        cameras.release()
+
+    assert cameras.fusion.finished  # Ended by the healthy camera's "end", not by the read timeout
+    assert cameras.fusion.views_used[1] >= 20
+    assert max(delays[-10:]) < 0.25  # No longer waiting max_wait for the dead camera
@@ -0,0 +1,74 @@
+"""
+Output layer tests: injector ordering, plus the XTest backend against a real X server
+
+The XTest test needs python-xlib and a display; run it headless with
+`xvfb-run -a python -m pytest test_output.py`. It is skipped otherwise.
+"""
+
+import os
+
+import pytest
+from output import MouseInjector, RecordingBackend, create_backend
+
+
+def test_injector_preserves_order():
+    backend = RecordingBackend()
+    injector = MouseInjector(backend, coalesce=False).start()
+    injector.moveTo(10, 20)
+    injector.mouseDown()
+    injector.moveTo(11, 21)
+    injector.mouseUp()
+    injector.scroll(-3)
+    injector.rightClick()
+    assert injector.flush()
+    injector.stop()
+
+    assert [(name, args) for _, name, args in backend.events] == [
+        ("moveTo", (10, 20)), ("mouseDown", ()), ("moveTo", (11, 21)),
+        ("mouseUp", ()), ("scroll", (-3,)), ("rightClick", ()),
+    ]
+    assert injector.events_injected == injector.events_queued == 6
+
+
+def test_coalescing_keeps_clicks_in_place():
+    backend = RecordingBackend()
+    injector = MouseInjector(backend, coalesce=True)  # Not started: everything stays pending
+    injector.moveTo(10, 20)
+    injector.moveTo(15.2, 25.9)
+    injector.moveTo(15.7, 25.1)  # Same integer pixel
+    injector.mouseDown()
+    injector.moveTo(30, 40)
+    injector.moveTo(31, 41)
+    injector.mouseUp()
+    injector.moveTo(31, 41)      # Already there
+    injector.scroll(2)
+    injector.start()
+    assert injector.flush()
+    injector.stop()
+
+    assert [(name, args) for _, name, args in backend.events] == [
+        ("moveTo", (15, 25)), ("mouseDown", ()), ("moveTo", (31, 41)),
+        ("mouseUp", ()), ("scroll", (2,)),
+    ]
+    assert injector.moves_coalesced == 2
+    assert injector.moves_suppressed == 2
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_backend("nope")
+
+
+@pytest.mark.skipif(not os.environ.get("DISPLAY"), reason="needs an X display (e.g. xvfb-run)")
+def test_xtest_moves_pointer():
+    pytest.importorskip("Xlib")
+    backend = create_backend("xtest")
+    injector = MouseInjector(backend).start()
+    width, height = backend.size()
+    injector.moveTo(width // 3, height // 4)
+    injector.mouseDown()
+    injector.mouseUp()
+    injector.scroll(2)
+    assert injector.flush()
+    assert backend.position() == (width // 3, height // 4)
+    injector.stop()
@@ -0,0 +1,125 @@
+"""
+Pipeline tests: bounded queue overflow policies and close(), and frame order through the threaded
+stages with a numbered stand-in camera
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+from pipeline import BoundedQueue, PipelineEngine
+
+
+class NumberedCapture:
+    """Frames numbered 1..count, then waits until told to report end of stream"""
+
+    def __init__(self, count, interval=0.0):
+        self.count = count
+        self.interval = interval
+        self.sent = 0
+        self.done = threading.Event()
+
+    def read(self):
+        if self.sent == self.count:
+            self.done.wait(10)
+            return False, None, None
+        time.sleep(self.interval)
+        self.sent += 1
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        frame[0, 0] = self.sent
+        return True, frame, time.perf_counter()
+
+
+def run_pipeline(capture, output_time=0.0, policy="block", queue_size=2):
+    """
+    Run the non-pool pipeline over the capture's frames
+
+    Returns:
+        tuple: (engine, frame numbers in the order the output stage handled them)
+    """
+    handled = []
+
+    def infer(packet):
+        packet.results = int(packet.frame[0, 0, 0])
+
+    def output(packet):
+        time.sleep(output_time)
+        handled.append(packet.results)
+
+    engine = PipelineEngine(capture, infer, output, queue_size=queue_size,
+                            drop_policies={"inference": policy, "output": policy})
+    engine.start()
+    # All frames captured and the queues drained (or nothing arriving any more)
+    deadline = time.perf_counter() + 10
+    while time.perf_counter() < deadline:
+        if capture.sent == capture.count and not len(engine.inference_queue) and not len(engine.output_queue):
+            time.sleep(max(0.05, 2 * output_time))  # Let the last packet through the output stage
+            break
+        time.sleep(0.01)
+    capture.done.set()
+    engine.wait(2)
+    engine.join()
+    return engine, handled
+
+
+def test_drop_oldest_keeps_the_newest_items():
+    queue = BoundedQueue(2, "drop_oldest")
+    for item in range(1, 6):
+        assert queue.put(item)  # Never waits for the consumer
+    assert queue.dropped == 3 and len(queue) == 2
+    assert [queue.get(), queue.get(), queue.get(timeout=0.01)] == [4, 5, None]
+
+    with pytest.raises(ValueError):
+        BoundedQueue(2, "drop_newest")
+
+
+def test_block_waits_for_space():
+    queue = BoundedQueue(1, "block")
+    queue.put(1)
+    producer = threading.Thread(target=queue.put, args=(2,))
+    producer.start()
+    producer.join(0.1)
+    assert producer.is_alive() and len(queue) == 1
+
+    assert queue.get() == 1
+    producer.join(1.0)
+    assert not producer.is_alive() and queue.get() == 2 and queue.dropped == 0
+
+
+def test_close_wakes_blocked_producers_and_consumers():
+    full = BoundedQueue(1, "block")
+    full.put(1)
+    empty = BoundedQueue(1, "block")
+    results = {}
+    waiters = [threading.Thread(target=lambda: results.update(put=full.put(2))),
+               threading.Thread(target=lambda: results.update(get=empty.get()))]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.1)
+    assert not results
+
+    full.close()
+    empty.close()
+    for waiter in waiters:
+        waiter.join(1.0)
+    assert results == {"put": False, "get": None}
+    # Items queued before the close are still handed out, then get() stops waiting
+    assert full.get() == 1 and full.get() is None
+    assert not full.put(3)
+
+
+def test_frames_come_out_in_capture_order():
+    capture = NumberedCapture(60)
+    engine, handled = run_pipeline(capture, policy="block")
+    assert handled == list(range(1, 61))
+    assert engine.frames_processed == 60 and engine.out_of_order == 0 and engine.dropped_frames == 0
+
+
+def test_slow_output_drops_frames_but_keeps_order():
+    # Frames arrive every 2 ms, output takes 10 ms: drop_oldest sheds the backlog
+    capture = NumberedCapture(60, interval=0.002)
+    engine, handled = run_pipeline(capture, output_time=0.01, policy="drop_oldest")
+    assert engine.dropped_frames > 0 and engine.out_of_order == 0
+    assert handled == sorted(handled) and len(set(handled)) == len(handled) and handled[-1] == 60
+    assert len(handled) + engine.dropped_frames == engine.frames_captured == 60
@@ -0,0 +1,80 @@
+"""
+Frame skipping tests: predicted frames per detection against hand speed and inference budget, and the motion model
+"""
+
+import pytest
+from prediction import InferenceScheduler, MotionPredictor
+
+
+def pattern(scheduler, speed, frames=12, interval=1 / 30, inference_time=None):
+    """
+    Run the scheduler over a frame sequence, the hand found on the first frame
+
+    Returns:
+        str: 'I' (inferred) or 'p' (predicted) per frame
+    """
+    marks = ""
+    for frame in range(frames):
+        now = frame * interval
+        if scheduler.should_infer(now, speed if frame else None):
+            marks += "I"
+            if inference_time is not None:
+                scheduler.record_inference(now, inference_time)
+        else:
+            marks += "p"
+    return marks
+
+
+@pytest.mark.parametrize("speed, expected", [
+    (None, "IIIIII"),  # No hand tracked: always look for one
+    (0.1, "IppIpp"),   # Slow: max_skip predicted frames between detections
+    (0.9, "IpIpIp"),   # Halfway between slow and fast
+    (2.0, "IIIIII"),   # Fast: every frame
+])
+def test_skips_follow_hand_speed(speed, expected):
+    scheduler = InferenceScheduler(max_skip=2, slow_speed=0.3, fast_speed=1.5, budget=None)
+    assert pattern(scheduler, speed, frames=6) == expected
+    assert scheduler.predicted_frames == expected.count("p")
+    assert scheduler.skip_ratio() == pytest.approx(expected.count("p") / len(expected))
+
+
+def test_skip_count_scales_between_slow_and_fast():
+    scheduler = InferenceScheduler(max_skip=4, slow_speed=0.5, fast_speed=1.5, budget=None)
+    assert [scheduler.skip_for_speed(speed) for speed in (0.0, 0.5, 0.75, 1.0, 1.25, 1.5, 3.0)] == [4, 4, 3, 2, 1, 0, 0]
+
+
+def test_budget_skips_frames_even_for_a_fast_hand():
+    # 50 ms inferences on a 30 fps camera, at most half of wall time in inference
+    scheduler = InferenceScheduler(max_skip=2, slow_speed=0.3, fast_speed=1.5, budget=0.5)
+    marks = pattern(scheduler, speed=2.0, inference_time=0.05)
+    # Speed alone would infer every frame; the budget waits ~100 ms, capped by max_skip
+    assert marks == "IppIppIppIpp"
+
+    cheap = InferenceScheduler(max_skip=2, slow_speed=0.3, fast_speed=1.5, budget=0.5)
+    assert pattern(cheap, speed=2.0, inference_time=0.01) == "I" * 12
+
+
+def test_predictor_extrapolates_a_straight_line():
+    predictor = MotionPredictor(history=4, max_ahead=0.1)
+    assert predictor.predict(0.0) is None
+    for t in (0.0, 1 / 30, 2 / 30, 3 / 30):
+        predictor.add(t, 0.2 + 0.6 * t, 0.5 - 0.3 * t)
+
+    assert predictor.velocity() == pytest.approx((0.6, -0.3))
+    assert predictor.speed() == pytest.approx((0.6 ** 2 + 0.3 ** 2) ** 0.5)
+    t = 4 / 30
+    assert predictor.predict(t) == pytest.approx((0.2 + 0.6 * t, 0.5 - 0.3 * t))
+    # No further than max_ahead past the last detection
+    assert predictor.predict(10.0) == pytest.approx((0.2 + 0.6 * (0.1 + 0.1), 0.5 - 0.3 * (0.1 + 0.1)))
+
+
+def test_predictor_fits_the_recent_history_only():
+    predictor = MotionPredictor(history=3, max_ahead=0.1)
+    predictor.add(0.0, 0.9, 0.5)  # Before a turn; pushed out of the history
+    for t in (0.1, 0.2, 0.3):
+        predictor.add(t, 0.1 * t, 0.5)
+    assert predictor.velocity() == pytest.approx((0.1, 0.0))
+
+    predictor.reset()
+    predictor.add(1.0, 0.4, 0.6)
+    assert not predictor.velocity()[0] and predictor.predict(1.05) == (0.4, 0.6)
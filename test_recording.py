@@ -0,0 +1,134 @@
+"""
+Landmark recording tests: write → read round trip, mirror-view storage, seeking, interrupted files,
+and replay against the live cursor output
+"""
+
+import os
+
+import numpy as np
+from cursor_control import CursorController, RecordingMouse
+from gestures import INDEX_TIP, THUMB_TIP, landmarks_to_array
+from hand_results import HandResults
+from latency_harness import POINTING_HAND
+from recording import HANDEDNESS_CODES, HANDEDNESS_UNKNOWN, HEADER_SIZE, RECORD_SIZE, LandmarkRecorder, \
+    LandmarkRecording
+from replay import ReplayEngine
+
+START = 100.0
+RATE = 30.0
+
+
+def session(frames=120):
+    """
+    A pointing right hand (camera image coordinates) sweeping left to right, pinching twice, with no hand
+    on the first five frames
+
+    Returns:
+        list: (capture time, HandResults) per frame
+    """
+    results = []
+    for frame in range(frames):
+        capture_time = START + frame / RATE
+        if frame < 5:
+            results.append((capture_time, HandResults()))
+            continue
+        points = np.zeros((21, 3))
+        points[:, :2] = POINTING_HAND + (0.2 + 0.5 * frame / frames, 0.3)
+        points[:, 2] = -0.01 * np.arange(21) / 21
+        if 40 <= frame < 55 or 90 <= frame < 100:
+            points[THUMB_TIP] = points[INDEX_TIP] + (0.01, 0.0, 0.0)
+        results.append((capture_time, HandResults([points], labels=["Right"], scores=[0.93])))
+    return results
+
+
+def record(path, frames, mirrored=False):
+    with LandmarkRecorder(path, start_time=START, mirrored=mirrored) as recorder:
+        for capture_time, results in frames:
+            recorder.write(results, capture_time)
+    return recorder
+
+
+def cursor(mirrored):
+    return CursorController(1920, 1080, RecordingMouse(), print_gestures=False, filter_name="one_euro",
+                            mirrored=mirrored)
+
+
+def test_round_trip_stores_the_mirror_view(tmp_path):
+    path = str(tmp_path / "session.hlm")
+    frames = session()
+    assert record(path, frames).frame_count == 120
+
+    recording = LandmarkRecording(path)
+    assert recording.header["frame_count"] == 120 and recording.header["start_time"] == START
+    assert len(recording) == 120 and np.isclose(recording.duration(), 119 / RATE)
+
+    assert recording[0]["num_hands"] == 0 and recording[0]["handedness"] == HANDEDNESS_UNKNOWN
+    camera_points = landmarks_to_array(frames[60][1].multi_hand_landmarks[0])
+    stored = recording[60]
+    # Camera-view landmarks are stored as the mirror view: x flipped, the right hand seen as a left one
+    assert stored["seq"] == 61 and stored["num_hands"] == 1
+    assert np.allclose(stored["landmarks"][:, 0], 1.0 - camera_points[:, 0], atol=1e-6)
+    assert np.allclose(stored["landmarks"][:, 1:], camera_points[:, 1:], atol=1e-6)
+    assert stored["handedness"] == HANDEDNESS_CODES["Left"] and np.isclose(stored["score"], 0.93)
+
+    # Already mirrored results are stored as they are
+    mirrored_path = str(tmp_path / "mirrored.hlm")
+    record(mirrored_path, frames[60:61], mirrored=True)
+    mirrored = LandmarkRecording(mirrored_path)[0]
+    assert np.allclose(mirrored["landmarks"], camera_points, atol=1e-6)
+    assert mirrored["handedness"] == HANDEDNESS_CODES["Right"]
+
+
+def test_seek_time(tmp_path):
+    path = str(tmp_path / "session.hlm")
+    record(path, session())
+    recording = LandmarkRecording(path)
+
+    assert recording.seek_time(START + 10 / RATE) == 10
+    assert recording.seek_time(START + 10.5 / RATE) == 11  # Between frames: the next one
+    assert recording.seek_time(0.0) == 0
+    assert recording.seek_time(START + 1000.0) == len(recording)
+
+
+def test_interrupted_recording_is_read_up_to_the_last_whole_record(tmp_path):
+    path = str(tmp_path / "session.hlm")
+    record(path, session())
+    # A crash mid-write: part of the last record, and the header count of a longer file
+    with open(path, "r+b") as f:
+        f.truncate(HEADER_SIZE + 80 * RECORD_SIZE + RECORD_SIZE // 2)
+
+    recording = LandmarkRecording(path)
+    assert recording.header["frame_count"] == 120 and len(recording) == 80
+    assert recording[-1]["seq"] == 80 and recording.seek_time(START + 1000.0) == 80
+
+    # Killed before close(): the header never got its count
+    open_path = str(tmp_path / "open.hlm")
+    recorder = LandmarkRecorder(open_path, start_time=START, mirrored=False)
+    for capture_time, results in session(10):
+        recorder.write(results, capture_time)
+    recorder._file.flush()
+    assert LandmarkRecording(open_path).header["frame_count"] == 0 and len(LandmarkRecording(open_path)) == 10
+    recorder.close()
+    assert os.path.getsize(open_path) == HEADER_SIZE + 10 * RECORD_SIZE
+
+
+def test_replay_reproduces_the_live_mouse_output(tmp_path):
+    path = str(tmp_path / "session.hlm")
+    frames = session()
+    live = cursor(mirrored=False)
+    for capture_time, results in frames:
+        if results.multi_hand_landmarks:
+            live.update(results.multi_hand_landmarks[0], current_time=capture_time)
+    record(path, frames)
+
+    replayed = cursor(mirrored=True)  # Recordings hold the mirror view
+    stats = ReplayEngine(LandmarkRecording(path), cursor=replayed).run()
+    assert stats["frames"] == 120 and stats["frames_with_hand"] == 115
+
+    live_events = [(name, args) for _, name, args in live.mouse.events]
+    replay_events = [(name, args) for _, name, args in replayed.mouse.events]
+    assert live.mouse.counts()["mouseDown"] == 2 and live.mouse.counts() == replayed.mouse.counts()
+    assert [name for name, _ in live_events] == [name for name, _ in replay_events]
+    # float32 storage may move a cursor position across a pixel boundary, no further
+    for (_, live_args), (_, replay_args) in zip(live_events, replay_events):
+        assert np.allclose(live_args, replay_args, atol=1)
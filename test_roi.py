@@ -0,0 +1,116 @@
+"""
+ROI inference tests: crop-to-frame landmark remapping and the full-frame fallback, with a stand-in for MediaPipe Hands
+"""
+
+import numpy as np
+from gestures import landmarks_to_array
+from hand_results import HandResults
+from roi import ROIInference
+
+
+class SquareHands:
+    """Stand-in Hands: the 'hand' is the bright square in whatever image it gets, landmarks on a 5 x 5 grid over it"""
+
+    def __init__(self, score=1.0):
+        self.score = score
+        self.shapes = []
+        self.resets = 0
+
+    def process(self, rgb_frame):
+        self.shapes.append(rgb_frame.shape)
+        height, width = rgb_frame.shape[:2]
+        rows, columns = np.nonzero(rgb_frame[:, :, 0] > 128)
+        if not len(rows):
+            return HandResults()
+        x0, x1 = columns.min(), columns.max() + 1
+        y0, y1 = rows.min(), rows.max() + 1
+        grid = np.arange(21)
+        points = np.empty((21, 3))
+        points[:, 0] = (x0 + (x1 - x0) * (grid % 5) / 4) / width
+        points[:, 1] = (y0 + (y1 - y0) * (grid // 5) / 4) / height
+        points[:, 2] = 0.1 * (x1 - x0) / width  # Normalized like x, as MediaPipe's z
+        return HandResults([points], scores=[self.score])
+
+    def reset(self):
+        self.resets += 1
+
+
+def roi_inference(score=1.0):
+    """ROI inference with separate full-frame and crop stand-ins"""
+    return ROIInference(SquareHands(score), SquareHands(score), padding=0.5, min_size=100, edge_margin=0.05,
+                        min_score=0.5)
+
+
+def frame_with_square(x, y, size=60, shape=(480, 640)):
+    frame = np.zeros(shape + (3,), dtype=np.uint8)
+    frame[y:y + size, x:x + size] = 255
+    return frame
+
+
+def test_crop_landmarks_map_back_to_the_full_frame():
+    roi = roi_inference()
+    frame = frame_with_square(300, 200)
+    full = landmarks_to_array(roi.process(frame).multi_hand_landmarks[0])
+    assert roi.roi is not None
+
+    cropped = landmarks_to_array(roi.process(frame).multi_hand_landmarks[0])
+    crop_shape = roi.crop_hands.shapes[-1]
+    assert crop_shape[0] < frame.shape[0] and crop_shape[1] < frame.shape[1]
+    assert roi.stats()["crop_hits"] == 1 and roi.full_frames == 1
+    # Same landmarks as the full-frame run, z included
+    assert np.allclose(cropped, full, atol=1e-6)
+
+
+def test_each_instance_sees_one_geometry_and_restarts_tracking_when_it_changes():
+    roi = roi_inference()
+    frame = frame_with_square(300, 200)
+    for _ in range(4):
+        roi.process(frame)
+    assert {shape for shape in roi.hands.shapes} == {frame.shape}
+    assert len(set(roi.crop_hands.shapes)) == 1 and len(roi.crop_hands.shapes) == 3
+    # The crop instance starts fresh on its first crop, then tracks; the full-frame one was never interrupted
+    assert roi.crop_hands.resets == 1 and roi.hands.resets == 0
+
+    # Re-centre: the crop instance restarts on the new crop
+    x0, y0, x1, y1 = roi.roi
+    roi.process(frame_with_square(x1 - 62, 200))
+    roi.process(frame_with_square(x1 - 62, 200))
+    assert roi.roi[0] > x0 and roi.crop_hands.resets == 2 and roi.hands.resets == 0
+
+    # Back to full frames after crops: the full-frame instance's last hand is stale
+    roi.process(frame_with_square(20, 20))
+    assert roi.crop_misses == 1 and roi.hands.resets == 1
+    assert roi.stats()["tracking_resets"] == 3
+
+
+def test_hand_leaving_the_crop_falls_back_to_the_full_frame():
+    roi = roi_inference()
+    roi.process(frame_with_square(300, 200))
+    old_roi = roi.roi
+
+    results = roi.process(frame_with_square(40, 40))
+    points = landmarks_to_array(results.multi_hand_landmarks[0])
+    assert roi.crop_misses == 1 and roi.full_frames == 2
+    # The same frame was re-run in full: the hand is found where it went, and the crop follows it
+    assert np.isclose(points[:, 0].min(), 40 / 640) and np.isclose(points[:, 1].min(), 40 / 480)
+    assert roi.roi != old_roi and roi.roi[0] <= 40 and roi.roi[1] <= 40
+    assert roi.crop_hands.shapes[-1][:2] == (old_roi[3] - old_roi[1], old_roi[2] - old_roi[0])
+    assert roi.hands.shapes[-1][:2] == (480, 640)
+
+
+def test_crop_recenters_near_its_edge():
+    roi = roi_inference()
+    roi.process(frame_with_square(300, 200))
+    x0, y0, x1, y1 = roi.roi
+
+    # Still inside the crop, but against its right edge
+    roi.process(frame_with_square(x1 - 62, 200))
+    assert roi.crop_hits == 1 and roi.roi[0] > x0
+
+
+def test_low_confidence_uses_the_full_frame():
+    roi = roi_inference(score=0.3)
+    for _ in range(3):
+        assert roi.process(frame_with_square(300, 200)).multi_hand_landmarks
+    assert roi.roi is None and roi.full_frames == 3 and roi.stats()["pixel_ratio"] == 1.0
+    assert not roi.crop_hands.shapes and roi.tracking_resets == 0
@@ -0,0 +1,131 @@
+"""
+Multi-session server tests: two paced synthetic cameras sharing one worker running a stand-in for MediaPipe Hands
+"""
+
+import time
+
+import numpy as np
+import pytest
+from output import RecordingBackend
+from server import HandMouseServer
+
+
+class SleepHands:
+    """Stand-in Hands: takes a fixed time per frame and never finds a hand"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def process(self, rgb_frame):
+        time.sleep(self.seconds)
+
+        class Results:
+            multi_hand_landmarks = None
+            multi_hand_world_landmarks = None
+            multi_handedness = None
+        return Results()
+
+    def close(self):
+        pass
+
+
+class FailingHands(SleepHands):
+    """Stand-in Hands that raises on its Nth frame"""
+
+    def __init__(self, seconds, fail_at):
+        super().__init__(seconds)
+        self.fail_at = fail_at
+        self.frames = 0
+
+    def process(self, rgb_frame):
+        self.frames += 1
+        if self.frames == self.fail_at:
+            raise RuntimeError("model crashed")
+        return super().process(rgb_frame)
+
+
+class TickingCapture:
+    """Blank frames at a fixed rate for a fixed time, like a camera"""
+
+    color_order = "BGR"
+    dropped_frames = 0
+
+    def __init__(self, fps, seconds, shape=(48, 64, 3)):
+        self.interval = 1 / fps
+        self.seconds = seconds
+        self.frame = np.zeros(shape, dtype=np.uint8)
+        self.start = None
+        self.sent = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.start is None:
+            self.start = time.perf_counter()
+        due = self.start + self.sent * self.interval
+        if due - self.start >= self.seconds:
+            return False, None, None
+        time.sleep(max(0.0, due - time.perf_counter()))
+        self.sent += 1
+        return True, self.frame, time.perf_counter()
+
+    def release(self):
+        pass
+
+
+def serve(sessions, inference_time, seconds=1.5):
+    specs = [dict(spec, capture=TickingCapture(spec.pop("fps"), seconds), backend=RecordingBackend(640, 480))
+             for spec in sessions]
+    server = HandMouseServer(specs, workers=1, hands_factory=SleepHands, factory_args=(inference_time,),
+                             warmup=False).start()
+    try:
+        assert server.wait(seconds + 5)
+    finally:
+        server.stop()
+    return server, {session.name: session for session in server.sessions}
+
+
+def test_slow_camera_is_not_crowded_out():
+    # The worker manages ~100 frames/s: the fast camera alone could keep it busy
+    server, sessions = serve([{"name": "fast", "fps": 200, "slo": 1.0}, {"name": "slow", "fps": 20, "slo": 1.0}],
+                             inference_time=0.01)
+    fast, slow = sessions["fast"], sessions["slow"]
+
+    assert slow.frames_inferred >= slow.frames_captured - 2
+    assert fast.frames_inferred > 2 * slow.frames_inferred
+    assert fast.frames_replaced > 0 and slow.frames_shed == fast.frames_shed == 0
+    assert sum(server.pool.frames_per_worker) == fast.frames_inferred + slow.frames_inferred
+
+
+def test_frames_over_the_slo_are_shed():
+    server, sessions = serve([{"name": "tight", "fps": 30, "slo": 0.01}, {"name": "loose", "fps": 30, "slo": 1.0}],
+                             inference_time=0.02)
+    tight, loose = sessions["tight"], sessions["loose"]
+
+    # Inference alone takes longer than the tight SLO: only the periodic probe frames get through
+    assert tight.frames_shed > tight.frames_captured // 2
+    assert 1 <= tight.frames_inferred <= 4
+    assert loose.frames_shed == 0 and loose.frames_inferred >= loose.frames_captured - 2
+
+    lines = server.metrics.prometheus().splitlines()
+    assert f'hand_mouse_frames_shed_total{{session="tight"}} {tight.frames_shed}' in lines
+    assert 'hand_mouse_frames_shed_total{session="loose"} 0' in lines
+    assert f'hand_mouse_stage_latency_seconds_count{{session="loose",stage="frame"}} {loose.frames_inferred}' \
+        in lines
+
+
+def test_worker_failure_stops_the_server():
+    specs = [{"name": "cam", "capture": TickingCapture(30, 60), "backend": RecordingBackend(640, 480)}]
+    server = HandMouseServer(specs, workers=1, hands_factory=FailingHands, factory_args=(0.005, 4),
+                             warmup=False).start()
+    start = time.perf_counter()
+    try:
+        with pytest.raises(RuntimeError, match="model crashed"):
+            server.wait(10)
+    finally:
+        server.stop()
+    # The failing result thread stopped everything instead of leaving the capture running for its 60 s
+    assert time.perf_counter() - start < 5
+    assert not server.running and not any(thread.is_alive() for thread in server._threads)
+    assert server.sessions[0].frames_inferred == 3
@@ -0,0 +1,152 @@
+"""
+Cursor filter tests on synthetic tracks: One Euro cutoff adaptation, Kalman convergence and latency
+compensation, and the filter registry
+"""
+
+import math
+import time
+
+import numpy as np
+import pytest
+import config
+from cursor_control import CursorController, RecordingMouse
+from hand_results import landmark_list
+from benchmark_moving_average import DequeMovingAverageFilter
+from smoothing import FILTERS, ArrayMovingAverageFilter, KalmanFilter, MovingAverageFilter, OneEuroFilter, create_filter
+
+RATE = 30.0
+
+
+def run(position_filter, xs, rate=RATE):
+    """Filter a 1-D track (y fixed) sampled at `rate`; returns the filtered x values"""
+    return np.array([position_filter.update(x, 0.0, i / rate)[0] for i, x in enumerate(xs)])
+
+
+def test_one_euro_step_matches_its_cutoff():
+    one_euro = OneEuroFilter(min_cutoff=1.0, beta=0.01, d_cutoff=1.0)
+    assert one_euro.update(100.0, 50.0, 0.0) == (100.0, 50.0)  # First sample passes through
+
+    dt = 1 / RATE
+    x, _ = one_euro.update(130.0, 50.0, dt)
+    alpha_d = 1 / (1 + 1 / (2 * math.pi * 1.0 * dt))
+    cutoff = 1.0 + 0.01 * alpha_d * 30.0 / dt
+    alpha = 1 / (1 + 1 / (2 * math.pi * cutoff * dt))
+    assert x == pytest.approx(100.0 + alpha * 30.0)
+
+
+def test_one_euro_cutoff_rises_with_speed():
+    # At rest: jitter is smoothed like a plain low-pass at min_cutoff, beta or not
+    jitter = 500.0 + np.random.default_rng(0).normal(0.0, 2.0, 300)
+    still_plain = run(OneEuroFilter(min_cutoff=1.0, beta=0.0), jitter)[60:]
+    still_adaptive = run(OneEuroFilter(min_cutoff=1.0, beta=0.007), jitter)[60:]
+    assert still_adaptive.std() < jitter.std() / 2
+    assert still_adaptive.std() < 1.5 * still_plain.std()
+
+    # Moving fast (1000 px/s): the speed-driven cutoff cuts the lag behind the finger
+    ramp = 1000.0 * np.arange(60) / RATE
+    lag_plain = ramp[-1] - run(OneEuroFilter(min_cutoff=1.0, beta=0.0), ramp)[-1]
+    lag_adaptive = ramp[-1] - run(OneEuroFilter(min_cutoff=1.0, beta=0.007), ramp)[-1]
+    assert lag_adaptive < lag_plain / 3
+
+
+def test_one_euro_timestamps_set_the_time_step():
+    xs = np.linspace(0.0, 300.0, 20)
+    timed = run(OneEuroFilter(), xs)
+    untimed_filter = OneEuroFilter()
+    untimed = np.array([untimed_filter.update(x, 0.0)[0] for x in xs])
+    assert np.allclose(timed, untimed)  # freq stands in for missing timestamps
+
+    # Half the frame rate: each sample counts for more time, so the filter follows faster
+    assert run(OneEuroFilter(), xs, rate=RATE / 2)[-1] > timed[-1]
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 10])
+def test_running_sum_average_matches_the_deque_version(window):
+    positions = np.random.default_rng(window).random((300, 2)) * (1920, 1080)
+    running = MovingAverageFilter(window)
+    reference = DequeMovingAverageFilter(window)
+    for frame, (x, y) in enumerate(positions.tolist()):
+        if frame == 137:  # Mid-lap: the ring and the sums must both start over
+            running.reset()
+            reference = DequeMovingAverageFilter(window)
+        assert running.update(x, y) == pytest.approx(reference.update(x, y), rel=0, abs=1e-12)
+
+
+@pytest.mark.parametrize("window", [1, 5, 10])
+def test_array_average_matches_one_deque_per_channel(window):
+    hands = np.random.default_rng(window).random((200, 21, 3))
+    running = ArrayMovingAverageFilter((21, 3), window)
+    out = np.empty((21, 3))
+    for frame, hand in enumerate(hands):
+        if frame % 77 == 0:
+            running.reset()
+            references = [DequeMovingAverageFilter(window) for _ in range(21 * 3)]
+        expected = [reference.update(value, 0.0)[0] for reference, value in zip(references, hand.ravel().tolist())]
+        assert running.update(hand, out) is out
+        assert np.allclose(out.ravel(), expected, rtol=0, atol=1e-12)
+
+
+def test_registry_builds_filters_with_config_params():
+    assert {"combined", "one_euro", "none"} <= set(FILTERS)
+    one_euro = create_filter("one_euro", beta=0.5)
+    assert isinstance(one_euro, OneEuroFilter)
+    assert one_euro.min_cutoff == config.CURSOR_FILTER_PARAMS["one_euro"]["min_cutoff"] and one_euro.beta == 0.5
+    with pytest.raises(ValueError):
+        create_filter("median")
+
+
+def constant_velocity_track(seconds=3.0, speed=600.0, noise=4.0):
+    """Capture times and noisy x positions (px) of a finger moving at constant speed"""
+    times = np.arange(int(seconds * RATE)) / RATE
+    return times, 100.0 + speed * times + np.random.default_rng(1).normal(0.0, noise, len(times))
+
+
+def test_kalman_converges_on_a_constant_velocity_track():
+    times, xs = constant_velocity_track()
+    kalman = KalmanFilter(latency=0.0)
+    estimates = np.array([kalman.update(x, 0.0, t)[0] for t, x in zip(times, xs)])
+
+    assert kalman.vx == pytest.approx(600.0, rel=0.05)
+    # Over the last second: tracks the true position closer than the raw measurements do
+    truth = 100.0 + 600.0 * times
+    error = estimates[-30:] - truth[-30:]
+    assert abs(error.mean()) < 2.0 and error.std() < (xs[-30:] - truth[-30:]).std() / 2
+
+
+def test_kalman_predicts_ahead_by_the_latency():
+    times, xs = constant_velocity_track()
+    for latency, prediction, ahead in [(0.1, 1.0, 0.1), (0.1, 0.5, 0.05), (0.1, 0.0, 0.0)]:
+        kalman = KalmanFilter(latency=latency, prediction=prediction)
+        estimates = np.array([kalman.update(x, 0.0, t)[0] for t, x in zip(times, xs)])
+        # Where the finger is `ahead` seconds after capture, not where the camera saw it
+        truth = 100.0 + 600.0 * (times + ahead)
+        assert abs((estimates[-30:] - truth[-30:]).mean()) < 3.0
+
+
+def test_kalman_measures_latency_on_its_clock():
+    now = [0.0]
+    kalman = KalmanFilter(max_latency=0.15, clock=lambda: now[0])
+    for frame in range(10):
+        now[0] = frame / RATE + 0.04  # Output 40 ms after capture
+        kalman.update(10.0 * frame, 0.0, frame / RATE)
+    assert kalman.last_latency == pytest.approx(0.04)
+
+    # Timestamps from another clock (e.g. a replayed recording) would always hit the clamp
+    now[0] = 1000.0
+    kalman.update(100.0, 0.0, 10 / RATE)
+    assert kalman.last_latency == 0.15
+    assert KalmanFilter(latency=0.05).update(1.0, 2.0, 5.0) == (1.0, 2.0)
+
+
+def test_cursor_defaults_to_the_capture_clock():
+    # update() without a timestamp uses the capture clock, the one the Kalman filter measures latency on
+    cursor = CursorController(1920, 1080, RecordingMouse(), print_gestures=False, filter_name="kalman")
+    before = time.perf_counter()
+    cursor.update(landmark_list(np.full((21, 3), 0.5)))
+    assert before <= cursor.position_filter.last_time <= time.perf_counter()
+
+
+def test_registry_builds_the_kalman_filter():
+    kalman = create_filter("kalman", latency=0.05)
+    assert isinstance(kalman, KalmanFilter) and kalman.latency == 0.05
+    assert kalman.process_noise == config.CURSOR_FILTER_PARAMS["kalman"]["process_noise"]
@@ -0,0 +1,113 @@
+"""
+MJPEG stream source tests against the local stand-in server (mjpeg_server.py), no network needed
+"""
+
+import time
+
+import cv2
+import numpy as np
+import pytest
+from mjpeg_server import MJPEGServer, synthetic_frames
+from stream import MJPEGStreamCapture, decode_reduction, split_jpegs
+
+
+@pytest.fixture
+def mjpeg_server(request):
+    """Stand-in server; parametrize indirectly with MJPEGServer keyword arguments"""
+    server = MJPEGServer(**getattr(request, "param", {})).start()
+    yield server
+    server.stop()
+
+
+def open_stream(url, **overrides):
+    options = dict(connect_timeout=2.0, read_timeout=2.0, backoff_initial=0.05, backoff_max=0.2)
+    options.update(overrides)
+    return MJPEGStreamCapture(url, **options)
+
+
+def test_split_jpegs_handles_any_chunking():
+    jpegs = [cv2.imencode(".jpg", frame)[1].tobytes() for frame in synthetic_frames(3, 64, 48)]
+    data = b"".join(b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n" for jpeg in jpegs)
+    for chunk_size in (1, 7, 4096):
+        position = 0
+
+        def read(size):
+            nonlocal position
+            chunk = data[position:position + min(size, chunk_size)]
+            position += len(chunk)
+            return chunk
+
+        assert list(split_jpegs(read)) == jpegs
+
+
+def test_decode_reduction():
+    assert decode_reduction(1280, 2, 320) == 2
+    assert decode_reduction(1280, 8, 320) == 4
+    assert decode_reduction(640, 2, 480) == 1
+
+
+def test_reads_reduced_frames(mjpeg_server):
+    cap = open_stream(mjpeg_server.url, max_reduction=2, min_width=320)
+    try:
+        assert cap.isOpened()
+        frames = []
+        while len(frames) < 5:
+            success, frame, capture_time = cap.read()
+            assert success
+            frames.append(frame)
+    finally:
+        cap.release()
+    assert cap.reduction == 2
+    assert frames[-1].shape == (360, 640, 3)  # 1280x720 decoded at half size
+
+
+@pytest.mark.parametrize("mjpeg_server", [{"fps": 100}], indirect=True)
+def test_slow_reader_gets_newest_frame(mjpeg_server):
+    cap = open_stream(mjpeg_server.url)
+    try:
+        assert cap.read()[0]
+        time.sleep(0.3)
+        success, frame, capture_time = cap.read()
+    finally:
+        cap.release()
+    assert success
+    assert cap.dropped_frames > 0
+    assert time.perf_counter() - capture_time < 0.3  # Not the frame left over from before the pause
+
+
+@pytest.mark.parametrize("mjpeg_server", [{"drop_after": 5}], indirect=True)
+def test_reconnects_after_drop(mjpeg_server):
+    cap = open_stream(mjpeg_server.url)
+    try:
+        received = 0
+        while received < 20:
+            success, frame, capture_time = cap.read()
+            assert success  # read() waits through the reconnects instead of failing
+            received += 1
+    finally:
+        cap.release()
+    assert cap.reconnects >= 3
+    assert mjpeg_server.connections >= 4
+
+
+def test_waits_through_outage(mjpeg_server):
+    cap = open_stream(mjpeg_server.url, read_timeout=None)
+    try:
+        assert cap.read()[0]
+        mjpeg_server.refuse.set()  # Server answers 503 for a while
+        time.sleep(0.5)
+        mjpeg_server.refuse.clear()
+        start = time.perf_counter()
+        success, frame, capture_time = cap.read()
+        assert success and capture_time > start - 0.5
+    finally:
+        cap.release()
+    assert cap.reconnects >= 1
+
+
+def test_unreachable_stream_is_not_opened():
+    server = MJPEGServer(frames=[np.zeros((48, 64, 3), dtype=np.uint8)])
+    url = server.url
+    server.stop()  # Port now closed
+    cap = open_stream(url, connect_timeout=0.5)
+    assert not cap.isOpened()
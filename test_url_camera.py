@@ -61,9 +61,8 @@ if working_url:
     print("✅ DroidCam direct connection WORKING!")
     print(f"\n📝 Working URL: {working_url}")
     print("\n📸 Open 'droidcam_direct.jpg' to see the feed")
-    print("\n🔧 To use this in the app, we need to modify the code")
-    print("   to use this URL instead of camera index.")
-    print("\n💡 Would you like me to create a version that uses this URL?")
+    print("\n🔧 To use this in the app, edit config.py:")
+    print(f'   CAMERA_INDEX = "{working_url}"')
 else:
     print("❌ Could not connect via direct URL")
     print("\n💡 Troubleshooting:")